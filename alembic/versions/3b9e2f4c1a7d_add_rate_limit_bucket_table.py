@@ -0,0 +1,35 @@
+"""Add rate_limit_bucket table
+
+Revision ID: 3b9e2f4c1a7d
+Revises: 7d6233f84602
+Create Date: 2026-10-18 10:12:41.530218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9e2f4c1a7d'
+down_revision: Union[str, Sequence[str], None] = '7d6233f84602'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('rate_limit_bucket',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('tokens', sa.Float(), nullable=False),
+    sa.Column('rate', sa.Float(), nullable=False),
+    sa.Column('capacity', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('rate_limit_bucket')
@@ -0,0 +1,29 @@
+"""Add usage to agent_execution
+
+Revision ID: c5d1e8a7f2b4
+Revises: 3b9e2f4c1a7d
+Create Date: 2026-10-18 14:05:12.384512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d1e8a7f2b4'
+down_revision: Union[str, Sequence[str], None] = '3b9e2f4c1a7d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('agent_execution', sa.Column('usage', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('agent_execution', 'usage')
@@ -0,0 +1,46 @@
+"""Add next_attempt_at to agent_execution
+
+Revision ID: d8e2f1a9b3c6
+Revises: c5d1e8a7f2b4
+Create Date: 2026-10-18 16:42:37.219804
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8e2f1a9b3c6'
+down_revision: Union[str, Sequence[str], None] = 'c5d1e8a7f2b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Cooldown of retried executions before this migration, see SchedulerSettings.threshold_seconds
+RETRY_THRESHOLD_SECONDS = 60
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('agent_execution', sa.Column('next_attempt_at', sa.DateTime(), nullable=True))
+    # New executions are due right away, attempted ones once the previous cooldown has passed
+    op.execute(sa.text(
+        "UPDATE agent_execution SET next_attempt_at = CASE "
+        "WHEN executions = 0 THEN created_at "
+        "ELSE updated_at + make_interval(secs => :threshold) END"
+    ).bindparams(threshold=RETRY_THRESHOLD_SECONDS))
+    op.alter_column('agent_execution', 'next_attempt_at', nullable=False, server_default=sa.text('now()'))
+    op.create_index('ix_agent_execution_pending_next_attempt_at', 'agent_execution', ['next_attempt_at'],
+                    unique=False, postgresql_where=sa.text("state = 'pending'"))
+    op.drop_index('ix_agent_execution_pending_updated_at', table_name='agent_execution',
+                  postgresql_where=sa.text("state = 'pending'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_agent_execution_pending_updated_at', 'agent_execution', ['updated_at'], unique=False,
+                    postgresql_where=sa.text("state = 'pending'"))
+    op.drop_index('ix_agent_execution_pending_next_attempt_at', table_name='agent_execution',
+                  postgresql_where=sa.text("state = 'pending'"))
+    op.drop_column('agent_execution', 'next_attempt_at')
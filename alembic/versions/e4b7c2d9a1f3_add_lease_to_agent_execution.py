@@ -0,0 +1,30 @@
+"""Add lease to agent_execution
+
+Revision ID: e4b7c2d9a1f3
+Revises: d8e2f1a9b3c6
+Create Date: 2026-10-18 18:20:54.630127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b7c2d9a1f3'
+down_revision: Union[str, Sequence[str], None] = 'd8e2f1a9b3c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('agent_execution', sa.Column('lease_owner', sa.String(), nullable=True))
+    op.add_column('agent_execution', sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('agent_execution', 'lease_expires_at')
+    op.drop_column('agent_execution', 'lease_owner')
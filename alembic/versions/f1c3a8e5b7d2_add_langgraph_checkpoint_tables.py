@@ -0,0 +1,80 @@
+"""Add LangGraph checkpoint tables
+
+Revision ID: f1c3a8e5b7d2
+Revises: e4b7c2d9a1f3
+Create Date: 2026-10-18 21:03:41.587219
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c3a8e5b7d2'
+down_revision: Union[str, Sequence[str], None] = 'e4b7c2d9a1f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Schema of AsyncPostgresSaver from langgraph-checkpoint-postgres 2.0.x, which consists of its
+# migrations 0-9. They are recorded in checkpoint_migrations, so `AsyncPostgresSaver.setup()`
+# only applies migrations of newer versions.
+CHECKPOINT_MIGRATIONS = 10
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('checkpoint_migrations',
+    sa.Column('v', sa.INTEGER(), nullable=False),
+    sa.PrimaryKeyConstraint('v')
+    )
+    op.create_table('checkpoints',
+    sa.Column('thread_id', sa.Text(), nullable=False),
+    sa.Column('checkpoint_ns', sa.Text(), server_default=sa.text("''"), nullable=False),
+    sa.Column('checkpoint_id', sa.Text(), nullable=False),
+    sa.Column('parent_checkpoint_id', sa.Text(), nullable=True),
+    sa.Column('type', sa.Text(), nullable=True),
+    sa.Column('checkpoint', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('metadata', postgresql.JSONB(astext_type=sa.Text()), server_default=sa.text("'{}'"), nullable=False),
+    sa.PrimaryKeyConstraint('thread_id', 'checkpoint_ns', 'checkpoint_id')
+    )
+    op.create_table('checkpoint_blobs',
+    sa.Column('thread_id', sa.Text(), nullable=False),
+    sa.Column('checkpoint_ns', sa.Text(), server_default=sa.text("''"), nullable=False),
+    sa.Column('channel', sa.Text(), nullable=False),
+    sa.Column('version', sa.Text(), nullable=False),
+    sa.Column('type', sa.Text(), nullable=False),
+    sa.Column('blob', postgresql.BYTEA(), nullable=True),
+    sa.PrimaryKeyConstraint('thread_id', 'checkpoint_ns', 'channel', 'version')
+    )
+    op.create_table('checkpoint_writes',
+    sa.Column('thread_id', sa.Text(), nullable=False),
+    sa.Column('checkpoint_ns', sa.Text(), server_default=sa.text("''"), nullable=False),
+    sa.Column('checkpoint_id', sa.Text(), nullable=False),
+    sa.Column('task_id', sa.Text(), nullable=False),
+    sa.Column('idx', sa.INTEGER(), nullable=False),
+    sa.Column('channel', sa.Text(), nullable=False),
+    sa.Column('type', sa.Text(), nullable=True),
+    sa.Column('blob', postgresql.BYTEA(), nullable=False),
+    sa.Column('task_path', sa.Text(), server_default=sa.text("''"), nullable=False),
+    sa.PrimaryKeyConstraint('thread_id', 'checkpoint_ns', 'checkpoint_id', 'task_id', 'idx')
+    )
+    op.create_index('checkpoints_thread_id_idx', 'checkpoints', ['thread_id'], unique=False)
+    op.create_index('checkpoint_blobs_thread_id_idx', 'checkpoint_blobs', ['thread_id'], unique=False)
+    op.create_index('checkpoint_writes_thread_id_idx', 'checkpoint_writes', ['thread_id'], unique=False)
+    op.execute(sa.text(
+        "INSERT INTO checkpoint_migrations (v) SELECT generate_series(0, :last_migration)"
+    ).bindparams(last_migration=CHECKPOINT_MIGRATIONS - 1))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('checkpoint_writes_thread_id_idx', table_name='checkpoint_writes')
+    op.drop_index('checkpoint_blobs_thread_id_idx', table_name='checkpoint_blobs')
+    op.drop_index('checkpoints_thread_id_idx', table_name='checkpoints')
+    op.drop_table('checkpoint_writes')
+    op.drop_table('checkpoint_blobs')
+    op.drop_table('checkpoints')
+    op.drop_table('checkpoint_migrations')
@@ -32,6 +32,8 @@ class AppContext:
             self.scheduler_settings.poll_interval_seconds,
             self.scheduler_ctx.scheduler_service,
             self.scheduler_ctx.db_engine,
+            execution_listener=self.scheduler_ctx.execution_listener,
+            fallback_poll_interval_seconds=self.scheduler_settings.fallback_poll_interval_seconds,
         )
         self.db_engine = create_engine(settings.db_url, echo=settings.debug)
 
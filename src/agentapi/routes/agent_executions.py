@@ -1,6 +1,8 @@
+from datetime import datetime
+
 from fastapi import APIRouter, Query
 from uuid import UUID
-from agentapi.schemas import AgentExecutionCreate, AgentExecutionRead
+from agentapi.schemas import AgentExecutionCreate, AgentExecutionRead, AgentConfigurationUsageRead
 from agentapi.dependencies import SessionDep, AgentExecutionServiceDep
 from typing import List
 from core.models import AgentExecutionState
@@ -18,6 +20,17 @@ def create_execution(
     return res.id
 
 
+@router.get("/usage", response_model=List[AgentConfigurationUsageRead])
+def get_usage_by_config(
+        session: SessionDep,
+        execution_svc: AgentExecutionServiceDep,
+        limit: int = Query(10, description="Maximum number of configurations to return"),
+        since: datetime | None = Query(None, description="Only include executions updated since this time")
+):
+    """Token usage and latency per configuration, configurations consuming the most tokens first."""
+    return execution_svc.get_usage_by_config(session, since=since, limit=limit)
+
+
 @router.get("/{execution_id}", response_model=AgentExecutionRead)
 def get_execution(
         session: SessionDep,
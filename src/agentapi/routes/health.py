@@ -50,9 +50,13 @@ async def health_check() -> Dict[str, Any]:
             }
             status = "unhealthy"
         else:
+            scheduler_service = ctx.scheduler_ctx.scheduler_service
             checks["scheduler"] = {
                 "status": "healthy",
-                "message": "Scheduler is running"
+                "message": "Scheduler is running",
+                "in_flight": scheduler_service.in_flight,
+                "queue_depth": scheduler_service.queue_depth,
+                "max_concurrency": scheduler_service.settings.max_concurrency,
             }
     except Exception as e:
         checks["scheduler"] = {
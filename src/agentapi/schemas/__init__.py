@@ -1,5 +1,5 @@
 from .agent_configuration import AgentConfigurationCreate, AgentConfigurationRead, AgentConfigurationUpdate
-from .agent_execution import AgentExecutionCreate, AgentExecutionRead
+from .agent_execution import AgentExecutionCreate, AgentExecutionRead, AgentConfigurationUsageRead
 
 __all__ = [
     "AgentConfigurationCreate",
@@ -7,4 +7,5 @@ __all__ = [
     "AgentConfigurationUpdate",
     "AgentExecutionCreate",
     "AgentExecutionRead",
+    "AgentConfigurationUsageRead",
 ]
\ No newline at end of file
@@ -17,5 +17,19 @@ class AgentExecutionRead(BaseModel):
     executions: int = Field(description="Agent executions")
     created_at: datetime = Field(description="Agent execution creation time")
     updated_at: datetime = Field(description="Agent execution update time")
+    next_attempt_at: datetime | None = Field(default=None, description="Time from which the execution can be attempted")
     success_result: Dict[str, Any] | None = Field(description="Success result")
-    error_result: Dict[str, Any] | None = Field(description="Error result")
\ No newline at end of file
+    error_result: Dict[str, Any] | None = Field(description="Error result")
+    usage: Dict[str, Any] | None = Field(default=None, description="Token usage and latency of the latest attempt")
+
+
+class AgentConfigurationUsageRead(BaseModel):
+    config_id: UUID = Field(description="Agent configuration ID")
+    executions: int = Field(description="Number of executions with recorded usage")
+    llm_calls: int = Field(description="Total LLM calls")
+    input_tokens: int = Field(description="Total prompt tokens")
+    output_tokens: int = Field(description="Total completion tokens")
+    cache_read_tokens: int = Field(description="Total prompt tokens served from the provider prompt cache")
+    llm_latency_ms: int = Field(description="Total LLM call latency in milliseconds")
+    tool_calls: int = Field(description="Total tool calls")
+    tool_latency_ms: int = Field(description="Total tool call latency in milliseconds")
\ No newline at end of file
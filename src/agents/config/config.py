@@ -1,17 +1,40 @@
 from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING, Literal
 
 from langchain_core.language_models import BaseChatModel
 
+if TYPE_CHECKING:
+    from langgraph.checkpoint.base import BaseCheckpointSaver
+    from agents.search_agent.graph_cache import AgentGraphCache
+    from agents.search_agent.tool.reddit import (SubmissionCache, SearchResultCache, RedditClientPool,
+                                                 RateLimitGovernor)
+
 @dataclass(frozen=True)
 class RedditConfig:
     client_id: str
     client_secret: str
     user_agent: str
+    search_concurrency: int = 5
+    comments_max_depth: int | None = None
+    comments_max_breadth: int | None = None
+    comments_replace_more_limit: int = 0
+    search_cache_max_entries: int = 256
+    search_cache_ttl_seconds: float = 3600
+    compact_seen_submissions: bool = True
 
 @dataclass(frozen=True)
 class Config:
     llm: BaseChatModel
     reddit_config: RedditConfig
     prompts_folder: Path
+    prompt_layout: Literal["prefix_cache", "inline"] = "prefix_cache"
+    submission_cache: "SubmissionCache | None" = None
+    search_cache: "SearchResultCache | None" = None
+    reddit_pool: "RedditClientPool | None" = None
+    # Shared Reddit rate limit of clients created outside `reddit_pool`
+    rate_limit_governor: "RateLimitGovernor | None" = None
+    graph_cache: "AgentGraphCache | None" = None
+    # Saves the agent state after every step, so a retried execution resumes where it failed
+    checkpointer: "BaseCheckpointSaver | None" = None
 
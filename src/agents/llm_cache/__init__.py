@@ -0,0 +1,7 @@
+from .disk_llm_cache import DiskLLMCache, LLMCacheMiss, LLMCacheMode
+
+__all__ = [
+    "DiskLLMCache",
+    "LLMCacheMiss",
+    "LLMCacheMode",
+]
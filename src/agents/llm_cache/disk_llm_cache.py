@@ -0,0 +1,146 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Literal, Optional
+
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.load import dumps, loads
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+
+from agents.atomic_file import write_text_atomic
+
+logger = logging.getLogger("uvicorn")
+
+LLMCacheMode = Literal["off", "read_through", "record_only", "replay_only"]
+
+# `response_metadata` flag of responses served from the cache
+CACHE_HIT = "cache_hit"
+
+# Message fields which never reach the provider and differ between otherwise identical runs
+_VOLATILE_MESSAGE_FIELDS = ("id", "response_metadata", "usage_metadata")
+
+
+class LLMCacheMiss(RuntimeError):
+    """Raised in `replay_only` mode when a response was not recorded."""
+    pass
+
+
+class DiskLLMCache(BaseCache):
+    """
+    LLM response cache stored as one JSON file per request in a local folder.
+
+    Set as `cache` of a chat model. Requests are keyed on a hash of the messages and the model
+    string, which LangChain builds from the model parameters and the bound tools. Modes:
+
+    - `read_through`: serve recorded responses, record the others
+    - `record_only`: always call the model and record its responses
+    - `replay_only`: serve recorded responses only, raise `LLMCacheMiss` otherwise
+
+    Once the cache holds more than `max_entries` responses, the least recently used ones are evicted.
+    """
+
+    def __init__(self, folder: Path, mode: LLMCacheMode = "read_through", max_entries: int = 10_000):
+        """
+        Args:
+            folder: Folder to store responses in, created if missing
+            mode: Whether responses are served, recorded or both
+            max_entries: Maximum number of stored responses
+        """
+        if mode == "off":
+            raise ValueError("DiskLLMCache can't be created in 'off' mode, don't set a cache instead")
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be >= 1: max_entries = {max_entries}")
+        self.folder = Path(folder)
+        self.mode = mode
+        self.max_entries = max_entries
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._size: int | None = None
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        if self.mode == "record_only":
+            return None
+
+        key = request_key(prompt, llm_string)
+        path = self._path(key)
+        try:
+            generations = loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            if self.mode == "replay_only":
+                raise LLMCacheMiss(f"LLM response is not recorded: key = {key}")
+            return None
+
+        # Mark as recently used for eviction
+        os.utime(path)
+        for generation in generations:
+            if isinstance(generation, ChatGeneration):
+                # Identical responses within one run must not be merged into one message by id
+                generation.message.id = f"run-{uuid.uuid4()}"
+                # Replayed responses cost no tokens, usage ledgers and budgets must not count them
+                if isinstance(generation.message, AIMessage):
+                    generation.message.usage_metadata = None
+                generation.message.response_metadata[CACHE_HIT] = True
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        if self.mode == "replay_only":
+            return
+
+        path = self._path(request_key(prompt, llm_string))
+        path.parent.mkdir(exist_ok=True)
+        existed = path.exists()
+        write_text_atomic(path, dumps(return_val))
+
+        if not existed:
+            self._on_entry_added()
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            for path in self.folder.glob("*/*.json"):
+                path.unlink(missing_ok=True)
+            self._size = 0
+
+    def _on_entry_added(self):
+        with self._lock:
+            if self._size is None:
+                self._size = sum(1 for _ in self.folder.glob("*/*.json"))
+            else:
+                self._size += 1
+            if self._size > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        """Remove the least recently used entries, leaving 10% of headroom to not evict on every update."""
+        entries = []
+        for path in self.folder.glob("*/*.json"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                pass
+        entries.sort()
+
+        target = int(self.max_entries * 0.9)
+        evicted = entries[:max(0, len(entries) - target)]
+        for _, path in evicted:
+            path.unlink(missing_ok=True)
+        self._size = len(entries) - len(evicted)
+        logger.info("Evicted LLM cache entries: evicted = %d, size = %d", len(evicted), self._size)
+
+    def _path(self, key: str) -> Path:
+        return self.folder / key[:2] / f"{key}.json"
+
+
+def request_key(prompt: str, llm_string: str) -> str:
+    """Hash of the serialized messages without volatile fields and the model string."""
+    messages = json.loads(prompt)
+    for message in messages:
+        message_kwargs = message.get("kwargs", {}) if isinstance(message, dict) else {}
+        for field in _VOLATILE_MESSAGE_FIELDS:
+            message_kwargs.pop(field, None)
+    canonical = json.dumps([messages, llm_string], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
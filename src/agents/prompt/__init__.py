@@ -1,5 +1,9 @@
 from .prompt_manager import PromptManager
+from .prompt_registry import PromptRegistry, PromptTemplate, get_prompt_registry
 
 __all__ = [
     "PromptManager",
+    "PromptRegistry",
+    "PromptTemplate",
+    "get_prompt_registry",
 ]
\ No newline at end of file
@@ -0,0 +1,130 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from string import Formatter
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("uvicorn")
+
+_formatter = Formatter()
+
+
+class PromptTemplate:
+    """Prompt text with its `str.format` placeholders parsed once."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self._parts = list(_formatter.parse(text))
+        self.field_names = frozenset(field_name for _, field_name, _, _ in self._parts if field_name)
+
+    def format(self, **kwargs: Any) -> str:
+        """Equivalent of `self.text.format(**kwargs)` without parsing the template again."""
+        chunks = []
+        for literal_text, field_name, format_spec, conversion in self._parts:
+            chunks.append(literal_text)
+            if field_name is None:
+                continue
+            value, _ = _formatter.get_field(field_name, (), kwargs)
+            value = _formatter.convert_field(value, conversion)
+            chunks.append(_formatter.format_field(value, format_spec or ""))
+        return "".join(chunks)
+
+
+@dataclass
+class _PromptEntry:
+    path: Path
+    mtime_ns: int
+    template: PromptTemplate
+    checked_at: float
+
+
+class PromptRegistry:
+    """
+    Process-wide registry of prompt templates.
+
+    All prompts are read once, then a prompt file is checked for modification at most once per
+    `check_interval_seconds` and reloaded only if its mtime changed, so prompts can be edited
+    without a restart and without reading files on every execution.
+    """
+
+    def __init__(self, prompt_folder: Path, check_interval_seconds: float = 5.0):
+        """
+        Args:
+            prompt_folder: Base prompt folder path
+            check_interval_seconds: Minimum time between two mtime checks of the same prompt
+        """
+        self.prompt_folder = Path(prompt_folder)
+        self.check_interval_seconds = check_interval_seconds
+        self._entries: Dict[str, _PromptEntry] = {}
+
+    def preload(self) -> None:
+        """Load every `.md` prompt of the prompt folder and its subfolders."""
+        for prompt_path in sorted(self.prompt_folder.rglob("*.md")):
+            relative_path = prompt_path.relative_to(self.prompt_folder).with_suffix("")
+            self._entries[relative_path.as_posix()] = self._load(prompt_path)
+        logger.info("Loaded prompts: folder = %s, prompts = %d", self.prompt_folder, len(self._entries))
+
+    def get(self, prompt_name: str, subfolder: Optional[str] = None) -> PromptTemplate:
+        """
+        Get a prompt template, loading it or reloading it if the file changed.
+
+        Raises:
+            FileNotFoundError: If the prompt file doesn't exist
+            ValueError: If the prompt file is empty
+        """
+        cache_key = f"{subfolder}/{prompt_name}" if subfolder else prompt_name
+        entry = self._entries.get(cache_key)
+
+        if entry is None:
+            prompt_path = self.prompt_folder / f"{cache_key}.md"
+            entry = self._entries[cache_key] = self._load(prompt_path)
+        elif time.monotonic() - entry.checked_at >= self.check_interval_seconds:
+            entry = self._entries[cache_key] = self._reload_if_modified(entry)
+
+        return entry.template
+
+    def _reload_if_modified(self, entry: _PromptEntry) -> _PromptEntry:
+        try:
+            mtime_ns = entry.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            logger.warning(f"Prompt file was removed, keeping the loaded version: {entry.path}")
+            entry.checked_at = time.monotonic()
+            return entry
+
+        if mtime_ns == entry.mtime_ns:
+            entry.checked_at = time.monotonic()
+            return entry
+
+        logger.info(f"Reloading modified prompt: {entry.path}")
+        return self._load(entry.path)
+
+    @staticmethod
+    def _load(prompt_path: Path) -> _PromptEntry:
+        if not prompt_path.exists():
+            raise FileNotFoundError(f"Prompt file not found: {prompt_path}")
+
+        try:
+            mtime_ns = prompt_path.stat().st_mtime_ns
+            content = prompt_path.read_text(encoding="utf-8").strip()
+        except Exception as e:
+            raise ValueError(f"Failed to read prompt file {prompt_path}: {e}")
+
+        if not content:
+            raise ValueError(f"Prompt file is empty: {prompt_path}")
+        return _PromptEntry(prompt_path, mtime_ns, PromptTemplate(content), time.monotonic())
+
+
+_registries: Dict[Path, PromptRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_prompt_registry(prompt_folder: Path) -> PromptRegistry:
+    """Return the process-wide registry of `prompt_folder`."""
+    key = Path(prompt_folder).resolve()
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = _registries[key] = PromptRegistry(key)
+        return registry
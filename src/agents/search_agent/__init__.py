@@ -1,8 +1,13 @@
 from .models import SearchResult, CreateSearchAgentCommand
-from .search_agent import execute_search
+from .search_agent import execute_search, AgentStep
+from .graph_cache import AgentGraphCache
+from .usage import UsageLedger
 
 __all__ = [
     "SearchResult",
     "CreateSearchAgentCommand",
-    "execute_search"
+    "execute_search",
+    "AgentStep",
+    "AgentGraphCache",
+    "UsageLedger",
 ]
\ No newline at end of file
@@ -0,0 +1,102 @@
+import logging
+import time
+from typing import Any
+
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+
+from agents.search_agent.usage import UsageLedger
+
+logger = logging.getLogger("uvicorn")
+
+# Key of the `ExecutionBudget` in `RunnableConfig["configurable"]`
+EXECUTION_BUDGET = "execution_budget"
+
+
+class ExecutionBudget:
+    """Wall-clock and token limits of one agent execution."""
+
+    def __init__(self, usage: UsageLedger, max_duration_seconds: float | None = None,
+                 max_total_tokens: int | None = None):
+        """
+        Args:
+            usage: Ledger of the execution, source of the consumed tokens
+            max_duration_seconds: Time after which the agent must stop searching
+            max_total_tokens: Prompt and completion tokens after which the agent must stop searching
+        """
+        self.usage = usage
+        self.max_duration_seconds = max_duration_seconds
+        self.max_total_tokens = max_total_tokens
+        self.started_at = time.monotonic()
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def exhausted_reason(self) -> str | None:
+        """Why the budget is exhausted, None while it is not."""
+        if self.max_duration_seconds is not None and self.elapsed_seconds >= self.max_duration_seconds:
+            return f"time budget of {self.max_duration_seconds:g} seconds is exhausted"
+        total_tokens = self.usage.input_tokens + self.usage.output_tokens
+        if self.max_total_tokens is not None and total_tokens >= self.max_total_tokens:
+            return f"token budget of {self.max_total_tokens} tokens is exhausted"
+        return None
+
+
+def enforce_budget(state: dict[str, Any], config: RunnableConfig) -> dict[str, Any]:
+    """
+    `post_model_hook` which drops the tool calls of the model once the execution budget is exhausted.
+
+    Without tool calls the agent proceeds to generate its structured response from the results it
+    already has. The budget is read from `RunnableConfig["configurable"]`, so the hook can be part
+    of graphs shared by many executions.
+    """
+    budget: ExecutionBudget | None = config.get("configurable", {}).get(EXECUTION_BUDGET)
+    last_message = state["messages"][-1]
+    if budget is None or not isinstance(last_message, AIMessage) or not last_message.tool_calls:
+        return {}
+
+    reason = budget.exhausted_reason()
+    if reason is None:
+        return {}
+
+    logger.info("Execution budget exhausted, finalizing search: reason = %s, dropped_tool_calls = %d",
+                reason, len(last_message.tool_calls))
+    return {"messages": [without_tool_calls(last_message, f"Stopping the search: {reason}.")]}
+
+
+def without_tool_calls(message: AIMessage, fallback_content: str) -> AIMessage:
+    """Copy of `message` (with the same id, so it replaces it in the state) without tool calls."""
+    additional_kwargs = {k: v for k, v in message.additional_kwargs.items() if k != "tool_calls"}
+    return message.model_copy(update={
+        "content": message.content or fallback_content,
+        "tool_calls": [],
+        "invalid_tool_calls": [],
+        "additional_kwargs": additional_kwargs,
+    })
+
+
+def answered_messages(messages: list[BaseMessage]) -> list[BaseMessage]:
+    """
+    Messages without unanswered tool calls, as required by chat completion APIs.
+
+    Tool calls without a result (e.g. cancelled at the deadline) are dropped together with
+    results of tool calls which are not in the history anymore.
+    """
+    answered_ids = {m.tool_call_id for m in messages if isinstance(m, ToolMessage)}
+    sanitized: list[BaseMessage] = []
+    requested_ids: set[str] = set()
+    for message in messages:
+        if isinstance(message, AIMessage) and message.tool_calls:
+            call_ids = {c["id"] for c in message.tool_calls}
+            if call_ids <= answered_ids:
+                requested_ids |= call_ids
+                sanitized.append(message)
+            elif message.content:
+                sanitized.append(without_tool_calls(message, ""))
+        elif isinstance(message, ToolMessage):
+            if message.tool_call_id in requested_ids:
+                sanitized.append(message)
+        else:
+            sanitized.append(message)
+    return sanitized
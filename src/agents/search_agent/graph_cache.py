@@ -0,0 +1,59 @@
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Sequence
+
+from langchain_core.language_models import BaseChatModel
+from langgraph.graph.state import CompiledStateGraph
+
+logger = logging.getLogger("uvicorn")
+
+
+def agent_graph_key(llm: BaseChatModel, tool_names: Sequence[str], *parts: Hashable) -> Hashable:
+    """
+    Key of a compiled agent graph: model type and parameters, tool names and any other build input.
+
+    Model parameters are taken from its serialized fields (secrets are masked), so equally configured
+    model instances share a graph.
+    """
+    llm_params = json.dumps(llm.model_dump(), sort_keys=True, default=str)
+    return type(llm).__qualname__, llm_params, tuple(sorted(tool_names)), *parts
+
+
+class AgentGraphCache:
+    """
+    LRU cache of compiled agent graphs shared by all executions of a process.
+
+    Graphs must not hold per-execution state, it is passed at invocation time in
+    `RunnableConfig["configurable"]`.
+    """
+
+    def __init__(self, max_entries: int = 32):
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be >= 1: max_entries = {max_entries}")
+        self.max_entries = max_entries
+        self._graphs: OrderedDict[Hashable, CompiledStateGraph] = OrderedDict()
+
+    def get_or_build(self, key: Hashable, build: Callable[[], CompiledStateGraph]) -> CompiledStateGraph:
+        graph = self._graphs.get(key)
+        if graph is not None:
+            self._graphs.move_to_end(key)
+            return graph
+
+        graph = build_agent_graph(build)
+        self._graphs[key] = graph
+        if len(self._graphs) > self.max_entries:
+            self._graphs.popitem(last=False)
+        return graph
+
+    def __len__(self) -> int:
+        return len(self._graphs)
+
+
+def build_agent_graph(build: Callable[[], CompiledStateGraph]) -> CompiledStateGraph:
+    """Build a graph, logging how long it took."""
+    started = time.perf_counter()
+    graph = build()
+    logger.info("Built agent graph: duration_ms = %.1f", (time.perf_counter() - started) * 1000)
+    return graph
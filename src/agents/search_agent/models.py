@@ -142,15 +142,56 @@ class CreateSearchAgentCommand(BaseModel):
         examples=[5]
     )
     recursion_limit: int = Field(default=25, description="Maximum recursion limit.", examples=[25, 50])
+    summarize_history: bool = Field(
+        default=False,
+        description=(
+            "Summarize older search results once the message history exceeds `max_tokens`. "
+            "Costs extra LLM calls and replaces the raw results with their summaries."
+        ),
+        examples=[True]
+    )
     max_tokens: int = Field(
         default=4000,
         ge=1000,
         description="Maximum tokens before message summarization kicks in",
         examples=[4000, 6000, 8000]
     )
+    max_result_tokens: int | None = Field(
+        default=None,
+        ge=100,
+        description=(
+            "Maximum tokens of each search tool result. Selftexts and comments are truncated to fit, "
+            "results are not truncated if unset."
+        ),
+        examples=[1000, 1500]
+    )
     max_summary_tokens: int = Field(
         default=500,
         ge=100,
         description="Maximum tokens for each summary message",
         examples=[500, 800, 1000]
     )
+    max_duration_seconds: float | None = Field(
+        default=None,
+        gt=0,
+        description=(
+            "Wall-clock budget of the execution. Once exhausted the agent stops searching and returns "
+            "the results found so far."
+        ),
+        examples=[300, 600]
+    )
+    max_total_tokens: int | None = Field(
+        default=None,
+        ge=1000,
+        description=(
+            "Prompt and completion token budget of the execution. Once exhausted the agent stops "
+            "searching and returns the results found so far."
+        ),
+        examples=[100000, 200000]
+    )
+    max_reddit_calls: int | None = Field(
+        default=None,
+        ge=1,
+        description="Maximum number of Reddit searches of the execution, repeated identical searches don't count.",
+        examples=[10, 20]
+    )
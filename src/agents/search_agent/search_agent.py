@@ -1,47 +1,205 @@
-from typing import Callable
+import asyncio
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
+from typing import Any, Callable
 
 import asyncpraw
-from langchain_core.messages import HumanMessage, BaseMessage, ToolMessage, AIMessage
+from langchain_core.messages import HumanMessage, BaseMessage, ToolMessage, AIMessage, SystemMessage
+from langgraph.errors import GraphRecursionError
+from langgraph.graph.state import CompiledStateGraph
 from langgraph.prebuilt import create_react_agent
 
 from agents.config import Config
-from agents.prompt import PromptManager
+from agents.prompt import PromptRegistry, get_prompt_registry
 from agents.search_agent.models import CreateSearchAgentCommand, SearchResult
-from agents.search_agent.tool import create_reddit_tools
+from agents.search_agent.budget import EXECUTION_BUDGET, ExecutionBudget, answered_messages, enforce_budget
+from agents.search_agent.summarization import create_summarization_hook
+from agents.search_agent.usage import UsageLedger
+from agents.search_agent.graph_cache import agent_graph_key, build_agent_graph
+from agents.search_agent.tool.reddit import (
+    CommentSampling, GovernedRequestor, SearchResultCache, REDDIT_SEARCH_CONTEXT, create_reddit_search_context,
+    create_reddit_search_tool,
+)
 import logging
 
 logger = logging.getLogger("uvicorn")
 
+# Graph node of `create_react_agent` which rewrites the whole history, see `create_summarization_hook`
+PRE_MODEL_HOOK_NODE = "pre_model_hook"
+# Time on top of `max_duration_seconds` for the agent to produce its structured response
+# before the run is cancelled and the response is generated directly
+FINALIZATION_GRACE_SECONDS = 60
 
-async def execute_search(cfg: Config, cmd: CreateSearchAgentCommand) -> SearchResult:
-    prompt_manager = PromptManager(cfg.prompts_folder)
-    search_agent_prompt = prompt_manager.load_prompt("search_agent", "system")
-    
-    # Create tools and track Reddit clients for cleanup
-    tools, reddit_clients = await _create_tools(cfg, cmd)
+
+@dataclass(frozen=True)
+class AgentStep:
+    """One step of the search agent: the graph node which ran and the messages it added."""
+    node: str
+    messages: list[BaseMessage]
+
+
+async def execute_search(cfg: Config, cmd: CreateSearchAgentCommand,
+                         on_step: Callable[[AgentStep], None] | None = None,
+                         usage: UsageLedger | None = None,
+                         thread_id: str | None = None) -> SearchResult:
+    """
+    Run the search agent and return its structured response.
+
+    Only the updates of each step are streamed, `on_step` is called with every step except the
+    history summarization. Token usage and latency of LLM and tool calls are collected in `usage`.
+
+    Once the time or token budget of `cmd` is exhausted the agent stops calling tools and returns
+    what it found so far. If it doesn't finish within the grace period after the time budget, the
+    run is stopped and the structured response is generated directly from the messages collected
+    so far. Hitting the recursion limit is handled the same way when `cmd` has a budget, and raises
+    `GraphRecursionError` otherwise.
+
+    With `cfg.checkpointer` and a `thread_id` the state is saved after every step. If a previous
+    run of the same thread failed, this run resumes from its last completed step instead of
+    starting over. The checkpoints are deleted once the structured response is returned.
+    """
+    prompt_registry = get_prompt_registry(cfg.prompts_folder)
+    search_agent_prompt = _assemble_prompt(cfg, cmd, prompt_registry)
+    summary_prompt = prompt_registry.get("tool_result_summary", "system").text
     
-    try:
-        agent = create_react_agent(
-            model=cfg.llm,
-            tools=tools,
-            response_format=SearchResult,
-            prompt=search_agent_prompt.format(behavior=cmd.behavior, min_results=cmd.min_results),
-        ).with_config(recursion_limit=cmd.recursion_limit)
+    # Identical searches within this execution are served from memory
+    search_cache = SearchResultCache(
+        max_entries=cfg.reddit_config.search_cache_max_entries,
+        ttl_seconds=cfg.reddit_config.search_cache_ttl_seconds,
+    )
+
+    agent = _get_agent_graph(cfg, cmd, search_agent_prompt, summary_prompt)
+    usage = usage if usage is not None else UsageLedger()
+    budget = ExecutionBudget(usage, max_duration_seconds=cmd.max_duration_seconds,
+                             max_total_tokens=cmd.max_total_tokens)
+
+    async with AsyncExitStack() as resources:
+        # Reddit clients are returned to the pool or closed when the execution ends
+        tool_contexts = await _create_tool_contexts(cfg, cmd, search_cache, resources)
+        resources.callback(_log_search_cache_stats, cfg, search_cache)
+        resources.callback(_log_usage, usage)
+
+        history: list[BaseMessage] = [HumanMessage(cmd.search_query)]
+        run_config = {
+            "recursion_limit": cmd.recursion_limit,
+            "configurable": {**tool_contexts, EXECUTION_BUDGET: budget},
+            "callbacks": [usage],
+        }
 
-        messages = [HumanMessage(cmd.search_query)]
+        checkpointing = cfg.checkpointer is not None and thread_id is not None
+        agent_input: dict[str, Any] | None = {"messages": list(history)}
+        if checkpointing:
+            run_config["configurable"]["thread_id"] = thread_id
+            resumed_history = await _resumable_history(cfg, agent, run_config)
+            if resumed_history is not None:
+                history, agent_input = resumed_history, None
 
-        res = None
-        async for event in agent.astream({"messages": messages}, stream_mode='values'):
-            _log_message(event["messages"][-1])
-            res = event
+        structured_response = None
+        try:
+            async with asyncio.timeout(_hard_deadline(cmd)):
+                async for event in agent.astream(agent_input, config=run_config, stream_mode='updates'):
+                    for node, update in event.items():
+                        if not isinstance(update, dict) or node == PRE_MODEL_HOOK_NODE:
+                            continue
+                        step = AgentStep(node=node, messages=update.get("messages", []))
+                        for message in step.messages:
+                            _log_message(message)
+                        _merge_messages(history, step.messages)
+                        if on_step is not None:
+                            on_step(step)
+                        structured_response = update.get("structured_response", structured_response)
+        except TimeoutError:
+            structured_response = await _finalize(cfg, search_agent_prompt, history, usage,
+                                                  f"time budget of {cmd.max_duration_seconds:g} seconds is exhausted")
+        except GraphRecursionError:
+            if not _has_budget(cmd):
+                raise
+            structured_response = await _finalize(cfg, search_agent_prompt, history, usage,
+                                                  f"step limit of {cmd.recursion_limit} steps is reached")
 
-        if res is None:
+        if structured_response is None:
             raise RuntimeError("No search results found")
-        return res["structured_response"]
-    finally:
-        # Clean up Reddit clients
-        for reddit_client in reddit_clients:
-            await reddit_client.close()
+        if checkpointing:
+            await cfg.checkpointer.adelete_thread(thread_id)
+        return structured_response
+
+
+async def _resumable_history(cfg: Config, agent: CompiledStateGraph,
+                             run_config: dict[str, Any]) -> list[BaseMessage] | None:
+    """
+    Messages of the interrupted run of the thread, None if there is nothing to resume.
+
+    Checkpoints of a run which already finished are deleted, so the thread starts over.
+    """
+    snapshot = await agent.aget_state(run_config)
+    thread_id = run_config["configurable"]["thread_id"]
+    if snapshot.next:
+        messages = list(snapshot.values.get("messages", []))
+        logger.info("Resuming search agent from checkpoint: thread_id = %s, next = %s, messages = %d",
+                    thread_id, snapshot.next, len(messages))
+        return messages
+    if snapshot.values:
+        logger.info("Discarding checkpoints of finished search agent run: thread_id = %s", thread_id)
+        await cfg.checkpointer.adelete_thread(thread_id)
+    return None
+
+
+def _has_budget(cmd: CreateSearchAgentCommand) -> bool:
+    return any(limit is not None for limit in (cmd.max_duration_seconds, cmd.max_total_tokens, cmd.max_reddit_calls))
+
+
+def _hard_deadline(cmd: CreateSearchAgentCommand) -> float | None:
+    if cmd.max_duration_seconds is None:
+        return None
+    return cmd.max_duration_seconds + FINALIZATION_GRACE_SECONDS
+
+
+def _merge_messages(history: list[BaseMessage], messages: list[BaseMessage]):
+    """Append new messages to `history`, replacing messages with the same id like the graph state does."""
+    positions = {m.id: i for i, m in enumerate(history) if m.id is not None}
+    for message in messages:
+        if message.id is not None and message.id in positions:
+            history[positions[message.id]] = message
+        else:
+            history.append(message)
+
+
+async def _finalize(cfg: Config, prompt: str, history: list[BaseMessage], usage: UsageLedger,
+                    reason: str) -> SearchResult:
+    """Generate the structured response directly from the messages collected before the run was stopped."""
+    logger.warning("Search agent stopped, generating the result from collected messages: reason = %s", reason)
+    messages = [
+        SystemMessage(prompt),
+        *answered_messages(history),
+        HumanMessage(f"The {reason}. Return the final SearchResult based only on the search results above."),
+    ]
+    return await cfg.llm.with_structured_output(SearchResult).ainvoke(messages, config={"callbacks": [usage]})
+
+
+def _assemble_prompt(cfg: Config, cmd: CreateSearchAgentCommand, prompt_registry: PromptRegistry) -> str:
+    """
+    System prompt made of the static instructions and the per-command search context.
+
+    With the `prefix_cache` layout the static instructions come first, so providers can serve the
+    common prefix of all executions from their prompt cache. The `inline` layout puts the search
+    context first, as the single prompt did before it was split.
+    """
+    instructions = prompt_registry.get("search_agent", "system").text
+    context = prompt_registry.get("search_agent_context", "system").format(behavior=cmd.behavior,
+                                                                          min_results=cmd.min_results)
+    if cfg.prompt_layout == "inline":
+        return f"{context}\n\n{instructions}"
+    return f"{instructions}\n\n{context}"
+
+
+def _log_usage(usage: UsageLedger):
+    summary = usage.to_dict()
+    logger.info("Search agent usage: llm = %s, tools = %s", summary["llm"], summary["tools"])
+
+
+def _log_search_cache_stats(cfg: Config, search_cache: SearchResultCache):
+    logger.info("Reddit search cache stats: execution = %s, global = %s", search_cache.stats(),
+                cfg.search_cache.stats() if cfg.search_cache is not None else None)
 
 
 def _log_message(message: BaseMessage):
@@ -58,24 +216,94 @@ def _log_message(message: BaseMessage):
         tool_calls = [{"name": t["name"], "id": t["id"]} for t in message.tool_calls]
         params["tool_calls"] = str(tool_calls)
         params["tool_calls_size"] = str(len(tool_calls))
+        if message.usage_metadata:
+            input_token_details = message.usage_metadata.get("input_token_details", {})
+            params["input_tokens"] = str(message.usage_metadata["input_tokens"])
+            params["cache_read_tokens"] = str(input_token_details.get("cache_read", 0))
 
     logger.info("Handle message: %s", params)
 
 
 
 
-async def _create_tools(cfg: Config, cmd: CreateSearchAgentCommand) -> tuple[list[Callable], list[asyncpraw.Reddit]]:
+def _get_agent_graph(cfg: Config, cmd: CreateSearchAgentCommand, prompt: str,
+                     summary_prompt: str) -> CompiledStateGraph:
+    """Compiled agent graph, shared by executions with the same model, tools, prompts and token budgets."""
+
+    def build() -> CompiledStateGraph:
+        return create_react_agent(
+            model=cfg.llm,
+            tools=_create_tools(cmd),
+            response_format=SearchResult,
+            prompt=prompt,
+            # Older tool results are summarized once the history exceeds the token budget, if enabled
+            pre_model_hook=create_summarization_hook(cfg.llm, summary_prompt, cmd.max_tokens,
+                                                     cmd.max_summary_tokens) if cmd.summarize_history else None,
+            # Tool calls are dropped once the execution budget is exhausted
+            post_model_hook=enforce_budget,
+            checkpointer=cfg.checkpointer,
+        )
+
+    if cfg.graph_cache is None:
+        return build_agent_graph(build)
+
+    # The checkpointer is referenced by its graphs, so its id can't be reused while they are cached
+    checkpointer_id = id(cfg.checkpointer) if cfg.checkpointer is not None else None
+    summarization = (summary_prompt, cmd.max_tokens, cmd.max_summary_tokens) if cmd.summarize_history else None
+    key = agent_graph_key(cfg.llm, cmd.search_types, prompt, summarization, checkpointer_id)
+    return cfg.graph_cache.get_or_build(key, build)
+
+
+def _create_tools(cmd: CreateSearchAgentCommand) -> list[Callable]:
+    """Tools without per-execution state, which is passed by `_create_tool_contexts` at invocation time."""
     tools = []
-    reddit_clients = []
+
+    for search_type in sorted(cmd.search_types):
+        if search_type == "reddit":
+            tools.append(create_reddit_search_tool())
+
+    return tools
+
+
+async def _create_tool_contexts(cfg: Config, cmd: CreateSearchAgentCommand, search_cache: SearchResultCache,
+                                resources: AsyncExitStack) -> dict[str, Any]:
+    tool_contexts = {}
 
     for search_type in cmd.search_types:
         if search_type == "reddit":
-            reddit = asyncpraw.Reddit(
-                client_id=cfg.reddit_config.client_id,
-                client_secret=cfg.reddit_config.client_secret,
-                user_agent=cfg.reddit_config.user_agent,
+            reddit = await _borrow_reddit_client(cfg, resources)
+            tool_contexts[REDDIT_SEARCH_CONTEXT] = create_reddit_search_context(
+                reddit,
+                search_concurrency=cfg.reddit_config.search_concurrency,
+                comment_sampling=CommentSampling(
+                    max_depth=cfg.reddit_config.comments_max_depth,
+                    max_breadth=cfg.reddit_config.comments_max_breadth,
+                    replace_more_limit=cfg.reddit_config.comments_replace_more_limit,
+                ),
+                submission_cache=cfg.submission_cache,
+                search_caches=[search_cache] + ([cfg.search_cache] if cfg.search_cache is not None else []),
+                compact_seen_submissions=cfg.reddit_config.compact_seen_submissions,
+                max_result_tokens=cmd.max_result_tokens,
+                max_calls=cmd.max_reddit_calls,
             )
-            reddit_clients.append(reddit)
-            tools.extend(create_reddit_tools(reddit))
 
-    return tools, reddit_clients
+    return tool_contexts
+
+
+async def _borrow_reddit_client(cfg: Config, resources: AsyncExitStack) -> asyncpraw.Reddit:
+    if cfg.reddit_pool is not None:
+        return await resources.enter_async_context(cfg.reddit_pool.acquire())
+
+    # Requests of a client created per execution still go through the shared rate limit
+    governor_kwargs = {}
+    if cfg.rate_limit_governor is not None:
+        governor_kwargs = {"requestor_class": GovernedRequestor,
+                           "requestor_kwargs": {"governor": cfg.rate_limit_governor}}
+    reddit = asyncpraw.Reddit(
+        client_id=cfg.reddit_config.client_id,
+        client_secret=cfg.reddit_config.client_secret,
+        user_agent=cfg.reddit_config.user_agent,
+        **governor_kwargs,
+    )
+    resources.push_async_callback(reddit.close)
+    return reddit
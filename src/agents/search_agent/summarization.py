@@ -0,0 +1,88 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage, AnyMessage, HumanMessage, RemoveMessage, SystemMessage, ToolMessage,
+)
+from langchain_core.messages.utils import count_tokens_approximately
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+
+logger = logging.getLogger("uvicorn")
+
+SUMMARIZED = "summarized"
+
+
+def create_summarization_hook(llm: BaseChatModel, summary_prompt: str, max_tokens: int,
+                              max_summary_tokens: int) -> Callable[[dict[str, Any]], Awaitable[dict[str, Any]]]:
+    """
+    Create a `pre_model_hook` keeping the message history around `max_tokens`.
+
+    Once the history exceeds `max_tokens`, the oldest tool results are replaced by summaries of at
+    most `max_summary_tokens`, as many as needed to get back under the budget. Tool results of the
+    latest turn are never summarized since the model has not seen them yet. Summaries keep the
+    id and tool call id of the original message, so tool calls stay paired with their results,
+    and are marked so they are not summarized again.
+    """
+    summarizer = llm.bind(max_tokens=max_summary_tokens)
+
+    async def summarize_history(state: dict[str, Any]) -> dict[str, Any]:
+        messages: list[AnyMessage] = state["messages"]
+        total_tokens = count_tokens_approximately(messages)
+        if total_tokens <= max_tokens:
+            return {}
+
+        candidates = []
+        for message in _previous_tool_results(messages):
+            if total_tokens <= max_tokens:
+                break
+            message_tokens = count_tokens_approximately([message])
+            if message_tokens <= max_summary_tokens:
+                continue
+            candidates.append(message)
+            total_tokens -= message_tokens - max_summary_tokens
+
+        if not candidates:
+            return {}
+
+        summaries = await asyncio.gather(*(_summarize(summarizer, summary_prompt, m) for m in candidates))
+        replaced = {s.id: s for s in summaries if s is not None}
+        logger.info("Summarized tool results: summarized = %d, history_tokens = %d, max_tokens = %d",
+                    len(replaced), count_tokens_approximately(messages), max_tokens)
+        if not replaced:
+            return {}
+
+        return {
+            "messages": [
+                RemoveMessage(id=REMOVE_ALL_MESSAGES),
+                *(replaced.get(m.id, m) for m in messages),
+            ]
+        }
+
+    return summarize_history
+
+
+def _previous_tool_results(messages: list[AnyMessage]) -> list[ToolMessage]:
+    """Tool results not summarized yet, oldest first, excluding the ones of the latest turn."""
+    last_turn = max((i for i, m in enumerate(messages) if isinstance(m, AIMessage)), default=0)
+    return [
+        m for m in messages[:last_turn]
+        if isinstance(m, ToolMessage) and not m.response_metadata.get(SUMMARIZED)
+    ]
+
+
+async def _summarize(summarizer, summary_prompt: str, message: ToolMessage) -> ToolMessage | None:
+    try:
+        summary = await summarizer.ainvoke([SystemMessage(summary_prompt), HumanMessage(message.text())])
+    except Exception:
+        logger.exception(f"Failed to summarize tool result: tool_call_id = {message.tool_call_id}")
+        return None
+
+    return ToolMessage(
+        id=message.id,
+        content=summary.text(),
+        name=message.name,
+        tool_call_id=message.tool_call_id,
+        response_metadata={SUMMARIZED: True},
+    )
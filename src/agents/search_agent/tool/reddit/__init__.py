@@ -1,8 +1,26 @@
-from .tools import create_reddit_search_tool, create_reddit_tools
+from .tools import (
+    create_reddit_search_tool, create_reddit_tools, create_reddit_search_context, RedditSearchContext,
+    REDDIT_SEARCH_CONTEXT,
+)
 from .models import SearchQuery
+from .comments import CommentSampling
+from .cache import SubmissionCache, FileSubmissionCache, SearchResultCache
+from .client_pool import RedditClientPool
+from .rate_limit import RateLimitGovernor, TokenBucketGovernor, GovernedRequestor
 
 __all__ = [
     "create_reddit_search_tool",
     "create_reddit_tools", 
-    "SearchQuery"
+    "create_reddit_search_context",
+    "RedditSearchContext",
+    "REDDIT_SEARCH_CONTEXT",
+    "SearchQuery",
+    "CommentSampling",
+    "SubmissionCache",
+    "FileSubmissionCache",
+    "SearchResultCache",
+    "RedditClientPool",
+    "RateLimitGovernor",
+    "TokenBucketGovernor",
+    "GovernedRequestor",
 ]
\ No newline at end of file
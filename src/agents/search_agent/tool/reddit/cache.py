@@ -0,0 +1,212 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from agents.atomic_file import write_text_atomic
+
+from .comments import CommentSampling, CommentStats
+from .models import RedditSubmissionComment, SearchQuery, SearchResult
+
+logger = logging.getLogger("uvicorn")
+
+_SUBMISSION_ID_PATTERN = re.compile(r"^[a-z0-9_]+$")
+
+
+class SubmissionCache(ABC):
+    """Cache of hydrated submission content (comment aggregates) keyed by submission id."""
+
+    @abstractmethod
+    async def get(self, submission_id: str, sampling: CommentSampling) -> CommentStats | None:
+        """Return cached comment stats collected with `sampling`, None if missing or expired."""
+        pass
+
+    @abstractmethod
+    async def put(self, submission_id: str, created_utc: float, sampling: CommentSampling,
+                  stats: CommentStats) -> None:
+        """Store comment stats of a submission created at `created_utc` (unix timestamp)."""
+        pass
+
+
+class FileSubmissionCache(SubmissionCache):
+    """
+    Submission cache stored as one JSON file per submission in a local folder.
+
+    The TTL of an entry grows with the submission age: comments of fresh submissions still change
+    quickly, while old threads are stable and can be served from the cache for a long time.
+
+    Once the cache holds more than `max_entries` submissions, the least recently used ones are
+    evicted. Expired entries which are never read again are removed this way too.
+    """
+
+    def __init__(self, folder: Path, min_ttl_seconds: float = 15 * 60, max_ttl_seconds: float = 7 * 24 * 3600,
+                 ttl_age_ratio: float = 0.1, max_entries: int = 50_000):
+        """
+        Args:
+            folder: Folder to store cache entries in, created if missing
+            min_ttl_seconds: TTL of the freshest submissions
+            max_ttl_seconds: TTL cap for old submissions
+            ttl_age_ratio: TTL as a fraction of the submission age at caching time
+            max_entries: Maximum number of stored submissions
+        """
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be >= 1: max_entries = {max_entries}")
+        self.folder = Path(folder)
+        self.min_ttl_seconds = min_ttl_seconds
+        self.max_ttl_seconds = max_ttl_seconds
+        self.ttl_age_ratio = ttl_age_ratio
+        self.max_entries = max_entries
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._size: int | None = None
+
+    def ttl_seconds(self, created_utc: float, now: float) -> float:
+        age_seconds = max(0.0, now - created_utc)
+        return min(self.max_ttl_seconds, max(self.min_ttl_seconds, age_seconds * self.ttl_age_ratio))
+
+    async def get(self, submission_id: str, sampling: CommentSampling) -> CommentStats | None:
+        return await asyncio.to_thread(self._get, submission_id, sampling)
+
+    async def put(self, submission_id: str, created_utc: float, sampling: CommentSampling,
+                  stats: CommentStats) -> None:
+        await asyncio.to_thread(self._put, submission_id, created_utc, sampling, stats)
+
+    def _get(self, submission_id: str, sampling: CommentSampling) -> CommentStats | None:
+        path = self._path(submission_id)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+
+        if entry["expires_at"] <= time.time():
+            path.unlink(missing_ok=True)
+            return None
+        if entry["sampling"] != asdict(sampling):
+            return None
+        # Mark as recently used for eviction
+        os.utime(path)
+        return _stats_from_dict(entry["stats"])
+
+    def _put(self, submission_id: str, created_utc: float, sampling: CommentSampling, stats: CommentStats) -> None:
+        now = time.time()
+        entry = {
+            "expires_at": now + self.ttl_seconds(created_utc, now),
+            "sampling": asdict(sampling),
+            "stats": _stats_to_dict(stats),
+        }
+        path = self._path(submission_id)
+        path.parent.mkdir(exist_ok=True)
+        existed = path.exists()
+        write_text_atomic(path, json.dumps(entry))
+
+        if not existed:
+            self._on_entry_added()
+
+    def _on_entry_added(self):
+        with self._lock:
+            if self._size is None:
+                self._size = sum(1 for _ in self.folder.glob("*/*.json"))
+            else:
+                self._size += 1
+            if self._size > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        """Remove the least recently used entries, leaving 10% of headroom to not evict on every put."""
+        entries = []
+        for path in self.folder.glob("*/*.json"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                pass
+        entries.sort()
+
+        target = int(self.max_entries * 0.9)
+        evicted = entries[:max(0, len(entries) - target)]
+        for _, path in evicted:
+            path.unlink(missing_ok=True)
+        self._size = len(entries) - len(evicted)
+        logger.info("Evicted submission cache entries: evicted = %d, size = %d", len(evicted), self._size)
+
+    def _path(self, submission_id: str) -> Path:
+        if not _SUBMISSION_ID_PATTERN.match(submission_id):
+            raise ValueError(f"Invalid submission id: submission_id = {submission_id}")
+        return self.folder / submission_id[:2] / f"{submission_id}.json"
+
+
+def _stats_to_dict(stats: CommentStats) -> dict[str, Any]:
+    return {
+        "count": stats.count,
+        "score_histogram": [[score, n] for score, n in stats.score_histogram.items()],
+        "top_comments": [c.model_dump() for c in stats.top_comments],
+    }
+
+
+def _stats_from_dict(data: dict[str, Any]) -> CommentStats:
+    return CommentStats(
+        count=data["count"],
+        score_histogram=Counter({score: n for score, n in data["score_histogram"]}),
+        top_comments=[RedditSubmissionComment.model_validate(c) for c in data["top_comments"]],
+    )
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    size: int
+
+
+class SearchResultCache:
+    """In-memory LRU cache of search results keyed by the canonical form of a `SearchQuery`."""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, SearchResult]] = OrderedDict()
+
+    def get(self, query: SearchQuery) -> SearchResult | None:
+        key = search_query_key(query)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, query: SearchQuery, result: SearchResult) -> None:
+        key = search_query_key(query)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> CacheStats:
+        return CacheStats(hits=self.hits, misses=self.misses, size=len(self._entries))
+
+
+def search_query_key(query: SearchQuery) -> str:
+    """
+    Canonical key of a search query.
+
+    Subreddit names, keywords and flairs are matched case-insensitively and keyword lists are
+    order-independent, so they are normalised; the unused legacy `filter_prompt` is ignored.
+    """
+    data = query.model_dump(exclude={"filter": {"filter_prompt"}})
+    data["subreddit"] = data["subreddit"].lower()
+    data["query"] = " ".join(data["query"].split())
+    for field_name in ("required_keywords", "excluded_keywords", "excluded_flairs"):
+        data["filter"][field_name] = sorted({value.lower() for value in data["filter"][field_name]})
+    return json.dumps(data, sort_keys=True)
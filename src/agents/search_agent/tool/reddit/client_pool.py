@@ -0,0 +1,58 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable
+
+import asyncpraw
+
+logger = logging.getLogger("uvicorn")
+
+
+class RedditClientPool:
+    """
+    Long-lived Reddit clients shared by all executions of a process.
+
+    Clients are created lazily inside the running event loop and returned to the pool after use,
+    so OAuth tokens (refreshed by asyncprawcore once expired) and aiohttp connections are reused
+    instead of being set up again for every execution.
+    """
+
+    def __init__(self, client_factory: Callable[[], asyncpraw.Reddit], size: int = 4):
+        """
+        Args:
+            client_factory: Creates a new Reddit client
+            size: Maximum number of clients, borrowers wait when all of them are in use
+        """
+        if size < 1:
+            raise ValueError(f"size must be >= 1: size = {size}")
+        self.client_factory = client_factory
+        self.size = size
+        self._idle: list[asyncpraw.Reddit] = []
+        self._semaphore = asyncio.Semaphore(size)
+        self._closed = False
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[asyncpraw.Reddit]:
+        """Borrow a client for the duration of the context."""
+        if self._closed:
+            raise RuntimeError("Reddit client pool is closed")
+
+        async with self._semaphore:
+            client = self._idle.pop() if self._idle else self.client_factory()
+            try:
+                yield client
+            finally:
+                if self._closed:
+                    await client.close()
+                else:
+                    self._idle.append(client)
+
+    async def close(self):
+        """Close idle clients, clients still in use are closed when they are returned."""
+        self._closed = True
+        idle, self._idle = self._idle, []
+        for client in idle:
+            try:
+                await client.close()
+            except Exception:
+                logger.exception("Failed to close Reddit client")
@@ -0,0 +1,94 @@
+import heapq
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from asyncpraw.models import Submission, Comment, MoreComments
+
+from .models import RedditSubmissionComment
+
+
+@dataclass(frozen=True)
+class CommentSampling:
+    """Bounds how much of a submission comment tree is expanded and walked."""
+
+    max_depth: int | None = None
+    """Deepest reply level to visit, 0 = top-level comments only. None walks the whole tree."""
+    max_breadth: int | None = None
+    """Maximum number of top-level comments and of replies visited per comment. None visits all."""
+    replace_more_limit: int = 0
+    """Number of "load more comments" stubs to resolve, each costs one request. 0 skips them."""
+    top_k: int = 5
+    """Number of highest scored comments kept for the result."""
+
+
+@dataclass
+class CommentStats:
+    """Comment aggregates of a submission computed in a single pass over its comment tree."""
+
+    count: int = 0
+    score_histogram: Counter[int] = field(default_factory=Counter)
+    top_comments: list[RedditSubmissionComment] = field(default_factory=list)
+    """Highest scored comments, sorted by score descending."""
+
+    def valuable_count(self, min_score: int) -> int:
+        return sum(n for score, n in self.score_histogram.items() if score >= min_score)
+
+    def valuable_ratio(self, min_score: int) -> float:
+        if self.count == 0:
+            return 0.0
+        return self.valuable_count(min_score) / self.count
+
+    def top_valuable(self, min_score: int) -> list[RedditSubmissionComment]:
+        """Top comments with score >= `min_score`. They are a prefix of `top_comments`."""
+        return [c for c in self.top_comments if c.score >= min_score]
+
+
+async def collect_comment_stats(submission: Submission, sampling: CommentSampling) -> CommentStats:
+    """
+    Walk the comment tree of a loaded submission breadth-first and aggregate it on the fly.
+
+    Count, score histogram and top-k (bounded heap) are computed together, so no flattened copy
+    of the tree is kept and the memory used besides the tree itself is O(top_k + breadth).
+    """
+    if sampling.replace_more_limit > 0:
+        await submission.comments.replace_more(limit=sampling.replace_more_limit)
+
+    stats = CommentStats()
+    # Min-heap of (score, -position, comment): on equal scores the later comment is evicted first,
+    # which keeps the same ordering as a stable sort of the comments in traversal order
+    top: list[tuple[int, int, Comment]] = []
+    queue: deque[tuple[Comment, int]] = deque(
+        (comment, 0) for comment in _sample(submission.comments, sampling.max_breadth)
+    )
+
+    while queue:
+        comment, depth = queue.popleft()
+        stats.count += 1
+        stats.score_histogram[comment.score] += 1
+
+        entry = (comment.score, -stats.count, comment)
+        if len(top) < sampling.top_k:
+            heapq.heappush(top, entry)
+        elif sampling.top_k > 0 and entry[:2] > top[0][:2]:
+            heapq.heapreplace(top, entry)
+
+        if sampling.max_depth is None or depth < sampling.max_depth:
+            queue.extend((reply, depth + 1) for reply in _sample(comment.replies, sampling.max_breadth))
+
+    stats.top_comments = [
+        RedditSubmissionComment(score=c.score, body=c.body)
+        for _, _, c in sorted(top, key=lambda e: e[:2], reverse=True)
+    ]
+    return stats
+
+
+def _sample(comments: Iterable[Comment | MoreComments], max_breadth: int | None) -> Iterable[Comment]:
+    sampled = 0
+    for comment in comments:
+        if max_breadth is not None and sampled >= max_breadth:
+            return
+        if isinstance(comment, MoreComments):
+            continue
+        sampled += 1
+        yield comment
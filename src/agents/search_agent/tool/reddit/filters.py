@@ -0,0 +1,153 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from enum import IntEnum
+
+from asyncpraw.models import Submission
+
+from .comments import CommentStats
+from .models import SubmissionFilter
+
+
+class FilterStage(IntEnum):
+    """Data a filter needs, ordered from the cheapest to the most expensive to obtain."""
+
+    LISTING = 1
+    """Fields already present on raw search results (score, title, selftext, flair, ...)."""
+    COMMENTS = 2
+    """Requires `submission.load()` and the `CommentStats` of the comment tree."""
+
+
+class SubmissionFilterStrategy(ABC):
+    """Abstract base class for submission filtering strategies."""
+
+    stage: FilterStage = FilterStage.LISTING
+    """Data this filter needs. Filters of a stage only run once that data is available."""
+
+    @abstractmethod
+    async def filter(self, submission: Submission, submission_filter: SubmissionFilter, **kwargs) -> bool:
+        """Return True if submission passes this filter, False otherwise."""
+        pass
+
+
+class ContentLengthFilter(SubmissionFilterStrategy):
+    """Filters submissions based on title and content length."""
+
+    async def filter(self, submission: Submission, submission_filter: SubmissionFilter, **kwargs) -> bool:
+        if submission.selftext is None or len(submission.selftext.strip()) == 0:
+            return False
+
+        if len(submission.selftext.strip()) < submission_filter.min_content_length:
+            return False
+
+        if len(submission.title.strip()) < submission_filter.min_title_length:
+            return False
+
+        return True
+
+
+class ScoreFilter(SubmissionFilterStrategy):
+    """Filters submissions based on score and upvote ratio."""
+
+    async def filter(self, submission: Submission, submission_filter: SubmissionFilter, **kwargs) -> bool:
+        if submission.score < submission_filter.min_score:
+            return False
+
+        if submission.upvote_ratio < submission_filter.min_upvote_ratio:
+            return False
+
+        return True
+
+
+class AgeFilter(SubmissionFilterStrategy):
+    """Filters submissions based on age."""
+
+    async def filter(self, submission: Submission, submission_filter: SubmissionFilter, **kwargs) -> bool:
+        submission_age_days = (datetime.now() - datetime.fromtimestamp(submission.created_utc)).days
+        return submission_age_days <= submission_filter.max_days_old
+
+
+class FlairFilter(SubmissionFilterStrategy):
+    """Filters submissions based on excluded flairs."""
+
+    async def filter(self, submission: Submission, submission_filter: SubmissionFilter, **kwargs) -> bool:
+        if submission.link_flair_text and submission_filter.excluded_flairs:
+            return not submission_filter.compiled.has_excluded_flair(submission.link_flair_text)
+        return True
+
+
+class KeywordFilter(SubmissionFilterStrategy):
+    """Filters submissions based on required and excluded keywords."""
+
+    async def filter(self, submission: Submission, submission_filter: SubmissionFilter, **kwargs) -> bool:
+        compiled_filter = submission_filter.compiled
+        if not compiled_filter.has_keywords:
+            return True
+
+        # Required and excluded keywords are checked in a single pass over the content
+        content_text = (submission.title + " " + submission.selftext).lower()
+        return compiled_filter.matches_keywords(content_text)
+
+
+class CommentCountFilter(SubmissionFilterStrategy):
+    """
+    Rejects submissions whose listed comment count is already below the minimum.
+
+    `num_comments` counts every comment ever posted, so it is an upper bound of what can be
+    downloaded: a submission rejected here would also be rejected by `CommentsFilter`.
+    """
+
+    async def filter(self, submission: Submission, submission_filter: SubmissionFilter, **kwargs) -> bool:
+        return submission.num_comments >= submission_filter.min_comments
+
+
+class CommentsFilter(SubmissionFilterStrategy):
+    """Filters submissions based on comments count and quality."""
+
+    stage = FilterStage.COMMENTS
+
+    async def filter(self, submission: Submission, submission_filter: SubmissionFilter, **kwargs) -> bool:
+        comment_stats: CommentStats = kwargs.get('comment_stats', CommentStats())
+
+        if comment_stats.count < submission_filter.min_comments:
+            return False
+
+        # Valuable comments ratio check
+        if comment_stats.count > 0:
+            valuable_ratio = comment_stats.valuable_ratio(submission_filter.min_comment_score_threshold)
+            if valuable_ratio < submission_filter.min_valuable_comments_ratio:
+                return False
+
+        return True
+
+
+class SubmissionFilterManager:
+    """Manages and applies multiple filter strategies, stage by stage."""
+
+    def __init__(self):
+        self.filters = [
+            ScoreFilter(),
+            AgeFilter(),
+            CommentCountFilter(),
+            FlairFilter(),
+            ContentLengthFilter(),
+            KeywordFilter(),
+            CommentsFilter(),
+        ]
+
+    async def apply_filters(self, submission: Submission, submission_filter: SubmissionFilter, stage: FilterStage,
+                            **kwargs) -> bool:
+        """
+        Apply the filters of a single stage to a submission. Returns True if all of them pass.
+
+        Args:
+            submission: Submission to check, it must provide the data required by `stage`
+            submission_filter: Filter parameters of the search query
+            stage: Stage which filters are applied
+            **kwargs: Stage data passed to the filters, e.g. `comment_stats` for `FilterStage.COMMENTS`
+        """
+        for filter_strategy in self.filters:
+            if filter_strategy.stage != stage:
+                continue
+            if not await filter_strategy.filter(submission, submission_filter, **kwargs):
+                return False
+        return True
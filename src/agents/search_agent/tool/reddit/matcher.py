@@ -0,0 +1,57 @@
+import re
+from typing import Iterable
+
+
+class KeywordMatcher:
+    """
+    Finds which of a set of keywords occur as substrings of a lower-cased text in a single pass.
+
+    All keywords are combined into one regex alternation inside a lookahead, so overlapping
+    occurrences are found too. At each position the longest keyword wins, and every shorter
+    keyword it contains is reported with it: a keyword starting at the same position is always
+    a prefix of the longest one.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        unique_keywords = {keyword.lower() for keyword in keywords}
+        # An empty keyword is a substring of every text
+        self._always_found = frozenset({""} & unique_keywords)
+        self.keywords = sorted(unique_keywords - {""}, key=len, reverse=True)
+        self._contained = {
+            keyword: frozenset(other for other in self.keywords if other in keyword)
+            for keyword in self.keywords
+        }
+        self._pattern = None
+        if self.keywords:
+            self._pattern = re.compile("(?=(" + "|".join(re.escape(keyword) for keyword in self.keywords) + "))")
+
+    def find(self, text: str) -> set[str]:
+        """Return the keywords found in `text`, which must already be lower-cased."""
+        found = set(self._always_found)
+        if self._pattern is not None:
+            for match in self._pattern.finditer(text):
+                found |= self._contained[match.group(1)]
+        return found
+
+
+class CompiledSubmissionFilter:
+    """Keyword and flair checks of a `SubmissionFilter` precompiled into single-pass matchers."""
+
+    def __init__(self, required_keywords: Iterable[str], excluded_keywords: Iterable[str],
+                 excluded_flairs: Iterable[str]):
+        self.required_keywords = frozenset(keyword.lower() for keyword in required_keywords)
+        self.excluded_keywords = frozenset(keyword.lower() for keyword in excluded_keywords)
+        self._keywords = KeywordMatcher(self.required_keywords | self.excluded_keywords)
+        self._excluded_flairs = KeywordMatcher(excluded_flairs)
+
+    @property
+    def has_keywords(self) -> bool:
+        return bool(self.required_keywords or self.excluded_keywords)
+
+    def matches_keywords(self, text: str) -> bool:
+        """True if lower-cased `text` contains all required keywords and none of the excluded ones."""
+        found = self._keywords.find(text)
+        return self.required_keywords <= found and not (self.excluded_keywords & found)
+
+    def has_excluded_flair(self, flair: str) -> bool:
+        return bool(self._excluded_flairs.find(flair.lower()))
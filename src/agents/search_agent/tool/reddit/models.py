@@ -1,7 +1,10 @@
 from datetime import datetime
+from functools import cached_property
 from typing import Literal
 from pydantic import BaseModel, Field, ConfigDict
 
+from .matcher import CompiledSubmissionFilter
+
 
 class SubmissionFilter(BaseModel):
     min_score: int = Field(
@@ -39,6 +42,11 @@ class SubmissionFilter(BaseModel):
         description="Legacy field - kept for backward compatibility but not used in heuristic filtering",
         examples=["python"])
 
+    @cached_property
+    def compiled(self) -> CompiledSubmissionFilter:
+        """Keyword and flair matchers, compiled once per filter instance."""
+        return CompiledSubmissionFilter(self.required_keywords, self.excluded_keywords, self.excluded_flairs)
+
 
 class SearchQuery(BaseModel):
     subreddit: str = Field(description="The name of the subreddit", examples=["python", "IndieHackers"])
@@ -83,3 +91,7 @@ class SearchResult(BaseModel):
         default=[],
         description="List of submissions matching the query"
     )
+    seen_submission_ids: list[str] = Field(
+        default=[],
+        description="IDs of matching submissions already returned by an earlier search of the same run"
+    )
@@ -0,0 +1,98 @@
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Mapping
+
+from aiohttp import ClientResponse
+from asyncprawcore import Requestor
+
+logger = logging.getLogger("uvicorn")
+
+
+class RateLimitGovernor(ABC):
+    """Rate limit shared by every Reddit client using the same credentials."""
+
+    @abstractmethod
+    async def acquire(self) -> None:
+        """Wait until one more request may be sent."""
+        pass
+
+    @abstractmethod
+    async def observe(self, remaining: float, reset_seconds: float) -> None:
+        """Feed the quota reported by Reddit in the `X-Ratelimit-*` response headers."""
+        pass
+
+
+class TokenBucketGovernor(RateLimitGovernor):
+    """
+    In-process token bucket.
+
+    Every request reserves a token right away and sleeps off the debt if the bucket is empty,
+    so concurrent callers are spaced out at the refill rate without a lock. Reddit headers
+    re-target the refill rate to spread the remaining quota evenly until the window resets.
+    """
+
+    def __init__(self, requests_per_minute: float = 100, burst: float = 10,
+                 max_requests_per_second: float = 10):
+        """
+        Args:
+            requests_per_minute: Refill rate used until Reddit reports the actual quota
+            burst: Bucket capacity, the number of requests that may be sent back to back
+            max_requests_per_second: Upper bound of the refill rate derived from headers
+        """
+        self.burst = burst
+        self.max_rate = max_requests_per_second
+        self.rate = requests_per_minute / 60
+        self._tokens = burst
+        self._updated_at = time.monotonic()
+
+    async def acquire(self) -> None:
+        self._refill()
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+
+    async def observe(self, remaining: float, reset_seconds: float) -> None:
+        self._refill()
+        self._tokens = min(self._tokens, remaining)
+        self.rate = target_rate(remaining, reset_seconds, self.max_rate)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+
+def target_rate(remaining: float, reset_seconds: float, max_rate: float) -> float:
+    """Requests per second spreading `remaining` requests evenly until the quota window resets."""
+    # Keep a small positive rate so an exhausted quota delays requests until the reset instead of forever
+    return min(max_rate, max(remaining, 1) / max(reset_seconds, 1))
+
+
+def parse_rate_limit_headers(headers: Mapping[str, str]) -> tuple[float, float] | None:
+    """Return (remaining, reset_seconds) from Reddit response headers, None if they are missing."""
+    try:
+        return float(headers["x-ratelimit-remaining"]), float(headers["x-ratelimit-reset"])
+    except (KeyError, ValueError):
+        return None
+
+
+class GovernedRequestor(Requestor):
+    """asyncprawcore requestor which sends every request through a shared `RateLimitGovernor`."""
+
+    def __init__(self, *args: Any, governor: RateLimitGovernor, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.governor = governor
+
+    async def request(self, *args: Any, timeout: float | None = None, **kwargs: Any) -> ClientResponse:
+        await self.governor.acquire()
+        response = await super().request(*args, timeout=timeout, **kwargs)
+
+        rate_limit = parse_rate_limit_headers(response.headers)
+        if rate_limit is not None:
+            try:
+                await self.governor.observe(*rate_limit)
+            except Exception:
+                logger.exception("Failed to update Reddit rate limit")
+        return response
@@ -0,0 +1,68 @@
+import json
+import logging
+from typing import Any
+
+from .models import SearchResult, RedditSubmission
+
+logger = logging.getLogger("uvicorn")
+
+# Rough size of a token for English text, good enough to keep tool results within a budget
+CHARS_PER_TOKEN = 4
+# Selftext and comments are never cut shorter than this, even if the budget is exceeded
+MIN_TEXT_CHARS = 100
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def serialize_search_result(result: SearchResult, max_tokens: int | None = None) -> str:
+    """
+    Serialize a search result into compact JSON for the LLM.
+
+    Fields the agent does not use are dropped and comments are `[score, body]` pairs. If the JSON
+    exceeds `max_tokens`, selftexts and comment bodies are truncated to caps which are halved
+    until it fits or they reach `MIN_TEXT_CHARS`, so the same result always serializes the same way.
+    A result which exceeds `max_tokens` even at `MIN_TEXT_CHARS` is returned as is and logged.
+    """
+    text_cap = max((len(s.selftext) for s in result.submissions), default=0)
+    comment_cap = max((len(c.body) for s in result.submissions for c in s.comments), default=0)
+
+    serialized = _dumps(result, text_cap, comment_cap)
+    while max_tokens is not None and estimate_tokens(serialized) > max_tokens:
+        if text_cap <= MIN_TEXT_CHARS and comment_cap <= MIN_TEXT_CHARS:
+            logger.warning("Search result exceeds token budget at minimal text length: subreddit = %s, "
+                           "tokens = %d, max_tokens = %d", result.subreddit, estimate_tokens(serialized), max_tokens)
+            break
+        text_cap = max(MIN_TEXT_CHARS, text_cap // 2)
+        comment_cap = max(MIN_TEXT_CHARS, comment_cap // 2)
+        serialized = _dumps(result, text_cap, comment_cap)
+    return serialized
+
+
+def _dumps(result: SearchResult, text_cap: int, comment_cap: int) -> str:
+    compact: dict[str, Any] = {
+        "subreddit": result.subreddit,
+        "submissions": [_compact_submission(s, text_cap, comment_cap) for s in result.submissions],
+    }
+    if result.seen_submission_ids:
+        compact["seen_submission_ids"] = result.seen_submission_ids
+    return json.dumps(compact, ensure_ascii=False, separators=(",", ":"))
+
+
+def _compact_submission(submission: RedditSubmission, text_cap: int, comment_cap: int) -> dict[str, Any]:
+    return {
+        "id": submission.id,
+        "title": submission.title,
+        "text": _truncate(submission.selftext, text_cap),
+        "score": submission.score,
+        "num_comments": submission.num_comments,
+        "created": submission.created_utc.date().isoformat(),
+        "comments": [[c.score, _truncate(c.body, comment_cap)] for c in submission.comments],
+    }
+
+
+def _truncate(text: str, cap: int) -> str:
+    if len(text) <= cap:
+        return text
+    return text[:cap].rstrip() + "…"
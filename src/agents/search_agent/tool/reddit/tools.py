@@ -1,149 +1,76 @@
 
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+
 import asyncpraw
-from asyncpraw.models import Submission, Comment
-from .models import SearchQuery, RedditSubmission, SearchResult, RedditSubmissionComment, SubmissionFilter
+from asyncpraw.models import Submission
+from .cache import SubmissionCache, SearchResultCache
+from .comments import CommentSampling, CommentStats, collect_comment_stats
+from .filters import SubmissionFilterManager, FilterStage
+from .models import SearchQuery, RedditSubmission, SearchResult
+from .serialization import serialize_search_result
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
 from datetime import datetime
-from typing import Callable
-from abc import ABC, abstractmethod
+from typing import Callable, Sequence
 import logging
 
 logger = logging.getLogger("uvicorn")
 
-class SubmissionFilterStrategy(ABC):
-    """Abstract base class for submission filtering strategies."""
-    
-    @abstractmethod
-    async def filter(self, submission: Submission, submission_filter: SubmissionFilter, **kwargs) -> bool:
-        """Return True if submission passes this filter, False otherwise."""
-        pass
-
-
-class ContentLengthFilter(SubmissionFilterStrategy):
-    """Filters submissions based on title and content length."""
-    
-    async def filter(self, submission: Submission, submission_filter: SubmissionFilter, **kwargs) -> bool:
-        if submission.selftext is None or len(submission.selftext.strip()) == 0:
-            return False
-        
-        if len(submission.selftext.strip()) < submission_filter.min_content_length:
-            return False
-            
-        if len(submission.title.strip()) < submission_filter.min_title_length:
-            return False
-            
-        return True
-
-
-class ScoreFilter(SubmissionFilterStrategy):
-    """Filters submissions based on score and upvote ratio."""
-    
-    async def filter(self, submission: Submission, submission_filter: SubmissionFilter, **kwargs) -> bool:
-        if submission.score < submission_filter.min_score:
-            return False
-            
-        if submission.upvote_ratio < submission_filter.min_upvote_ratio:
-            return False
-            
-        return True
-
-
-class AgeFilter(SubmissionFilterStrategy):
-    """Filters submissions based on age."""
-    
-    async def filter(self, submission: Submission, submission_filter: SubmissionFilter, **kwargs) -> bool:
-        submission_age_days = (datetime.now() - datetime.fromtimestamp(submission.created_utc)).days
-        return submission_age_days <= submission_filter.max_days_old
-
-
-class FlairFilter(SubmissionFilterStrategy):
-    """Filters submissions based on excluded flairs."""
-    
-    async def filter(self, submission: Submission, submission_filter: SubmissionFilter, **kwargs) -> bool:
-        if submission.link_flair_text and submission_filter.excluded_flairs:
-            return not any(flair.lower() in submission.link_flair_text.lower() 
-                          for flair in submission_filter.excluded_flairs)
-        return True
-
-
-class KeywordFilter(SubmissionFilterStrategy):
-    """Filters submissions based on required and excluded keywords."""
-    
-    async def filter(self, submission: Submission, submission_filter: SubmissionFilter, **kwargs) -> bool:
-        content_text = (submission.title + " " + submission.selftext).lower()
-        
-        # Required keywords check
-        if submission_filter.required_keywords:
-            if not all(keyword.lower() in content_text for keyword in submission_filter.required_keywords):
-                return False
-                
-        # Excluded keywords check
-        if submission_filter.excluded_keywords:
-            if any(keyword.lower() in content_text for keyword in submission_filter.excluded_keywords):
-                return False
-                
-        return True
-
-
-class CommentsFilter(SubmissionFilterStrategy):
-    """Filters submissions based on comments count and quality."""
-    
-    async def filter(self, submission: Submission, submission_filter: SubmissionFilter, **kwargs) -> bool:
-        comments = kwargs.get('comments', [])
-        
-        if len(comments) < submission_filter.min_comments:
-            return False
-
-        # Valuable comments ratio check
-        valuable_comments = [c for c in comments if c.score >= submission_filter.min_comment_score_threshold]
-        if len(comments) > 0:
-            valuable_ratio = len(valuable_comments) / len(comments)
-            if valuable_ratio < submission_filter.min_valuable_comments_ratio:
-                return False
-                
-        return True
-
-
-class SubmissionFilterManager:
-    """Manages and applies multiple filter strategies."""
-    
-    def __init__(self):
-        self.filters = [
-            ContentLengthFilter(),
-            ScoreFilter(),
-            AgeFilter(),
-            FlairFilter(),
-            KeywordFilter(),
-            CommentsFilter(),
-        ]
-    
-    async def apply_filters(self, submission: Submission, submission_filter: SubmissionFilter, comments: list) -> bool:
-        """Apply all filters to a submission. Returns True if all filters pass."""
-        for filter_strategy in self.filters:
-            if not await filter_strategy.filter(submission, submission_filter, comments=comments):
-                return False
-        return True
-
-
 class RedditToolsService:
 
-    def __init__(self, reddit: asyncpraw.Reddit):
+    def __init__(self, reddit: asyncpraw.Reddit, search_concurrency: int = 1,
+                 comment_sampling: CommentSampling | None = None,
+                 submission_cache: SubmissionCache | None = None,
+                 compact_seen_submissions: bool = False):
+        """
+        Args:
+            reddit: Reddit client used for all requests
+            search_concurrency: Maximum number of search hits hydrated (loaded, comments
+                downloaded and filtered) in parallel. 1 keeps the strictly sequential behaviour.
+            comment_sampling: Bounds of the comment tree expansion, the whole loaded tree by default
+            submission_cache: Cache consulted before loading a submission and its comments
+            compact_seen_submissions: Return submissions already returned by an earlier search of
+                this service only as ids in `SearchResult.seen_submission_ids`
+        """
+        if search_concurrency < 1:
+            raise ValueError(f"search_concurrency must be >= 1: search_concurrency = {search_concurrency}")
         self.reddit = reddit
+        self.search_concurrency = search_concurrency
+        self.comment_sampling = comment_sampling or CommentSampling()
+        self.submission_cache = submission_cache
+        self.compact_seen_submissions = compact_seen_submissions
         self.filter_manager = SubmissionFilterManager()
+        # Per-service (i.e. per-execution) registry of hydrated submissions and of submissions
+        # already handed out, searches of one run keep returning the same posts
+        self.seen: dict[str, CommentStats] = {}
+        self.returned_ids: set[str] = set()
+        self.search_calls = 0
 
     async def search(self, query: SearchQuery) -> SearchResult:
         logger.info(f"Searching reddit: query = {query}")
+        self.search_calls += 1
         subreddit = await self.reddit.subreddit(query.subreddit)
         submissions = subreddit.search(query=query.query, sort=query.sort, time_filter=query.time_filter)
 
         res_submissions = []
+        # Hydration tasks in search result order. At most `search_concurrency` are in flight, and
+        # results are consumed from the head so the output order matches the sequential version.
+        in_flight: deque[asyncio.Task[RedditSubmission | None]] = deque()
 
-        async for submission in submissions:
-            if len(res_submissions) >= query.limit:
-                break
-            summarized_submission = await self.__submission_matches(query, submission)
-            if summarized_submission:
-                res_submissions.append(summarized_submission)
+        try:
+            async for submission in submissions:
+                if len(res_submissions) >= query.limit:
+                    break
+                in_flight.append(asyncio.create_task(self.__submission_matches(query, submission)))
+                if len(in_flight) >= self.search_concurrency:
+                    await self.__collect(in_flight.popleft(), res_submissions)
+
+            while in_flight and len(res_submissions) < query.limit:
+                await self.__collect(in_flight.popleft(), res_submissions)
+        finally:
+            await self.__cancel(in_flight)
 
         logger.info(f"Found Reddit submissions: submissions = {len(res_submissions)}")
 
@@ -152,57 +79,150 @@ class RedditToolsService:
             submissions=res_submissions,
         )
 
+    def compact(self, result: SearchResult) -> SearchResult:
+        """
+        Replace submissions returned by earlier searches with their ids and remember the new ones.
+
+        Applied to every result handed out, including memoized ones, so search result caches keep
+        the full submissions.
+        """
+        if not self.compact_seen_submissions:
+            return result
+
+        submissions = []
+        seen_submission_ids = []
+        for submission in result.submissions:
+            if submission.id in self.returned_ids:
+                seen_submission_ids.append(submission.id)
+            else:
+                self.returned_ids.add(submission.id)
+                submissions.append(submission)
+
+        if not seen_submission_ids:
+            return result
+        logger.info(f"Compacted already returned Reddit submissions: submissions = {len(seen_submission_ids)}")
+        return result.model_copy(update={
+            "submissions": submissions,
+            "seen_submission_ids": result.seen_submission_ids + seen_submission_ids,
+        })
+
+    @staticmethod
+    async def __collect(task: asyncio.Task[RedditSubmission | None], res_submissions: list[RedditSubmission]):
+        summarized_submission = await task
+        if summarized_submission:
+            res_submissions.append(summarized_submission)
+
+    @staticmethod
+    async def __cancel(tasks: deque[asyncio.Task[RedditSubmission | None]]):
+        """Cancel hydration tasks which are not needed anymore (limit reached or search failed)."""
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        tasks.clear()
+
     async def __submission_matches(self, query: SearchQuery, submission: Submission) -> RedditSubmission | None:
-        # Load submission data first
-        await submission.load()
-        
-        # Download comments early as they're needed for filtering
-        comments = await self.__download_comments(submission)
-        
-        # Apply all filters using the strategy pattern
-        if not await self.filter_manager.apply_filters(submission, query.filter, comments):
+        # Reject on fields already present on the search listing before paying for any request
+        if not await self.filter_manager.apply_filters(submission, query.filter, FilterStage.LISTING):
             return None
 
-        # If we reach here, all filters passed - create and return the result
-        valuable_comments = [c for c in comments if c.score >= query.filter.min_comment_score_threshold]
-        top_5_comments = sorted(valuable_comments, key=lambda c: c.score, reverse=True)[:5]
+        # Only survivors are loaded together with their comment tree, unless it is cached
+        comment_stats = await self.__hydrate(submission)
+
+        if not await self.filter_manager.apply_filters(submission, query.filter, FilterStage.COMMENTS,
+                                                       comment_stats=comment_stats):
+            return None
 
+        # If we reach here, all filters passed - create and return the result
         return RedditSubmission(
             id=submission.id,
             subreddit=query.subreddit,
             title=submission.title,
             selftext=submission.selftext,
-            comments=[RedditSubmissionComment(score=c.score, body=c.body) for c in top_5_comments],
+            comments=comment_stats.top_valuable(query.filter.min_comment_score_threshold),
             score=submission.score,
             num_comments=submission.num_comments,
             created_utc=datetime.fromtimestamp(submission.created_utc),
             upvote_ratio=submission.upvote_ratio
         )
 
-    @staticmethod
-    async def __download_comments(submission: Submission) -> list[Comment]:
+    async def __hydrate(self, submission: Submission) -> CommentStats:
+        seen = self.seen.get(submission.id)
+        if seen is not None:
+            return seen
+
+        comment_stats = await self.__load(submission)
+        self.seen[submission.id] = comment_stats
+        return comment_stats
+
+    async def __load(self, submission: Submission) -> CommentStats:
+        if self.submission_cache is not None:
+            try:
+                cached = await self.submission_cache.get(submission.id, self.comment_sampling)
+                if cached is not None:
+                    return cached
+            except Exception:
+                logger.exception(f"Failed to read cached submission {submission.id}")
+
+        await submission.load()
+        comment_stats = await self.__download_comments(submission)
+        if comment_stats is None:
+            return CommentStats()
+
+        if self.submission_cache is not None:
+            try:
+                await self.submission_cache.put(submission.id, submission.created_utc, self.comment_sampling,
+                                                comment_stats)
+            except Exception:
+                logger.exception(f"Failed to cache submission {submission.id}")
+        return comment_stats
+
+    async def __download_comments(self, submission: Submission) -> CommentStats | None:
         try:
-            all_comments = []
-            for comment in submission.comments.list():
-                if isinstance(comment, Comment):
-                    all_comments.append(comment)
-            
-            return all_comments
-            
+            return await collect_comment_stats(submission, self.comment_sampling)
         except Exception:
             logger.exception(f"Failed to download comments for submission {submission.id}")
-            return []
+            return None
+
+
+# Key of the `RedditSearchContext` in `RunnableConfig["configurable"]`
+REDDIT_SEARCH_CONTEXT = "reddit_search_context"
 
 
-def create_reddit_search_tool(reddit_service: RedditToolsService) -> Callable:
-    """Create a LangGraph-compatible tool for Reddit search."""
+@dataclass(frozen=True)
+class RedditSearchContext:
+    """Per-execution state of the `reddit_search` tool."""
+    service: RedditToolsService
+    search_caches: Sequence[SearchResultCache] = ()
+    max_result_tokens: int | None = None
+    # Maximum number of searches sent to Reddit, memoized results don't count
+    max_calls: int | None = None
+
+
+def create_reddit_search_tool(reddit_service: RedditToolsService | None = None,
+                              search_caches: Sequence[SearchResultCache] = (),
+                              max_result_tokens: int | None = None) -> Callable:
+    """
+    Create a LangGraph-compatible tool for Reddit search.
+
+    Results are memoized in `search_caches`, looked up in order (e.g. per-execution cache first,
+    then a process-wide one). A hit in a later cache is copied into the earlier ones.
+    Each result is serialized compactly and truncated to fit `max_result_tokens` if set.
+
+    A `RedditSearchContext` passed under `REDDIT_SEARCH_CONTEXT` in `RunnableConfig["configurable"]`
+    takes precedence over the arguments, so a tool created without `reddit_service` can be shared by
+    graphs of many executions.
+    """
+    default_context = None
+    if reddit_service is not None:
+        default_context = RedditSearchContext(reddit_service, search_caches, max_result_tokens)
     
     @tool("reddit_search")
     async def reddit_search(
-        query: SearchQuery
+        query: SearchQuery,
+        config: RunnableConfig,
     ) -> str:
         """
-        Search Reddit for submissions matching detailed criteria and serialize to JSON.
+        Search Reddit for submissions matching detailed criteria and serialize to compact JSON.
 
         Steps:
           1. Query the specified subreddit with `query.query`, `query.sort`, and `query.time_filter`.
@@ -213,10 +233,14 @@ def create_reddit_search_tool(reddit_service: RedditToolsService) -> Callable:
              • Age ≤ `query.filter.max_days_old` days
              • No excluded flairs if `query.filter.excluded_flairs` is set
              • Presence of all `required_keywords` and absence of any `excluded_keywords`
-          3. Download all comments, require ≥ `query.filter.min_comments`
+          3. Walk the comment tree (bounded by the configured sampling), require ≥ `query.filter.min_comments`
           4. Compute ratio of comments ≥ `min_comment_score_threshold`, require ≥ `min_valuable_comments_ratio`
-          5. Select top 5 comments by score and include their `score` and `body`
+          5. Select top 5 comments by score and include them as `[score, body]` pairs
           6. Stop once `query.limit` valid submissions are collected
+          7. Submissions already returned by an earlier `reddit_search` call of this run may be listed
+             only by id in `seen_submission_ids`, refer to the earlier result for their content
+          8. Long texts and comments may be truncated (ending with "…") to keep the result small
+          9. Once the search budget of the run is exhausted, a plain text notice is returned instead
 
         Args:
             query (SearchQuery):
@@ -228,35 +252,76 @@ def create_reddit_search_tool(reddit_service: RedditToolsService) -> Callable:
                 - filter (SubmissionFilter): detailed filter parameters
 
         Returns:
-            str: A JSON string matching the `SearchResult` model with fields:
+            str: A JSON string with fields:
                 {
                   "subreddit": str,
                   "submissions": [
                     {
                       "id": str,
                       "title": str,
-                      "selftext": str,
-                      "comments": [{"score": int, "body": str}, …],
+                      "text": str,
                       "score": int,
                       "num_comments": int,
-                      "created_utc": "2025-07-20T14:23:00Z",
-                      "upvote_ratio": float
+                      "created": "2025-07-20",
+                      "comments": [[int, str], …]
                     },
                     …
-                  ]
+                  ],
+                  "seen_submission_ids": [str, …]
                 }
         """
+        context = config.get("configurable", {}).get(REDDIT_SEARCH_CONTEXT, default_context)
+        if context is None:
+            raise ValueError(f"Reddit search context is not configured: key = {REDDIT_SEARCH_CONTEXT}")
+
         try:
-            result = await reddit_service.search(query)
-            return result.model_dump_json()
+            result = _memoized_search_result(context.search_caches, query)
+            if result is None:
+                if context.max_calls is not None and context.service.search_calls >= context.max_calls:
+                    logger.info(f"Reddit search budget exhausted: max_calls = {context.max_calls}")
+                    return (f"Reddit search budget of {context.max_calls} searches is exhausted. "
+                            "Do not search anymore, return the final result based on the submissions found so far.")
+                result = await context.service.search(query)
+                for search_cache in context.search_caches:
+                    search_cache.put(query, result)
+            return serialize_search_result(context.service.compact(result), context.max_result_tokens)
         except Exception as e:
             logger.exception(f"Failed to get Reddit search results: query = {query}")
             raise e
     
     return reddit_search
 
-def create_reddit_tools(reddit: asyncpraw.Reddit) -> list[Callable]:
-    svc = RedditToolsService(reddit)
+
+def _memoized_search_result(search_caches: Sequence[SearchResultCache], query: SearchQuery) -> SearchResult | None:
+    for i, search_cache in enumerate(search_caches):
+        result = search_cache.get(query)
+        if result is not None:
+            logger.info(f"Reddit search cache hit: query = {query}")
+            for earlier_cache in search_caches[:i]:
+                earlier_cache.put(query, result)
+            return result
+    return None
+
+def create_reddit_search_context(reddit: asyncpraw.Reddit, search_concurrency: int = 1,
+                                 comment_sampling: CommentSampling | None = None,
+                                 submission_cache: SubmissionCache | None = None,
+                                 search_caches: Sequence[SearchResultCache] = (),
+                                 compact_seen_submissions: bool = False,
+                                 max_result_tokens: int | None = None,
+                                 max_calls: int | None = None) -> RedditSearchContext:
+    svc = RedditToolsService(reddit, search_concurrency=search_concurrency, comment_sampling=comment_sampling,
+                             submission_cache=submission_cache, compact_seen_submissions=compact_seen_submissions)
+    return RedditSearchContext(svc, search_caches, max_result_tokens, max_calls)
+
+
+def create_reddit_tools(reddit: asyncpraw.Reddit, search_concurrency: int = 1,
+                        comment_sampling: CommentSampling | None = None,
+                        submission_cache: SubmissionCache | None = None,
+                        search_caches: Sequence[SearchResultCache] = (),
+                        compact_seen_submissions: bool = False,
+                        max_result_tokens: int | None = None) -> list[Callable]:
+    context = create_reddit_search_context(reddit, search_concurrency, comment_sampling, submission_cache,
+                                           search_caches, compact_seen_submissions, max_result_tokens)
     return [
-        create_reddit_search_tool(svc),
+        create_reddit_search_tool(context.service, context.search_caches, context.max_result_tokens),
     ]
\ No newline at end of file
@@ -0,0 +1,137 @@
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Any
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+
+@dataclass
+class LLMCallUsage:
+    node: str | None
+    model: str | None
+    input_tokens: int
+    output_tokens: int
+    cache_read_tokens: int
+    latency_ms: int
+    error: bool = False
+
+
+@dataclass
+class ToolCallUsage:
+    name: str
+    latency_ms: int
+    error: bool = False
+
+
+class UsageLedger(BaseCallbackHandler):
+    """
+    Callback handler collecting token usage and latency of every LLM and tool call of a run.
+
+    Pass it in `RunnableConfig["callbacks"]`, `to_dict()` returns the compact ledger stored
+    with the execution.
+    """
+
+    # Run in the event loop instead of a thread pool, so start and end events are always ordered
+    run_inline = True
+
+    def __init__(self):
+        super().__init__()
+        self.llm_calls: list[LLMCallUsage] = []
+        self.tool_calls: list[ToolCallUsage] = []
+        self._started: dict[UUID, tuple[float, str | None]] = {}
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(self, serialized: dict[str, Any], messages: list, *, run_id: UUID,
+                            metadata: dict[str, Any] | None = None, **kwargs: Any) -> None:
+        self._start(run_id, (metadata or {}).get("langgraph_node"))
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        started_at, node = self._finish(run_id)
+        message = _response_message(response)
+        usage = (message.usage_metadata if message is not None else None) or {}
+        with self._lock:
+            self.llm_calls.append(LLMCallUsage(
+                node=node,
+                model=message.response_metadata.get("model_name") if message is not None else None,
+                input_tokens=usage.get("input_tokens", 0),
+                output_tokens=usage.get("output_tokens", 0),
+                cache_read_tokens=usage.get("input_token_details", {}).get("cache_read", 0),
+                latency_ms=_elapsed_ms(started_at),
+            ))
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        started_at, node = self._finish(run_id)
+        with self._lock:
+            self.llm_calls.append(LLMCallUsage(node=node, model=None, input_tokens=0, output_tokens=0,
+                                               cache_read_tokens=0, latency_ms=_elapsed_ms(started_at), error=True))
+
+    def on_tool_start(self, serialized: dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, serialized.get("name"))
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        started_at, name = self._finish(run_id)
+        with self._lock:
+            self.tool_calls.append(ToolCallUsage(name=name or "unknown", latency_ms=_elapsed_ms(started_at)))
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        started_at, name = self._finish(run_id)
+        with self._lock:
+            self.tool_calls.append(ToolCallUsage(name=name or "unknown", latency_ms=_elapsed_ms(started_at),
+                                                 error=True))
+
+    @property
+    def input_tokens(self) -> int:
+        return sum(c.input_tokens for c in self.llm_calls)
+
+    @property
+    def output_tokens(self) -> int:
+        return sum(c.output_tokens for c in self.llm_calls)
+
+    @property
+    def cache_read_tokens(self) -> int:
+        return sum(c.cache_read_tokens for c in self.llm_calls)
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            llm_calls, tool_calls = list(self.llm_calls), list(self.tool_calls)
+        return {
+            "llm": {
+                "calls": len(llm_calls),
+                "input_tokens": sum(c.input_tokens for c in llm_calls),
+                "output_tokens": sum(c.output_tokens for c in llm_calls),
+                "cache_read_tokens": sum(c.cache_read_tokens for c in llm_calls),
+                "latency_ms": sum(c.latency_ms for c in llm_calls),
+            },
+            "tools": {
+                "calls": len(tool_calls),
+                "latency_ms": sum(c.latency_ms for c in tool_calls),
+            },
+            "llm_calls": [asdict(c) for c in llm_calls],
+            "tool_calls": [asdict(c) for c in tool_calls],
+        }
+
+    def _start(self, run_id: UUID, label: str | None):
+        with self._lock:
+            self._started[run_id] = (time.perf_counter(), label)
+
+    def _finish(self, run_id: UUID) -> tuple[float | None, str | None]:
+        with self._lock:
+            return self._started.pop(run_id, (None, None))
+
+
+def _response_message(response: LLMResult) -> AIMessage | None:
+    try:
+        generation = response.generations[0][0]
+    except IndexError:
+        return None
+    if isinstance(generation, ChatGeneration) and isinstance(generation.message, AIMessage):
+        return generation.message
+    return None
+
+
+def _elapsed_ms(started_at: float | None) -> int:
+    return 0 if started_at is None else round((time.perf_counter() - started_at) * 1000)
@@ -1,4 +1,5 @@
 from .agent import AgentConfiguration, AgentExecution, AgentType, AgentExecutionState, utcnow
+from .rate_limit import RateLimitBucket
 
 __all__ = [
     "AgentConfiguration",
@@ -6,4 +7,5 @@ __all__ = [
     "AgentType",
     "AgentExecutionState",
     "utcnow",
+    "RateLimitBucket",
 ]
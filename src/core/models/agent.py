@@ -1,5 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import Column, DateTime, func, ForeignKey, Enum, Index
+from sqlalchemy import Column, DateTime, func, ForeignKey, Enum, Index, String
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID, INTEGER as PG_INTEGER, JSONB
 from uuid import uuid4, UUID
 from datetime import datetime, timezone
@@ -41,7 +41,7 @@ AgentExecutionState = Literal["pending", "completed", "failed"]
 class AgentExecution(SQLModel, table=True):
     __tablename__ = "agent_execution"
     __table_args__ = (
-        Index("ix_agent_execution_pending_updated_at", "updated_at",
+        Index("ix_agent_execution_pending_next_attempt_at", "next_attempt_at",
               postgresql_where=Column("state") == "pending"),
         Index("ix_agent_execution_config_state_updated_at", "config_id", "state", "updated_at",
               postgresql_ops={"updated_at": "DESC"}),
@@ -65,6 +65,17 @@ class AgentExecution(SQLModel, table=True):
         default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
         sa_column=Column(DateTime(timezone=False), server_default=func.now(), onupdate=func.now(), nullable=False)
     )
+    # The execution can be claimed from this time on: right after creation, after the retry backoff
+    # of a failed attempt or once the claim of a running attempt expired
+    next_attempt_at: datetime = Field(
+        default_factory=utcnow,
+        sa_column=Column(DateTime(timezone=False), server_default=func.now(), nullable=False)
+    )
+    # Scheduler running the current attempt, its lease is renewed while the attempt runs
+    lease_owner: str | None = Field(default=None, sa_column=Column(String, nullable=True))
+    lease_expires_at: datetime | None = Field(
+        default=None, sa_column=Column(DateTime(timezone=False), nullable=True)
+    )
     config_id: UUID = Field(sa_column=Column(PG_UUID(as_uuid=True), ForeignKey("agent_configuration.id")))
     success_result: Dict[str, Any] | None = Field(
         default=None, sa_column=Column(JSONB, nullable=True)
@@ -72,4 +83,7 @@ class AgentExecution(SQLModel, table=True):
     error_result: Dict[str, Any] | None = Field(
         default=None, sa_column=Column(JSONB, nullable=True)
     )
+    usage: Dict[str, Any] | None = Field(
+        default=None, sa_column=Column(JSONB, nullable=True)
+    )
     config: AgentConfiguration = Relationship()
@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Float, String, func
+from sqlmodel import SQLModel, Field
+
+from core.models.agent import utcnow
+
+
+class RateLimitBucket(SQLModel, table=True):
+    """Token bucket shared by all scheduler replicas calling the same rate limited API."""
+
+    __tablename__ = "rate_limit_bucket"
+
+    name: str = Field(sa_column=Column(String, primary_key=True))
+    tokens: float = Field(sa_column=Column(Float, nullable=False))
+    rate: float = Field(sa_column=Column(Float, nullable=False))
+    capacity: float = Field(sa_column=Column(Float, nullable=False))
+    updated_at: datetime = Field(
+        default_factory=utcnow,
+        sa_column=Column(DateTime(timezone=False), server_default=func.now(), nullable=False)
+    )
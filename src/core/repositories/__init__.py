@@ -1,6 +1,8 @@
 from .agent import AgentConfigurationRepository, AgentExecutionRepository
+from .rate_limit import RateLimitBucketRepository
 
 __all__ = [
     "AgentConfigurationRepository",
     "AgentExecutionRepository",
+    "RateLimitBucketRepository",
 ]
\ No newline at end of file
@@ -1,13 +1,17 @@
-from datetime import timedelta
-from typing import Sequence
+from datetime import datetime, timedelta
+from typing import Any, Collection, Sequence
 from uuid import UUID
 
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, func, desc
+from sqlalchemy.orm import joinedload
 from sqlmodel import Session, select, update
 from sqlalchemy.exc import NoResultFound
 
 from core.models import AgentConfiguration, AgentExecution, utcnow, AgentExecutionState
 
+# Postgres channel notified with the id of every created agent execution
+AGENT_EXECUTION_CREATED_CHANNEL = "agent_execution_created"
+
 
 class AgentConfigurationRepository:
 
@@ -52,6 +56,8 @@ class AgentExecutionRepository:
 
     def create(self, session: Session, agent_execution: AgentExecution) -> AgentExecution:
         session.add(agent_execution)
+        # Delivered to listening schedulers when the transaction commits
+        session.exec(select(func.pg_notify(AGENT_EXECUTION_CREATED_CHANNEL, str(agent_execution.id))))  # type: ignore
         session.commit()
         session.refresh(agent_execution)
         return agent_execution
@@ -71,26 +77,104 @@ class AgentExecutionRepository:
         session.refresh(agent_execution)
         return agent_execution
 
-    def find_pending(self, session: Session, threshold: float, limit: int = 100) -> Sequence[AgentExecution]:
-        now = utcnow()
-        cooldown_threshold = now - timedelta(seconds=threshold)
+    def find_pending(self, session: Session, limit: int = 100) -> Sequence[AgentExecution]:
+        """
+        Pending executions which are due, the longest overdue first.
+
+        The scheduler claims executions with `claim_pending`, this read-only query is kept as public API.
+        """
+        return session.exec(
+            select(AgentExecution)  # type: ignore
+            .where(self._pending_condition())
+            .order_by(AgentExecution.next_attempt_at.asc())  # type: ignore
+            .limit(limit)
+        ).all()
+
+    def count_pending(self, session: Session) -> int:
+        return session.exec(
+            select(func.count()).select_from(AgentExecution).where(self._pending_condition())  # type: ignore
+        ).one()
+
+    def claim_pending(
+            self,
+            session: Session,
+            owner: str,
+            lease_seconds: float,
+            limit: int = 100,
+            exclude_ids: Collection[UUID] = ()
+    ) -> Sequence[AgentExecution]:
+        """
+        Claim up to `limit` pending executions by incrementing their `executions` in a single statement.
+
+        Rows locked by concurrent claims are skipped instead of waited for, so schedulers never claim
+        the same execution twice. `owner` gets a lease of `lease_seconds` on every claimed execution,
+        which must be renewed with `renew_lease`. An execution whose lease expired is due again. The
+        claimed executions are returned with their configuration loaded.
+        """
+        lease_expires_at = utcnow() + timedelta(seconds=lease_seconds)
+        conditions = [self._pending_condition()]
+        if exclude_ids:
+            conditions.append(AgentExecution.id.not_in(exclude_ids))  # type: ignore
+
+        candidate_ids = (
+            select(AgentExecution.id)  # type: ignore
+            .where(*conditions)
+            .order_by(AgentExecution.next_attempt_at.asc())  # type: ignore
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        claimed_ids = session.exec(
+            update(AgentExecution)  # type: ignore
+            .where(AgentExecution.id.in_(candidate_ids.scalar_subquery()))  # type: ignore
+            .values(executions=AgentExecution.executions + 1,
+                    lease_owner=owner,
+                    lease_expires_at=lease_expires_at,
+                    next_attempt_at=lease_expires_at)
+            .returning(AgentExecution.id)
+        ).scalars().all()
+        session.commit()
+
+        if not claimed_ids:
+            return []
 
         return session.exec(
             select(AgentExecution)  # type: ignore
+            .where(AgentExecution.id.in_(claimed_ids))  # type: ignore
+            .options(joinedload(AgentExecution.config))  # type: ignore
+            .order_by(AgentExecution.created_at.asc())  # type: ignore
+        ).all()
+
+    def renew_lease(self, session: Session, execution_id: UUID, owner: str, lease_seconds: float) -> bool:
+        """Extend the lease of `owner` on a pending execution, False if `owner` doesn't hold the lease anymore."""
+        lease_expires_at = utcnow() + timedelta(seconds=lease_seconds)
+        res = session.exec(
+            update(AgentExecution)  # type: ignore
             .where(
                 and_(
-                    AgentExecution.state == "pending",
-                    or_(
-                        AgentExecution.executions == 0,
-                        AgentExecution.updated_at < cooldown_threshold
-                    )
+                    AgentExecution.id == execution_id,
+                    AgentExecution.lease_owner == owner,
+                    AgentExecution.state == "pending"
                 )
             )
-            .order_by(AgentExecution.updated_at.asc())  # type: ignore
-            .limit(limit)
-        ).all()
+            .values(lease_expires_at=lease_expires_at, next_attempt_at=lease_expires_at)
+        )
+        session.commit()
+        return res.rowcount > 0  # type: ignore
+
+    @staticmethod
+    def _pending_condition():
+        # Range scan of the partial index ix_agent_execution_pending_next_attempt_at
+        return and_(
+            AgentExecution.state == "pending",
+            AgentExecution.next_attempt_at <= utcnow()
+        )
 
     def acquire_lock(self, session: Session, execution: AgentExecution) -> AgentExecution | None:
+        """
+        Claim one execution by incrementing `executions` if nobody claimed it since it was read.
+
+        The scheduler claims executions with `claim_pending`, this method is kept as public API.
+        """
         with Session(session.get_bind()) as lock_session:
             with lock_session.connection(execution_options={"isolation_level": "AUTOCOMMIT"}) as connection:
                 res = connection.execute(
@@ -133,3 +217,39 @@ class AgentExecutionRepository:
                  .order_by(AgentExecution.updated_at.desc()).limit(limit))  # type: ignore
 
         return session.exec(query).all()  # type: ignore
+
+    def get_usage_by_config(
+            self,
+            session: Session,
+            since: datetime | None = None,
+            limit: int = 10
+    ) -> Sequence[dict[str, Any]]:
+        """Usage totals per configuration, configurations consuming the most tokens first."""
+        llm_usage = AgentExecution.usage['llm']  # type: ignore
+        tool_usage = AgentExecution.usage['tools']  # type: ignore
+        input_tokens = func.sum(llm_usage['input_tokens'].as_integer())
+        output_tokens = func.sum(llm_usage['output_tokens'].as_integer())
+
+        conditions = [AgentExecution.usage.is_not(None)]  # type: ignore
+        if since is not None:
+            conditions.append(AgentExecution.updated_at >= since)
+
+        query = (
+            select(  # type: ignore
+                AgentExecution.config_id.label("config_id"),
+                func.count().label("executions"),
+                func.sum(llm_usage['calls'].as_integer()).label("llm_calls"),
+                input_tokens.label("input_tokens"),
+                output_tokens.label("output_tokens"),
+                func.sum(llm_usage['cache_read_tokens'].as_integer()).label("cache_read_tokens"),
+                func.sum(llm_usage['latency_ms'].as_integer()).label("llm_latency_ms"),
+                func.sum(tool_usage['calls'].as_integer()).label("tool_calls"),
+                func.sum(tool_usage['latency_ms'].as_integer()).label("tool_latency_ms"),
+            )
+            .where(*conditions)
+            .group_by(AgentExecution.config_id)
+            .order_by(desc(input_tokens + output_tokens))
+            .limit(limit)
+        )
+
+        return [row._asdict() for row in session.exec(query).all()]  # type: ignore
@@ -0,0 +1,49 @@
+from sqlalchemy import extract, func, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, update
+
+from core.models import RateLimitBucket
+
+
+class RateLimitBucketRepository:
+
+    def create_if_missing(self, session: Session, bucket: RateLimitBucket) -> None:
+        session.exec(
+            insert(RateLimitBucket)  # type: ignore
+            .values(name=bucket.name, tokens=bucket.tokens, rate=bucket.rate, capacity=bucket.capacity)
+            .on_conflict_do_nothing(index_elements=[RateLimitBucket.name])
+        )
+        session.commit()
+
+    def reserve(self, session: Session, name: str) -> tuple[float, float]:
+        """
+        Refill the bucket for the time elapsed since the last update and take one token in a
+        single atomic statement. Returns (tokens, rate) after the reservation: negative tokens
+        mean the caller must wait `-tokens / rate` seconds before sending its request.
+        """
+        elapsed_seconds = extract("epoch", func.now() - RateLimitBucket.updated_at)
+        row = session.exec(
+            update(RateLimitBucket)  # type: ignore
+            .where(RateLimitBucket.name == name)  # type: ignore
+            .values(
+                tokens=func.least(RateLimitBucket.capacity,
+                                  RateLimitBucket.tokens + elapsed_seconds * RateLimitBucket.rate) - 1,
+                updated_at=func.now(),
+            )
+            .returning(RateLimitBucket.tokens, RateLimitBucket.rate)  # type: ignore
+        ).one()
+        session.commit()
+        return row.tokens, row.rate
+
+    def observe(self, session: Session, name: str, remaining: float, rate: float) -> None:
+        """
+        Cap the tokens by the quota Reddit reports as remaining and set the refill rate. The row
+        isn't written if it already holds both.
+        """
+        session.exec(
+            update(RateLimitBucket)  # type: ignore
+            .where(RateLimitBucket.name == name)  # type: ignore
+            .where(or_(RateLimitBucket.rate != rate, RateLimitBucket.tokens > remaining))  # type: ignore
+            .values(tokens=func.least(RateLimitBucket.tokens, remaining), rate=rate)
+        )
+        session.commit()
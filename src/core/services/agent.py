@@ -1,9 +1,10 @@
 from dataclasses import dataclass
+from datetime import datetime
 from sqlmodel import Session
 
 from core.models import AgentConfiguration, AgentExecution, AgentExecutionState
 from core.repositories import AgentConfigurationRepository, AgentExecutionRepository
-from typing import Sequence
+from typing import Any, Collection, Sequence
 
 from agentapi.schemas import AgentConfigurationCreate, AgentConfigurationUpdate
 from uuid import UUID
@@ -41,8 +42,24 @@ class AgentExecutionService:
     def get_by_id(self, session: Session, configuration_id: UUID) -> AgentExecution:
         return self.repository.get_by_id(session, configuration_id)
 
-    def find_pending(self, session: Session, threshold: float, limit: int = 100) -> Sequence[AgentExecution]:
-        return self.repository.find_pending(session, threshold, limit)
+    def find_pending(self, session: Session, limit: int = 100) -> Sequence[AgentExecution]:
+        return self.repository.find_pending(session, limit)
+
+    def count_pending(self, session: Session) -> int:
+        return self.repository.count_pending(session)
+
+    def claim_pending(
+        self,
+        session: Session,
+        owner: str,
+        lease_seconds: float,
+        limit: int = 100,
+        exclude_ids: Collection[UUID] = ()
+    ) -> Sequence[AgentExecution]:
+        return self.repository.claim_pending(session, owner, lease_seconds, limit, exclude_ids)
+
+    def renew_lease(self, session: Session, execution_id: UUID, owner: str, lease_seconds: float) -> bool:
+        return self.repository.renew_lease(session, execution_id, owner, lease_seconds)
 
     def acquire_lock(self, session: Session, execution: AgentExecution) -> AgentExecution | None:
         return self.repository.acquire_lock(session, execution)
@@ -58,4 +75,12 @@ class AgentExecutionService:
         limit: int = 10
     ) -> Sequence[AgentExecution]:
         config = self.agent_configuration_service.get_by_id(session, config_id)
-        return self.repository.get_recent(session, config=config, state=state, limit=limit)
\ No newline at end of file
+        return self.repository.get_recent(session, config=config, state=state, limit=limit)
+
+    def get_usage_by_config(
+        self,
+        session: Session,
+        since: datetime | None = None,
+        limit: int = 10
+    ) -> Sequence[dict[str, Any]]:
+        return self.repository.get_usage_by_config(session, since=since, limit=limit)
\ No newline at end of file
@@ -6,6 +6,7 @@ from typing import AsyncGenerator
 from sqlalchemy import Engine
 from sqlmodel import Session
 
+from scheduler.services.execution_listener import ExecutionNotificationListener
 from scheduler.services.scheduler import SchedulerService
 
 logger = logging.getLogger("uvicorn")
@@ -16,11 +17,21 @@ class SchedulerManager:
     Main scheduler manager that handles the event loop and graceful shutdown.
     """
 
-    def __init__(self, poll_interval_seconds: float, scheduler_service: SchedulerService, db_engine: Engine):
+    def __init__(self, poll_interval_seconds: float, scheduler_service: SchedulerService, db_engine: Engine,
+                 execution_listener: ExecutionNotificationListener | None = None,
+                 fallback_poll_interval_seconds: float | None = None):
+        """
+        Args:
+            poll_interval_seconds: Time between polls for pending executions
+            execution_listener: Wakes the scheduler up when an execution is created
+            fallback_poll_interval_seconds: Time between polls while the listener is listening
+        """
         self.shutdown_event = asyncio.Event()
         self.poll_interval_seconds = poll_interval_seconds
         self.db_engine = db_engine
         self.scheduler_service = scheduler_service
+        self.execution_listener = execution_listener
+        self.fallback_poll_interval_seconds = fallback_poll_interval_seconds or poll_interval_seconds
 
     @asynccontextmanager
     async def get_session(self) -> AsyncGenerator[Session, None]:
@@ -33,15 +44,24 @@ class SchedulerManager:
     async def run_scheduler_loop(self):
         logger.info(f"Starting scheduler with poll_interval = {self.poll_interval_seconds} s")
         while not self.shutdown_event.is_set():
+            if self.execution_listener is not None:
+                await self.execution_listener.ensure_listening()
             try:
                 async with self.get_session() as session:
                     await self.scheduler_service.process_pending_executions(session)
             except Exception:
                 logger.exception(f"Unexpected error")
-            await asyncio.sleep(self.poll_interval_seconds)
+            await self.scheduler_service.wait_for_wakeup(self._wait_timeout())
 
+        if self.execution_listener is not None:
+            self.execution_listener.stop()
         logger.info("Scheduler loop stopped")
 
+    def _wait_timeout(self) -> float:
+        if self.execution_listener is not None and self.execution_listener.listening:
+            return self.fallback_poll_interval_seconds
+        return self.poll_interval_seconds
+
     async def start(self):
         logger.info("Starting agent execution scheduler...")
 
@@ -51,4 +71,5 @@ class SchedulerManager:
             logger.critical(f"Scheduler failed with unhandled exception: {e}")
             raise
         finally:
+            await self.scheduler_service.close()
             logger.info("Scheduler shutdown complete")
@@ -1,6 +1,7 @@
-from core.repositories import AgentExecutionRepository, AgentConfigurationRepository
+from core.repositories import AgentExecutionRepository, AgentConfigurationRepository, RateLimitBucketRepository
 from core.services import AgentExecutionService, AgentConfigurationService
-from scheduler.services import AgentExecutor, SchedulerService
+from scheduler.services import (AgentExecutor, SchedulerService, PostgresRateLimitGovernor,
+                                ExecutionNotificationListener)
 from scheduler.settings import SchedulerSettings
 from sqlmodel import create_engine
 
@@ -9,7 +10,16 @@ class SchedulerAppContext:
 
     def __init__(self, settings: SchedulerSettings):
         self.settings = settings
-        self.agent_executor = AgentExecutor(self.settings)
+        self.db_engine = create_engine(settings.db_url, echo=settings.debug)
+        self.rate_limit_governor = None
+        if settings.reddit_rate_limit_mode == "postgres":
+            self.rate_limit_governor = PostgresRateLimitGovernor(
+                self.db_engine,
+                RateLimitBucketRepository(),
+                requests_per_minute=settings.reddit_rate_limit_requests_per_minute,
+                burst=settings.reddit_rate_limit_burst,
+            )
+        self.agent_executor = AgentExecutor(self.settings, rate_limit_governor=self.rate_limit_governor)
         self.agent_execution_repository = AgentExecutionRepository()
         self.agent_configuration_repository = AgentConfigurationRepository()
         self.agent_configuration_service = AgentConfigurationService(self.agent_configuration_repository)
@@ -20,4 +30,7 @@ class SchedulerAppContext:
             executor=self.agent_executor,
             settings=self.settings,
         )
-        self.db_engine = create_engine(settings.db_url, echo=settings.debug)
+        self.execution_listener = None
+        if settings.listen_for_executions:
+            self.execution_listener = ExecutionNotificationListener(self.db_engine,
+                                                                    self.scheduler_service.wakeup_event)
@@ -2,8 +2,12 @@
 
 from .agent_executor import AgentExecutor
 from .scheduler import SchedulerService
+from .rate_limit_governor import PostgresRateLimitGovernor
+from .execution_listener import ExecutionNotificationListener
 
 __all__ = [
     "AgentExecutor",
     "SchedulerService",
+    "PostgresRateLimitGovernor",
+    "ExecutionNotificationListener",
 ]
\ No newline at end of file
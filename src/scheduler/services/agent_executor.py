@@ -1,11 +1,24 @@
+import asyncio
 import logging
-from dataclasses import dataclass
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
+from uuid import UUID
 
+import asyncpraw
+import httpx
+from langchain_core.language_models import BaseChatModel
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
+from sqlalchemy import make_url
 
 from agents.config import Config, RedditConfig
-from agents.search_agent import CreateSearchAgentCommand, execute_search
+from agents.llm_cache import DiskLLMCache
+from agents.prompt import get_prompt_registry
+from agents.search_agent import CreateSearchAgentCommand, execute_search, AgentGraphCache, UsageLedger
+from agents.search_agent.tool.reddit import (SubmissionCache, FileSubmissionCache, SearchResultCache, RedditClientPool,
+                                            RateLimitGovernor, TokenBucketGovernor, GovernedRequestor)
 from core.models import AgentExecution
 from scheduler.settings import SchedulerSettings
 
@@ -14,29 +27,163 @@ logger = logging.getLogger("uvicorn")
 @dataclass
 class AgentExecutor:
     settings: SchedulerSettings
+    rate_limit_governor: RateLimitGovernor | None = None
+    submission_cache: SubmissionCache | None = field(init=False, default=None)
+    search_cache: SearchResultCache | None = field(init=False, default=None)
+    reddit_pool: RedditClientPool = field(init=False)
+    graph_cache: AgentGraphCache = field(init=False)
+    _llm: BaseChatModel | None = field(init=False, default=None)
+    _llm_http_client: httpx.AsyncClient | None = field(init=False, default=None)
+    _llm_lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    _checkpointer: BaseCheckpointSaver | None = field(init=False, default=None)
+    _checkpointer_pool: Any = field(init=False, default=None)
+    _checkpointer_lock: asyncio.Lock = field(init=False, default_factory=asyncio.Lock)
 
-    async def execute(self, agent_execution: AgentExecution) -> dict[str, Any]:
+    def __post_init__(self):
+        if self.rate_limit_governor is None:
+            self.rate_limit_governor = TokenBucketGovernor(
+                requests_per_minute=self.settings.reddit_rate_limit_requests_per_minute,
+                burst=self.settings.reddit_rate_limit_burst,
+            )
+        # Prompts are read once at startup, later only modified files are reloaded
+        get_prompt_registry(Path(self.settings.prompts_folder)).preload()
+        self.graph_cache = AgentGraphCache(max_entries=self.settings.agent_graph_cache_max_entries)
+        self.reddit_pool = RedditClientPool(self._create_reddit_client, size=self.settings.reddit_client_pool_size)
+        if self.settings.reddit_cache_folder is not None:
+            self.submission_cache = FileSubmissionCache(
+                Path(self.settings.reddit_cache_folder),
+                min_ttl_seconds=self.settings.reddit_cache_min_ttl_seconds,
+                max_ttl_seconds=self.settings.reddit_cache_max_ttl_seconds,
+                max_entries=self.settings.reddit_cache_max_entries,
+            )
+        if self.settings.reddit_search_cache_global:
+            self.search_cache = SearchResultCache(
+                max_entries=self.settings.reddit_search_cache_max_entries,
+                ttl_seconds=self.settings.reddit_search_cache_ttl_seconds,
+            )
+
+    async def execute(self, agent_execution: AgentExecution, usage: UsageLedger | None = None) -> dict[str, Any]:
         logger.info("Executing agent: execution_id = %s, agent_type = %s, executions = %s", agent_execution.id,
                     agent_execution.config.agent_type,
                     agent_execution.executions)
 
         match agent_execution.config.agent_type:
             case "search_agent":
-                cfg = self._create_config()
+                cfg = self._create_config(await self.get_checkpointer())
                 cmd = CreateSearchAgentCommand.model_validate(agent_execution.config.data)
                 logger.info("Executing search agent: execution_id = %s, cmd = %s", agent_execution.id, cmd)
-                res = await execute_search(cfg, cmd)
+                # Checkpoints are keyed by the execution, so a retry resumes the failed attempt
+                res = await execute_search(cfg, cmd, usage=usage, thread_id=str(agent_execution.id))
                 return res.model_dump()
             case _:
                 raise RuntimeError(f"Unknown agent_type {agent_execution.config.agent_type}")
 
-    def _create_config(self) -> Config:
+    async def close(self):
+        """Release process-wide resources, called once on scheduler shutdown."""
+        await self.reddit_pool.close()
+        with self._llm_lock:
+            llm_http_client, self._llm_http_client, self._llm = self._llm_http_client, None, None
+        if llm_http_client is not None:
+            await llm_http_client.aclose()
+        if self._checkpointer_pool is not None:
+            await self._checkpointer_pool.close()
+            self._checkpointer_pool, self._checkpointer = None, None
+
+    async def delete_checkpoints(self, execution_id: UUID):
+        """Delete the saved agent state of an execution which won't be retried anymore."""
+        checkpointer = await self.get_checkpointer()
+        if checkpointer is not None:
+            await checkpointer.adelete_thread(str(execution_id))
+
+    async def get_checkpointer(self) -> BaseCheckpointSaver | None:
+        """Checkpointer shared by all executions, None if checkpointing is off."""
+        if self.settings.agent_checkpointer == "off":
+            return None
+        async with self._checkpointer_lock:
+            if self._checkpointer is None:
+                if self.settings.agent_checkpointer == "memory":
+                    self._checkpointer = InMemorySaver()
+                else:
+                    self._checkpointer = await self._create_postgres_checkpointer()
+                logger.info("Using agent checkpointer: type = %s", self.settings.agent_checkpointer)
+        return self._checkpointer
+
+    async def _create_postgres_checkpointer(self) -> BaseCheckpointSaver:
+        # The Postgres checkpointer uses psycopg 3, it is only imported when enabled
+        from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+        from psycopg.rows import dict_row
+        from psycopg_pool import AsyncConnectionPool
+
+        pool = AsyncConnectionPool(
+            checkpointer_conninfo(self.settings.db_url),
+            max_size=self.settings.agent_checkpointer_pool_size,
+            open=False,
+            kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row},
+        )
+        await pool.open()
+        checkpointer = AsyncPostgresSaver(pool)
+        if self.settings.agent_checkpointer_setup:
+            logger.info("Creating or migrating agent checkpoint tables")
+            await checkpointer.setup()
+        self._checkpointer_pool = pool
+        return checkpointer
+
+    def get_llm(self) -> BaseChatModel:
+        """LLM client shared by all executions, so its connection pool and TLS sessions are reused."""
+        if self._llm is None:
+            with self._llm_lock:
+                if self._llm is None:
+                    self._llm_http_client = self.settings.create_llm_http_client()
+                    self._llm = self.settings.create_llm(http_async_client=self._llm_http_client,
+                                                         cache=self._create_llm_cache())
+        return self._llm
+
+    def _create_llm_cache(self) -> DiskLLMCache | None:
+        if self.settings.llm_cache_mode == "off":
+            return None
+        logger.info("Using LLM response cache: mode = %s, folder = %s", self.settings.llm_cache_mode,
+                    self.settings.llm_cache_folder)
+        return DiskLLMCache(
+            Path(self.settings.llm_cache_folder),
+            mode=self.settings.llm_cache_mode,
+            max_entries=self.settings.llm_cache_max_entries,
+        )
+
+    def _create_reddit_client(self) -> asyncpraw.Reddit:
+        return asyncpraw.Reddit(
+            client_id=self.settings.reddit_client_id,
+            client_secret=self.settings.reddit_client_secret,
+            user_agent=self.settings.reddit_agent,
+            requestor_class=GovernedRequestor,
+            requestor_kwargs={"governor": self.rate_limit_governor},
+        )
+
+    def _create_config(self, checkpointer: BaseCheckpointSaver | None = None) -> Config:
         return Config(
-            llm=self.settings.create_llm(),
+            llm=self.get_llm(),
             reddit_config=RedditConfig(
                 client_id=self.settings.reddit_client_id,
                 client_secret=self.settings.reddit_client_secret,
                 user_agent=self.settings.reddit_agent,
+                search_concurrency=self.settings.reddit_search_concurrency,
+                comments_max_depth=self.settings.reddit_comments_max_depth,
+                comments_max_breadth=self.settings.reddit_comments_max_breadth,
+                comments_replace_more_limit=self.settings.reddit_comments_replace_more_limit,
+                search_cache_max_entries=self.settings.reddit_search_cache_max_entries,
+                search_cache_ttl_seconds=self.settings.reddit_search_cache_ttl_seconds,
+                compact_seen_submissions=self.settings.reddit_compact_seen_submissions,
             ),
-            prompts_folder=Path(self.settings.prompts_folder)
+            prompts_folder=Path(self.settings.prompts_folder),
+            prompt_layout=self.settings.prompt_layout,
+            submission_cache=self.submission_cache,
+            search_cache=self.search_cache,
+            reddit_pool=self.reddit_pool,
+            rate_limit_governor=self.rate_limit_governor,
+            graph_cache=self.graph_cache,
+            checkpointer=checkpointer,
         )
+
+
+def checkpointer_conninfo(db_url: str) -> str:
+    """libpq connection string of the SQLAlchemy `db_url`, which may name a driver, e.g. postgresql+psycopg2."""
+    return make_url(db_url).set(drivername="postgresql").render_as_string(hide_password=False)
@@ -0,0 +1,88 @@
+import asyncio
+import logging
+from typing import Any
+
+from sqlalchemy import Engine
+
+from core.repositories.agent import AGENT_EXECUTION_CREATED_CHANNEL
+
+logger = logging.getLogger("uvicorn")
+
+
+class ExecutionNotificationListener:
+    """
+    Sets `wakeup_event` when Postgres notifies that an agent execution was created.
+
+    The listener owns one autocommit connection which is watched by the event loop, so waiting
+    for notifications costs no queries. If the connection breaks, the listener stops and is
+    started again by the next `ensure_listening` call.
+    """
+
+    def __init__(self, db_engine: Engine, wakeup_event: asyncio.Event,
+                 channel: str = AGENT_EXECUTION_CREATED_CHANNEL):
+        self.db_engine = db_engine
+        self.wakeup_event = wakeup_event
+        self.channel = channel
+        self._connection: Any = None
+        self._fileno: int | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def listening(self) -> bool:
+        return self._connection is not None
+
+    async def ensure_listening(self):
+        """Start listening if the listener isn't listening yet, failures are logged and retried on the next call."""
+        if self.listening:
+            return
+        try:
+            self._listen()
+        except Exception:
+            logger.exception("Failed to listen for agent execution notifications: channel = %s", self.channel)
+            self.stop()
+
+    def stop(self):
+        connection, self._connection = self._connection, None
+        if connection is None:
+            return
+        if self._loop is not None and self._fileno is not None:
+            self._loop.remove_reader(self._fileno)
+            self._fileno = None
+        try:
+            connection.close()
+        except Exception:
+            logger.warning("Failed to close notification listener connection", exc_info=True)
+
+    def _listen(self):
+        # The connection is taken out of the pool, it is never reused by other sessions
+        pool_connection = self.db_engine.raw_connection()
+        pool_connection.detach()
+        connection = pool_connection.driver_connection
+        self._connection = connection
+
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f'LISTEN "{self.channel}"')
+
+        self._loop = asyncio.get_running_loop()
+        self._fileno = connection.fileno()
+        self._loop.add_reader(self._fileno, self._on_readable)
+        logger.info("Listening for agent execution notifications: channel = %s", self.channel)
+        # Executions created while the listener wasn't listening are picked up right away
+        self.wakeup_event.set()
+
+    def _on_readable(self):
+        connection = self._connection
+        if connection is None:
+            return
+        try:
+            connection.poll()
+        except Exception:
+            logger.exception("Notification listener connection failed")
+            self.stop()
+            return
+
+        if connection.notifies:
+            logger.debug("Received agent execution notifications: count = %d", len(connection.notifies))
+            connection.notifies.clear()
+            self.wakeup_event.set()
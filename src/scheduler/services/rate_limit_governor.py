@@ -0,0 +1,80 @@
+import asyncio
+import logging
+import math
+
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from agents.search_agent.tool.reddit import RateLimitGovernor, TokenBucketGovernor
+from agents.search_agent.tool.reddit.rate_limit import target_rate
+from core.models import RateLimitBucket
+from core.repositories import RateLimitBucketRepository
+
+logger = logging.getLogger("uvicorn")
+
+# Relative change of the refill rate below which Reddit headers aren't written to the database
+RATE_CHANGE_TOLERANCE = 0.05
+
+
+class PostgresRateLimitGovernor(RateLimitGovernor):
+    """
+    Token bucket stored in Postgres, shared by all scheduler replicas.
+
+    Each request reserves a token with one atomic UPDATE. If the database is unavailable the
+    governor falls back to an in-process bucket instead of blocking Reddit calls. Reddit headers
+    are written only when they change the stored bucket: the derived rate moved by more than
+    `RATE_CHANGE_TOLERANCE`, or the remaining quota is below the burst and caps the tokens.
+    """
+
+    def __init__(self, db_engine: Engine, repository: RateLimitBucketRepository, bucket_name: str = "reddit",
+                 requests_per_minute: float = 100, burst: float = 10, max_requests_per_second: float = 10):
+        self.db_engine = db_engine
+        self.repository = repository
+        self.bucket_name = bucket_name
+        self.requests_per_minute = requests_per_minute
+        self.burst = burst
+        self.max_rate = max_requests_per_second
+        self.fallback = TokenBucketGovernor(requests_per_minute, burst, max_requests_per_second)
+        self._bucket_created = False
+        self._observed_rate: float | None = None
+
+    async def acquire(self) -> None:
+        try:
+            tokens, rate = await asyncio.to_thread(self._reserve)
+        except Exception:
+            logger.exception("Failed to reserve Reddit rate limit token in database, using local rate limit")
+            await self.fallback.acquire()
+            return
+
+        if tokens < 0:
+            await asyncio.sleep(-tokens / rate)
+
+    async def observe(self, remaining: float, reset_seconds: float) -> None:
+        await self.fallback.observe(remaining, reset_seconds)
+        rate = target_rate(remaining, reset_seconds, self.max_rate)
+        if not self._changes_bucket(remaining, rate):
+            return
+        await asyncio.to_thread(self._observe, remaining, rate)
+        self._observed_rate = rate
+
+    def _changes_bucket(self, remaining: float, rate: float) -> bool:
+        # Tokens never exceed the burst, so only a smaller remaining quota caps them
+        if remaining < self.burst or self._observed_rate is None:
+            return True
+        return not math.isclose(rate, self._observed_rate, rel_tol=RATE_CHANGE_TOLERANCE)
+
+    def _reserve(self) -> tuple[float, float]:
+        with Session(self.db_engine) as session:
+            if not self._bucket_created:
+                self.repository.create_if_missing(session, RateLimitBucket(
+                    name=self.bucket_name,
+                    tokens=self.burst,
+                    rate=self.requests_per_minute / 60,
+                    capacity=self.burst,
+                ))
+                self._bucket_created = True
+            return self.repository.reserve(session, self.bucket_name)
+
+    def _observe(self, remaining: float, rate: float):
+        with Session(self.db_engine) as session:
+            self.repository.observe(session, self.bucket_name, remaining, rate)
@@ -1,9 +1,16 @@
+import asyncio
 import logging
-from dataclasses import dataclass
+import os
+import random
+import socket
+from dataclasses import dataclass, field
+from datetime import timedelta
 from typing import Any
+from uuid import UUID, uuid4
 
 from sqlmodel import Session
 
+from agents.search_agent import UsageLedger
 from core.models.agent import AgentExecution, utcnow
 from core.services.agent import AgentExecutionService
 from scheduler.services.agent_executor import AgentExecutor
@@ -14,62 +21,143 @@ logger = logging.getLogger("uvicorn")
 
 @dataclass
 class SchedulerService:
+    """
+    Runs pending executions in a pool of at most `settings.max_concurrency` concurrent tasks.
+
+    Every poll tops the pool up with pending executions which aren't running yet, the
+    `wakeup_event` is set as soon as a slot frees up, so the next poll doesn't wait for the
+    poll interval.
+
+    Claimed executions are leased to `owner_id` for `settings.threshold_seconds`. The lease is
+    renewed while the execution runs, so long runs are never claimed twice, while executions of
+    a dead scheduler are claimable again once their lease expires. An execution whose lease was
+    lost is cancelled.
+    """
     execution_service: AgentExecutionService
     executor: AgentExecutor
     settings: SchedulerSettings
+    owner_id: str = field(default_factory=lambda: f"{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:8]}")
+    wakeup_event: asyncio.Event = field(init=False, default_factory=asyncio.Event)
+    # Pending executions found by the last poll which didn't fit into the pool
+    queue_depth: int = field(init=False, default=0)
+    _in_flight: dict[UUID, asyncio.Task] = field(init=False, default_factory=dict)
 
-    async def process_pending_executions(self, session: Session) -> int:
-        pending_executions = self.execution_service.find_pending(
-            session=session,
-            threshold=self.settings.threshold_seconds
-        )
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
 
-        if not pending_executions:
+    async def process_pending_executions(self, session: Session) -> int:
+        """Claim pending executions for the free slots of the pool, return the number of started executions."""
+        free_slots = max(self.settings.max_concurrency - len(self._in_flight), 0)
+        claimed_executions = []
+        if free_slots > 0:
+            claimed_executions = self.execution_service.claim_pending(
+                session=session,
+                owner=self.owner_id,
+                lease_seconds=self.settings.threshold_seconds,
+                limit=free_slots,
+                exclude_ids=self._in_flight.keys(),
+            )
+        self.queue_depth = self.execution_service.count_pending(session)
+        # Claimed executions are handed over to the sessions of their tasks
+        session.expunge_all()
+
+        if not claimed_executions:
             return 0
 
-        logger.info(f"Found {len(pending_executions)} pending executions")
+        logger.info(f"Starting {len(claimed_executions)} claimed executions: in_flight = {len(self._in_flight)}, "
+                    f"queue_depth = {self.queue_depth}")
 
-        for execution in pending_executions:
-            await self._execution_task(session, execution)
+        for execution in claimed_executions:
+            task = asyncio.create_task(self._execution_task(session.get_bind(), execution))
+            self._in_flight[execution.id] = task
+            task.add_done_callback(lambda _, execution_id=execution.id: self._release_slot(execution_id))
 
-        logger.info(f"Processed {len(pending_executions)} pending executions")
-        return len(pending_executions)
+        return len(claimed_executions)
 
-    async def _execution_task(self, session: Session, execution: AgentExecution) -> int:
+    async def wait_for_wakeup(self, timeout: float):
+        """Wait until a slot of the pool frees up, at most `timeout` seconds."""
         try:
-            if await self._try_process_execution(session, execution):
+            await asyncio.wait_for(self.wakeup_event.wait(), timeout=timeout)
+        except TimeoutError:
+            pass
+        self.wakeup_event.clear()
+
+    async def close(self):
+        tasks = list(self._in_flight.values())
+        if tasks:
+            logger.info(f"Cancelling {len(tasks)} in-flight executions")
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        await self.executor.close()
+
+    def _release_slot(self, execution_id: UUID):
+        self._in_flight.pop(execution_id, None)
+        self.wakeup_event.set()
+
+    async def _execution_task(self, bind: Any, execution: AgentExecution) -> int:
+        heartbeat = asyncio.create_task(self._renew_lease(bind, execution.id, asyncio.current_task()))
+        # Every task uses its own session, sessions can't be shared by concurrent tasks
+        with Session(bind) as session:
+            try:
+                session.add(execution)
+                logger.info(f"Claimed execution {execution.id} (attempt #{execution.executions})")
+                await self._process_claimed_execution(session, execution)
                 return 1
-        except Exception as e:
-            logger.error(f"Error processing execution {execution.id}: {e}")
+            except Exception as e:
+                logger.error(f"Error processing execution {execution.id}: {e}")
+            finally:
+                heartbeat.cancel()
         return 0
 
-    async def _try_process_execution(self, session: Session, execution: AgentExecution) -> bool:
-        locked_execution = self.execution_service.acquire_lock(session, execution)
-
-        if locked_execution is None:
-            return False
-
-        logger.info(f"Acquired lock for execution {locked_execution.id} (attempt #{locked_execution.executions})")
-
+    async def _renew_lease(self, bind: Any, execution_id: UUID, execution_task: asyncio.Task):
+        """Renew the lease of a running execution periodically, cancel the execution once the lease is lost."""
+        while True:
+            await asyncio.sleep(self.settings.lease_renew_interval_seconds)
+            try:
+                with Session(bind) as session:
+                    renewed = self.execution_service.renew_lease(session, execution_id, self.owner_id,
+                                                                 self.settings.threshold_seconds)
+            except Exception:
+                # The lease is still valid until it expires, the next renewal may succeed
+                logger.exception(f"Failed to renew lease of execution {execution_id}")
+                continue
+
+            if not renewed:
+                logger.warning(f"Lost lease of execution {execution_id}, cancelling it")
+                execution_task.cancel()
+                return
+
+    async def _process_claimed_execution(self, session: Session, locked_execution: AgentExecution):
         if locked_execution.executions > self.settings.max_retries:
             await self._mark_as_failed(session, locked_execution, "Max retries exceeded")
-            return True
+            return
 
+        # Usage of the latest attempt is stored whether it succeeded or not
+        usage = UsageLedger()
         try:
-            execution_res = await self.executor.execute(locked_execution)
+            execution_res = await self.executor.execute(locked_execution, usage)
+            locked_execution.usage = usage.to_dict()
             await self._mark_as_completed(session, locked_execution, execution_res)
             logger.info(f"Successfully executed agent {locked_execution.id}")
         except Exception as e:
             logger.exception(f"Execution {locked_execution.id} failed")
 
+            retry_delay = retry_delay_seconds(locked_execution.executions, self.settings.retry_backoff_base_seconds,
+                                              self.settings.retry_backoff_max_seconds)
             locked_execution.error_result = {"error": str(e)}
-            self.execution_service.update(session, execution)
-        return True
+            locked_execution.usage = usage.to_dict()
+            locked_execution.next_attempt_at = utcnow() + timedelta(seconds=retry_delay)
+            self._release_lease(locked_execution)
+            self.execution_service.update(session, locked_execution)
+            logger.info(f"Execution {locked_execution.id} will be retried in {retry_delay:.0f} s")
 
     async def _mark_as_completed(self, session: Session, execution: AgentExecution, res: dict[str, Any]) -> None:
         execution.state = "completed"
         execution.updated_at = utcnow()
         execution.success_result = res
+        self._release_lease(execution)
         self.execution_service.update(session, execution)
 
     async def _mark_as_failed(self, session: Session, execution: AgentExecution, error_message: str) -> None:
@@ -78,5 +166,18 @@ class SchedulerService:
             execution.error_result = {
                 "error": error_message,
             }
+        self._release_lease(execution)
         self.execution_service.update(session, execution)
         logger.error(f"Marked execution {execution.id} as failed after {execution.executions} attempts")
+        await self.executor.delete_checkpoints(execution.id)
+
+    @staticmethod
+    def _release_lease(execution: AgentExecution):
+        execution.lease_owner = None
+        execution.lease_expires_at = None
+
+
+def retry_delay_seconds(attempt: int, base_seconds: float, max_seconds: float) -> float:
+    """Exponential backoff of a failed attempt with jitter: between half and the full backoff."""
+    backoff = min(max_seconds, base_seconds * 2 ** min(attempt - 1, 32))
+    return random.uniform(backoff / 2, backoff)
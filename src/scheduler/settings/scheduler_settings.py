@@ -1,11 +1,32 @@
+from typing import Literal
+
+import httpx
 from pydantic_settings import BaseSettings
 from langchain_openai import ChatOpenAI
+from openai import DefaultAsyncHttpxClient
+from langchain_core.caches import BaseCache
 from langchain_core.language_models import BaseChatModel
 
 class SchedulerSettings(BaseSettings):
     reddit_client_id: str
     reddit_client_secret: str
     reddit_agent: str
+    reddit_client_pool_size: int = 4
+    reddit_rate_limit_mode: Literal["local", "postgres"] = "local"
+    reddit_rate_limit_requests_per_minute: float = 100
+    reddit_rate_limit_burst: float = 10
+    reddit_search_concurrency: int = 5
+    reddit_comments_max_depth: int | None = None
+    reddit_comments_max_breadth: int | None = None
+    reddit_comments_replace_more_limit: int = 0
+    reddit_search_cache_max_entries: int = 256
+    reddit_search_cache_ttl_seconds: float = 3600
+    reddit_search_cache_global: bool = False
+    reddit_compact_seen_submissions: bool = True
+    reddit_cache_folder: str | None = None
+    reddit_cache_min_ttl_seconds: float = 15 * 60
+    reddit_cache_max_ttl_seconds: float = 7 * 24 * 3600
+    reddit_cache_max_entries: int = 50_000
     openai_api_key: str
     openai_endpoint: str | None = None
     openai_site_url: str | None = None
@@ -13,20 +34,47 @@ class SchedulerSettings(BaseSettings):
     llm_model: str = 'gpt-4.1'
     llm_model_temperature: float = 0.1
     llm_model_max_tokens: int = 4000
+    llm_max_connections: int = 20
+    llm_max_keepalive_connections: int = 10
+    llm_keepalive_expiry_seconds: float = 30
+    llm_cache_mode: Literal["off", "read_through", "record_only", "replay_only"] = "off"
+    llm_cache_folder: str = '.cache/llm'
+    llm_cache_max_entries: int = 10_000
     prompts_folder: str = 'prompts'
+    prompt_layout: Literal["prefix_cache", "inline"] = "prefix_cache"
+    agent_graph_cache_max_entries: int = 32
+    agent_checkpointer: Literal["off", "memory", "postgres"] = "off"
+    agent_checkpointer_pool_size: int = 4
+    # The checkpoint tables are created by Alembic, enable only for databases not managed by Alembic
+    agent_checkpointer_setup: bool = False
     db_url: str
     debug: bool = False
     poll_interval_seconds: float = 1
+    # Executions are picked up on notification, polling only catches missed notifications and retries
+    listen_for_executions: bool = True
+    fallback_poll_interval_seconds: float = 30
+    # Lease of a claimed execution, it is claimable again if the lease isn't renewed within this time
     threshold_seconds: float = 60
+    lease_renew_interval_seconds: float = 15
     max_retries: int = 20
+    retry_backoff_base_seconds: float = 30
+    retry_backoff_max_seconds: float = 3600
+    max_concurrency: int = 4
     
-    def create_llm(self) -> BaseChatModel:
+    def create_llm(self, http_async_client: httpx.AsyncClient | None = None,
+                   cache: BaseCache | None = None) -> BaseChatModel:
         llm_kwargs = {
             "model": self.llm_model,
             "temperature": self.llm_model_temperature,
             "max_tokens": self.llm_model_max_tokens,
             "api_key": self.openai_api_key,
         }
+
+        if cache is not None:
+            llm_kwargs["cache"] = cache
+
+        if http_async_client is not None:
+            llm_kwargs["http_async_client"] = http_async_client
         
         if self.openai_endpoint is not None:
             llm_kwargs["base_url"] = self.openai_endpoint
@@ -43,6 +91,16 @@ class SchedulerSettings(BaseSettings):
             
         return ChatOpenAI(**llm_kwargs)
 
+    def create_llm_http_client(self) -> httpx.AsyncClient:
+        """HTTP client with a connection pool sized for all concurrent LLM calls of the process."""
+        return DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=self.llm_max_connections,
+                max_keepalive_connections=self.llm_max_keepalive_connections,
+                keepalive_expiry=self.llm_keepalive_expiry_seconds,
+            ),
+        )
+
 
     class Config:
         env_file = ".env"
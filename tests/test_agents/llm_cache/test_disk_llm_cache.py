@@ -0,0 +1,84 @@
+"""Tests for the on-disk LLM response cache"""
+import itertools
+from pathlib import Path
+
+import pytest
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+
+from agents.llm_cache import DiskLLMCache, LLMCacheMiss
+from agents.search_agent.usage import UsageLedger
+
+
+def create_llm(cache: DiskLLMCache, answers: list[str]) -> GenericFakeChatModel:
+    return GenericFakeChatModel(messages=iter([AIMessage(a) for a in answers]), cache=cache)
+
+
+class TestDiskLLMCache:
+    """Tests for DiskLLMCache."""
+
+    @pytest.mark.asyncio
+    async def test_read_through_serves_recorded_response(self, tmp_path: Path):
+        # given
+        cache = DiskLLMCache(tmp_path, mode="read_through")
+        await create_llm(cache, ["recorded"]).ainvoke([HumanMessage("hello", id="first-run")])
+
+        # when
+        response = await create_llm(cache, ["live"]).ainvoke([HumanMessage("hello", id="second-run")])
+
+        # then
+        assert response.content == "recorded"
+
+    @pytest.mark.asyncio
+    async def test_replayed_response_costs_no_tokens(self, tmp_path: Path):
+        # given
+        cache = DiskLLMCache(tmp_path, mode="read_through")
+        recorded = AIMessage("recorded", usage_metadata={"input_tokens": 100, "output_tokens": 10, "total_tokens": 110})
+        await GenericFakeChatModel(messages=iter([recorded]), cache=cache).ainvoke([HumanMessage("hello")])
+        usage = UsageLedger()
+
+        # when
+        response = await create_llm(cache, ["live"]).ainvoke([HumanMessage("hello")], config={"callbacks": [usage]})
+
+        # then
+        assert response.content == "recorded"
+        assert response.response_metadata["cache_hit"] is True
+        assert response.usage_metadata is None
+        assert (usage.input_tokens, usage.output_tokens) == (0, 0)
+        assert len(usage.llm_calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_record_only_always_calls_model(self, tmp_path: Path):
+        # given
+        cache = DiskLLMCache(tmp_path, mode="record_only")
+        await create_llm(cache, ["first"]).ainvoke([HumanMessage("hello")])
+
+        # when
+        response = await create_llm(cache, ["second"]).ainvoke([HumanMessage("hello")])
+
+        # then
+        assert response.content == "second"
+        replayed = await create_llm(DiskLLMCache(tmp_path, mode="replay_only"), []).ainvoke([HumanMessage("hello")])
+        assert replayed.content == "second"
+
+    @pytest.mark.asyncio
+    async def test_replay_only_raises_on_miss(self, tmp_path: Path):
+        # given
+        cache = DiskLLMCache(tmp_path, mode="replay_only")
+
+        # when / then
+        with pytest.raises(LLMCacheMiss):
+            await create_llm(cache, ["live"]).ainvoke([HumanMessage("hello")])
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used_entries(self, tmp_path: Path):
+        # given
+        cache = DiskLLMCache(tmp_path, mode="read_through", max_entries=10)
+        llm = GenericFakeChatModel(messages=(AIMessage(f"answer {i}") for i in itertools.count()), cache=cache)
+
+        # when
+        for i in range(11):
+            await llm.ainvoke([HumanMessage(f"question {i}")])
+
+        # then
+        assert len(list(tmp_path.glob("*/*.json"))) == 9
@@ -0,0 +1,79 @@
+"""Tests for the process-wide prompt registry"""
+import os
+from pathlib import Path
+
+import pytest
+
+from agents.prompt import PromptRegistry, PromptTemplate, get_prompt_registry
+
+
+def write_prompt(path: Path, content: str, mtime_ns: int):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+class TestPromptTemplate:
+    """Tests for PromptTemplate."""
+
+    def test_formats_like_str_format(self):
+        # given
+        text = "Find {min_results} insights about {behavior!r}, {{literal}} {ratio:.1f}"
+
+        # when
+        formatted = PromptTemplate(text).format(min_results=5, behavior="marketing", ratio=0.25)
+
+        # then
+        assert formatted == text.format(min_results=5, behavior="marketing", ratio=0.25)
+
+
+class TestPromptRegistry:
+    """Tests for PromptRegistry."""
+
+    def test_preload_reads_all_prompts(self, tmp_path: Path):
+        # given
+        write_prompt(tmp_path / "system" / "search_agent.md", "Find {min_results} insights", mtime_ns=1)
+        registry = PromptRegistry(tmp_path)
+        registry.preload()
+        (tmp_path / "system" / "search_agent.md").unlink()
+
+        # when
+        template = registry.get("search_agent", "system")
+
+        # then
+        assert template.format(min_results=3) == "Find 3 insights"
+
+    def test_reloads_prompt_when_mtime_changes(self, tmp_path: Path):
+        # given
+        prompt_path = tmp_path / "system" / "search_agent.md"
+        write_prompt(prompt_path, "old prompt", mtime_ns=1)
+        registry = PromptRegistry(tmp_path, check_interval_seconds=0)
+        registry.preload()
+
+        # when
+        write_prompt(prompt_path, "new prompt", mtime_ns=2_000_000_000)
+
+        # then
+        assert registry.get("search_agent", "system").text == "new prompt"
+
+    def test_does_not_check_files_within_interval(self, tmp_path: Path):
+        # given
+        prompt_path = tmp_path / "system" / "search_agent.md"
+        write_prompt(prompt_path, "old prompt", mtime_ns=1)
+        registry = PromptRegistry(tmp_path, check_interval_seconds=3600)
+        registry.preload()
+
+        # when
+        write_prompt(prompt_path, "new prompt", mtime_ns=2_000_000_000)
+
+        # then
+        assert registry.get("search_agent", "system").text == "old prompt"
+
+    def test_missing_prompt_raises(self, tmp_path: Path):
+        # when / then
+        with pytest.raises(FileNotFoundError):
+            PromptRegistry(tmp_path).get("missing", "system")
+
+    def test_registry_is_shared_per_folder(self, tmp_path: Path):
+        # when / then
+        assert get_prompt_registry(tmp_path) is get_prompt_registry(tmp_path / ".")
@@ -0,0 +1,68 @@
+"""Tests for the execution budget of the search agent"""
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from agents.search_agent import UsageLedger
+from agents.search_agent.budget import EXECUTION_BUDGET, ExecutionBudget, answered_messages, enforce_budget
+from agents.search_agent.usage import LLMCallUsage
+
+
+def create_tool_call_message(message_id: str = "ai-1", call_id: str = "call-1") -> AIMessage:
+    return AIMessage("", id=message_id, tool_calls=[{"name": "reddit_search", "args": {}, "id": call_id}],
+                     additional_kwargs={"tool_calls": [{"id": call_id}]})
+
+
+def create_ledger(total_tokens: int) -> UsageLedger:
+    ledger = UsageLedger()
+    ledger.llm_calls.append(LLMCallUsage(node="agent", model=None, input_tokens=total_tokens, output_tokens=0,
+                                         cache_read_tokens=0, latency_ms=0))
+    return ledger
+
+
+class TestEnforceBudget:
+    """Tests for the post model hook enforcing the execution budget."""
+
+    def test_drops_tool_calls_when_token_budget_is_exhausted(self):
+        # given
+        budget = ExecutionBudget(create_ledger(5000), max_total_tokens=5000)
+        state = {"messages": [HumanMessage("query"), create_tool_call_message()]}
+
+        # when
+        update = enforce_budget(state, {"configurable": {EXECUTION_BUDGET: budget}})
+
+        # then
+        message = update["messages"][0]
+        assert message.id == "ai-1"
+        assert message.tool_calls == []
+        assert "tool_calls" not in message.additional_kwargs
+        assert "token budget" in message.content
+
+    def test_keeps_tool_calls_within_budget(self):
+        # given
+        budget = ExecutionBudget(create_ledger(100), max_duration_seconds=600, max_total_tokens=5000)
+        state = {"messages": [HumanMessage("query"), create_tool_call_message()]}
+
+        # when
+        update = enforce_budget(state, {"configurable": {EXECUTION_BUDGET: budget}})
+
+        # then
+        assert update == {}
+
+
+class TestAnsweredMessages:
+    """Tests for removing unanswered tool calls before the final response."""
+
+    def test_drops_unanswered_tool_calls(self):
+        # given
+        messages = [
+            HumanMessage("query"),
+            create_tool_call_message("ai-1", "call-1"),
+            ToolMessage("result", tool_call_id="call-1"),
+            create_tool_call_message("ai-2", "call-2"),
+        ]
+
+        # when
+        sanitized = answered_messages(messages)
+
+        # then
+        assert [m.id for m in sanitized if isinstance(m, AIMessage)] == ["ai-1"]
+        assert [m.tool_call_id for m in sanitized if isinstance(m, ToolMessage)] == ["call-1"]
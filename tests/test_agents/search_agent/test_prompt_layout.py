@@ -0,0 +1,78 @@
+"""Tests for the search agent system prompt layouts"""
+from pathlib import Path
+
+from langchain_core.language_models import GenericFakeChatModel
+
+from agents.config import Config, RedditConfig
+from agents.prompt import PromptRegistry
+from agents.search_agent import CreateSearchAgentCommand
+from agents.search_agent.search_agent import _assemble_prompt
+
+PROMPTS_FOLDER = Path(__file__).parent.parent.parent.parent / "prompts"
+
+
+def create_config(prompt_layout: str) -> Config:
+    return Config(
+        llm=GenericFakeChatModel(messages=iter([])),
+        reddit_config=RedditConfig(client_id="id", client_secret="secret", user_agent="agent"),
+        prompts_folder=PROMPTS_FOLDER,
+        prompt_layout=prompt_layout,
+    )
+
+
+def create_command(behavior: str = "Find marketing tactics", min_results: int = 5) -> CreateSearchAgentCommand:
+    return CreateSearchAgentCommand(behavior=behavior, search_query="indie marketing", search_types={"reddit"},
+                                    min_results=min_results)
+
+
+class TestAssemblePrompt:
+    """Tests for _assemble_prompt."""
+
+    def test_prefix_cache_layout_starts_with_static_instructions(self):
+        # given
+        instructions = (PROMPTS_FOLDER / "system" / "search_agent.md").read_text(encoding="utf-8")
+        first = create_command(behavior="Find marketing tactics", min_results=5)
+        second = create_command(behavior="Find SaaS pricing pain points", min_results=12)
+
+        # when
+        first_prompt = _assemble_prompt(create_config("prefix_cache"), first, PromptRegistry(PROMPTS_FOLDER))
+        second_prompt = _assemble_prompt(create_config("prefix_cache"), second, PromptRegistry(PROMPTS_FOLDER))
+
+        # then
+        assert first_prompt.startswith(instructions)
+        assert second_prompt.startswith(instructions)
+        first_context = first_prompt[len(instructions):]
+        assert "at least 5 actionable insights" in first_context
+        assert "Find marketing tactics" in first_context
+        second_context = second_prompt[len(instructions):]
+        assert "at least 12 actionable insights" in second_context
+        assert "Find SaaS pricing pain points" in second_context
+
+    def test_inline_layout_puts_search_context_before_instructions(self):
+        # given
+        instructions = (PROMPTS_FOLDER / "system" / "search_agent.md").read_text(encoding="utf-8")
+        config = create_config("inline")
+
+        # when
+        prompt = _assemble_prompt(config, create_command(min_results=7), PromptRegistry(PROMPTS_FOLDER))
+
+        # then
+        assert prompt.endswith("\n\n" + instructions.strip())
+        context = prompt[:-len(instructions.strip())]
+        assert context.startswith("## Search Context")
+        assert "at least 7 actionable insights" in context
+        assert "Find marketing tactics" in context
+
+    def test_layouts_fill_in_search_context(self):
+        # given
+        command = create_command(behavior="Find {braces} in behavior", min_results=9)
+
+        for layout in ("prefix_cache", "inline"):
+            # when
+            prompt = _assemble_prompt(create_config(layout), command, PromptRegistry(PROMPTS_FOLDER))
+
+            # then
+            assert "at least 9 actionable insights" in prompt
+            assert "Find {braces} in behavior" in prompt
+            assert "{min_results}" not in prompt
+            assert "{behavior}" not in prompt
@@ -0,0 +1,219 @@
+"""Tests for the execute_search run loop using a fake chat model"""
+import dataclasses
+import itertools
+from contextlib import AsyncExitStack
+from pathlib import Path
+
+import pytest
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.errors import GraphRecursionError
+
+from agents.config import Config, RedditConfig
+from agents.search_agent import AgentGraphCache, AgentStep, CreateSearchAgentCommand, SearchResult, execute_search
+from agents.search_agent.search_agent import _borrow_reddit_client
+from agents.search_agent.tool.reddit import GovernedRequestor, TokenBucketGovernor
+
+
+class FakeChatModel(GenericFakeChatModel):
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def with_structured_output(self, schema, **kwargs):
+        return RunnableLambda(lambda _: SearchResult.model_construct(findings=[]))
+
+
+class FlakyStructuredOutputChatModel(FakeChatModel):
+    structured_output_failures: int = 1
+
+    def with_structured_output(self, schema, **kwargs):
+        def respond(_):
+            if self.structured_output_failures > 0:
+                self.structured_output_failures -= 1
+                raise RuntimeError("transient LLM error")
+            return SearchResult.model_construct(findings=[])
+
+        return RunnableLambda(respond)
+
+
+def create_config(graph_cache: AgentGraphCache | None = None, messages: list[AIMessage] | None = None,
+                  llm: FakeChatModel | None = None, checkpointer: InMemorySaver | None = None) -> Config:
+    return Config(
+        llm=llm or FakeChatModel(messages=iter(messages or [AIMessage("no more searches needed")] * 2)),
+        reddit_config=RedditConfig(client_id="id", client_secret="secret", user_agent="agent"),
+        prompts_folder=Path(__file__).parent.parent.parent.parent / "prompts",
+        graph_cache=graph_cache,
+        checkpointer=checkpointer,
+    )
+
+
+def create_command(behavior: str = "Find marketing tactics") -> CreateSearchAgentCommand:
+    return CreateSearchAgentCommand(behavior=behavior, search_query="indie marketing", search_types={"reddit"})
+
+
+class TestExecuteSearchStreaming:
+    """Tests for streaming the search agent steps."""
+
+    @pytest.mark.asyncio
+    async def test_reports_steps_and_returns_structured_response(self):
+        # given
+        config = create_config()
+        command = create_command()
+        steps: list[AgentStep] = []
+
+        # when
+        result = await execute_search(config, command, on_step=steps.append)
+
+        # then
+        assert result.findings == []
+        assert [step.node for step in steps] == ["agent", "generate_structured_response"]
+        assert steps[0].messages[0].content == "no more searches needed"
+
+
+class TestExecuteSearchGraphCache:
+    """Tests for reusing compiled agent graphs between executions."""
+
+    @pytest.mark.asyncio
+    async def test_reuses_graph_for_identical_configuration(self):
+        # given
+        graph_cache = AgentGraphCache()
+        config = create_config(graph_cache)
+
+        # when
+        await execute_search(config, create_command())
+        await execute_search(config, create_command())
+
+        # then
+        assert len(graph_cache) == 1
+
+    @pytest.mark.asyncio
+    async def test_builds_graph_per_prompt(self):
+        # given
+        graph_cache = AgentGraphCache()
+        config = create_config(graph_cache)
+
+        # when
+        await execute_search(config, create_command("Find marketing tactics"))
+        await execute_search(config, create_command("Find pricing tactics"))
+
+        # then
+        assert len(graph_cache) == 2
+
+
+class TestExecuteSearchSummarization:
+    """Tests for enabling the history summarization."""
+
+    @pytest.mark.asyncio
+    async def test_builds_graph_without_summarization_by_default(self):
+        # given
+        graph_cache = AgentGraphCache()
+        config = create_config(graph_cache)
+
+        # when
+        await execute_search(config, create_command())
+
+        # then
+        graph = next(iter(graph_cache._graphs.values()))
+        assert "pre_model_hook" not in graph.nodes
+
+    @pytest.mark.asyncio
+    async def test_builds_graph_with_summarization_when_enabled(self):
+        # given
+        graph_cache = AgentGraphCache()
+        config = create_config(graph_cache)
+        command = create_command().model_copy(update={"summarize_history": True})
+
+        # when
+        await execute_search(config, command)
+
+        # then
+        graph = next(iter(graph_cache._graphs.values()))
+        assert "pre_model_hook" in graph.nodes
+
+
+class TestExecuteSearchRedditClient:
+    """Tests for the Reddit client of an execution without a client pool."""
+
+    @pytest.mark.asyncio
+    async def test_client_goes_through_shared_rate_limit(self):
+        # given
+        governor = TokenBucketGovernor()
+        config = dataclasses.replace(create_config(), rate_limit_governor=governor)
+
+        # when
+        async with AsyncExitStack() as resources:
+            reddit = await _borrow_reddit_client(config, resources)
+
+            # then
+            requestor = reddit._core._requestor
+            assert isinstance(requestor, GovernedRequestor)
+            assert requestor.governor is governor
+
+
+class TestExecuteSearchBudget:
+    """Tests for finishing the search once the execution budget is exhausted."""
+
+    @pytest.mark.asyncio
+    async def test_returns_result_without_searching_when_time_budget_is_exhausted(self):
+        # given
+        tool_call = AIMessage("", tool_calls=[{"name": "reddit_search", "args": {}, "id": "call-1"}])
+        config = create_config(messages=[tool_call])
+        command = create_command().model_copy(update={"max_duration_seconds": 1e-6})
+        steps: list[AgentStep] = []
+
+        # when
+        result = await execute_search(config, command, on_step=steps.append)
+
+        # then
+        assert result.findings == []
+        assert [step.node for step in steps] == ["agent", "post_model_hook", "generate_structured_response"]
+        assert steps[1].messages[0].tool_calls == []
+
+    @pytest.mark.asyncio
+    async def test_fails_on_recursion_limit_without_budget(self):
+        # given
+        tool_call = AIMessage("", tool_calls=[{"name": "unknown_tool", "args": {}, "id": "call-1"}])
+        config = create_config(llm=FakeChatModel(messages=itertools.repeat(tool_call)))
+        command = create_command().model_copy(update={"recursion_limit": 4})
+
+        # when / then
+        with pytest.raises(GraphRecursionError):
+            await execute_search(config, command)
+
+    @pytest.mark.asyncio
+    async def test_returns_result_on_recursion_limit_with_budget(self):
+        # given
+        tool_call = AIMessage("", tool_calls=[{"name": "unknown_tool", "args": {}, "id": "call-1"}])
+        config = create_config(llm=FakeChatModel(messages=itertools.repeat(tool_call)))
+        command = create_command().model_copy(update={"recursion_limit": 4, "max_total_tokens": 1_000_000})
+
+        # when
+        result = await execute_search(config, command)
+
+        # then
+        assert result.findings == []
+
+
+class TestExecuteSearchCheckpointing:
+    """Tests for resuming a failed execution from its checkpoint."""
+
+    @pytest.mark.asyncio
+    async def test_retry_resumes_from_last_completed_step(self):
+        # given
+        checkpointer = InMemorySaver()
+        llm = FlakyStructuredOutputChatModel(messages=iter([AIMessage("no more searches needed")]))
+        config = create_config(llm=llm, checkpointer=checkpointer)
+        with pytest.raises(RuntimeError, match="transient LLM error"):
+            await execute_search(config, create_command(), thread_id="execution-1")
+        steps: list[AgentStep] = []
+
+        # when
+        result = await execute_search(config, create_command(), on_step=steps.append, thread_id="execution-1")
+
+        # then
+        assert result.findings == []
+        assert [step.node for step in steps] == ["generate_structured_response"]
+        assert await checkpointer.aget_tuple({"configurable": {"thread_id": "execution-1"}}) is None
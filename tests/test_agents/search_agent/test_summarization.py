@@ -0,0 +1,81 @@
+"""Tests for the message history summarization hook"""
+import itertools
+
+import pytest
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage, RemoveMessage
+
+from agents.search_agent import CreateSearchAgentCommand
+from agents.search_agent.summarization import create_summarization_hook
+from agents.search_agent.tool.reddit.serialization import CHARS_PER_TOKEN
+
+
+def create_history(tool_results: int, result_length: int) -> list:
+    messages = [HumanMessage("find marketing ideas", id="h")]
+    for i in range(tool_results):
+        messages.append(AIMessage("", id=f"a{i}", tool_calls=[{"name": "reddit_search", "args": {}, "id": f"c{i}"}]))
+        messages.append(ToolMessage("x" * result_length, id=f"t{i}", name="reddit_search", tool_call_id=f"c{i}"))
+    return messages
+
+
+def create_llm() -> GenericFakeChatModel:
+    return GenericFakeChatModel(messages=itertools.repeat(AIMessage("short summary")))
+
+
+class TestSummarizationHook:
+    """Tests for create_summarization_hook."""
+
+    @pytest.mark.asyncio
+    async def test_keeps_history_within_budget(self):
+        # given
+        hook = create_summarization_hook(create_llm(), "summarize", max_tokens=10_000, max_summary_tokens=100)
+
+        # when
+        update = await hook({"messages": create_history(tool_results=2, result_length=1000)})
+
+        # then
+        assert update == {}
+
+    @pytest.mark.asyncio
+    async def test_keeps_full_size_tool_result_with_default_budget(self):
+        # given
+        command = CreateSearchAgentCommand(behavior="Find marketing tactics", search_query="indie marketing",
+                                           search_types={"reddit"}, max_result_tokens=1000)
+        hook = create_summarization_hook(create_llm(), "summarize", command.max_tokens, command.max_summary_tokens)
+        history = create_history(tool_results=2, result_length=command.max_result_tokens * CHARS_PER_TOKEN)
+
+        # when
+        update = await hook({"messages": history})
+
+        # then
+        assert update == {}
+
+    @pytest.mark.asyncio
+    async def test_summarizes_older_tool_results_only(self):
+        # given
+        hook = create_summarization_hook(create_llm(), "summarize", max_tokens=1000, max_summary_tokens=100)
+        history = create_history(tool_results=3, result_length=4000)
+
+        # when
+        update = await hook({"messages": history})
+
+        # then
+        remove_all, *messages = update["messages"]
+        assert isinstance(remove_all, RemoveMessage)
+        assert [m.id for m in messages] == [m.id for m in history]
+        tool_results = [m for m in messages if isinstance(m, ToolMessage)]
+        assert [m.content for m in tool_results[:2]] == ["short summary", "short summary"]
+        assert [m.tool_call_id for m in tool_results] == ["c0", "c1", "c2"]
+        assert tool_results[2].content == "x" * 4000
+
+    @pytest.mark.asyncio
+    async def test_does_not_summarize_twice(self):
+        # given
+        hook = create_summarization_hook(create_llm(), "summarize", max_tokens=1000, max_summary_tokens=100)
+        _, *history = (await hook({"messages": create_history(tool_results=3, result_length=4000)}))["messages"]
+
+        # when
+        update = await hook({"messages": history})
+
+        # then
+        assert update == {}
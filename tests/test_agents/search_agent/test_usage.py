@@ -0,0 +1,40 @@
+"""Tests for the per-execution usage ledger"""
+import pytest
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import tool
+
+from agents.search_agent import UsageLedger
+
+
+@tool
+async def echo(text: str) -> str:
+    """Echo the text back."""
+    return text
+
+
+class TestUsageLedger:
+    """Tests for UsageLedger."""
+
+    @pytest.mark.asyncio
+    async def test_collects_llm_and_tool_usage(self):
+        # given
+        ledger = UsageLedger()
+        message = AIMessage("answer", usage_metadata={
+            "input_tokens": 120, "output_tokens": 30, "total_tokens": 150,
+            "input_token_details": {"cache_read": 100},
+        }, response_metadata={"model_name": "gpt-4.1"})
+        llm = GenericFakeChatModel(messages=iter([message]))
+
+        # when
+        await llm.ainvoke([HumanMessage("question")], config={"callbacks": [ledger]})
+        await echo.ainvoke({"text": "hello"}, config={"callbacks": [ledger]})
+
+        # then
+        usage = ledger.to_dict()
+        assert usage["llm"]["calls"] == 1
+        assert usage["llm"]["input_tokens"] == 120
+        assert usage["llm"]["output_tokens"] == 30
+        assert usage["llm"]["cache_read_tokens"] == 100
+        assert usage["tools"]["calls"] == 1
+        assert usage["tool_calls"][0]["name"] == "echo"
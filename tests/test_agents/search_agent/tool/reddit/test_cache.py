@@ -0,0 +1,165 @@
+"""Tests for Reddit submission and search result caches"""
+import time
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from agents.search_agent.tool.reddit.cache import FileSubmissionCache, SearchResultCache, search_query_key
+from agents.search_agent.tool.reddit.comments import CommentSampling, CommentStats
+from agents.search_agent.tool.reddit.models import (RedditSubmissionComment, SearchQuery, SearchResult,
+                                                    SubmissionFilter)
+
+
+def create_stats() -> CommentStats:
+    return CommentStats(
+        count=3,
+        score_histogram=Counter({5: 2, -1: 1}),
+        top_comments=[RedditSubmissionComment(score=5, body="first"), RedditSubmissionComment(score=5, body="second")],
+    )
+
+
+def create_query(query: str = "marketing", **filter_kwargs) -> SearchQuery:
+    return SearchQuery(subreddit="startups", query=query, filter=SubmissionFilter(**filter_kwargs))
+
+
+class TestFileSubmissionCache:
+    """Tests for FileSubmissionCache."""
+
+    @pytest.mark.asyncio
+    async def test_put_and_get(self, tmp_path: Path):
+        # given
+        cache = FileSubmissionCache(tmp_path)
+        sampling = CommentSampling()
+        await cache.put("abc123", time.time() - 3600, sampling, create_stats())
+
+        # when
+        stats = await cache.get("abc123", sampling)
+
+        # then
+        assert stats == create_stats()
+
+    @pytest.mark.asyncio
+    async def test_get_missing(self, tmp_path: Path):
+        # given
+        cache = FileSubmissionCache(tmp_path)
+
+        # when
+        stats = await cache.get("abc123", CommentSampling())
+
+        # then
+        assert stats is None
+
+    @pytest.mark.asyncio
+    async def test_get_expired(self, tmp_path: Path):
+        # given
+        cache = FileSubmissionCache(tmp_path, min_ttl_seconds=0, max_ttl_seconds=0)
+        await cache.put("abc123", time.time(), CommentSampling(), create_stats())
+
+        # when
+        stats = await cache.get("abc123", CommentSampling())
+
+        # then
+        assert stats is None
+
+    @pytest.mark.asyncio
+    async def test_get_with_different_sampling(self, tmp_path: Path):
+        # given
+        cache = FileSubmissionCache(tmp_path)
+        await cache.put("abc123", time.time(), CommentSampling(), create_stats())
+
+        # when
+        stats = await cache.get("abc123", CommentSampling(max_depth=1))
+
+        # then
+        assert stats is None
+
+    def test_ttl_grows_with_submission_age(self, tmp_path: Path):
+        # given
+        cache = FileSubmissionCache(tmp_path, min_ttl_seconds=60, max_ttl_seconds=3600, ttl_age_ratio=0.1)
+        now = time.time()
+
+        # when / then
+        assert cache.ttl_seconds(now - 10, now) == 60
+        assert cache.ttl_seconds(now - 10_000, now) == pytest.approx(1000)
+        assert cache.ttl_seconds(now - 1_000_000, now) == 3600
+
+    @pytest.mark.asyncio
+    async def test_rejects_invalid_submission_id(self, tmp_path: Path):
+        # given
+        cache = FileSubmissionCache(tmp_path)
+
+        # when / then
+        with pytest.raises(ValueError):
+            await cache.get("../secret", CommentSampling())
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used_entries(self, tmp_path: Path):
+        # given
+        cache = FileSubmissionCache(tmp_path, max_entries=10)
+        sampling = CommentSampling()
+        await cache.put("first", time.time() - 3600, sampling, create_stats())
+        for i in range(9):
+            await cache.put(f"s{i}", time.time() - 3600, sampling, create_stats())
+        await cache.get("first", sampling)
+
+        # when
+        await cache.put("last", time.time() - 3600, sampling, create_stats())
+
+        # then
+        assert len(list(tmp_path.glob("*/*.json"))) == 9
+        assert await cache.get("first", sampling) is not None
+        assert await cache.get("last", sampling) is not None
+
+
+class TestSearchResultCache:
+    """Tests for SearchResultCache."""
+
+    def test_key_is_canonical(self):
+        # given
+        query = SearchQuery(subreddit="Startups", query="  growth   marketing ",
+                            filter=SubmissionFilter(required_keywords=["SaaS", "b2b"], filter_prompt="ignored"))
+        same_query = SearchQuery(subreddit="startups", query="growth marketing",
+                                 filter=SubmissionFilter(required_keywords=["B2B", "saas"]))
+
+        # when / then
+        assert search_query_key(query) == search_query_key(same_query)
+        assert search_query_key(query) != search_query_key(create_query(min_score=100))
+
+    def test_get_counts_hits_and_misses(self):
+        # given
+        cache = SearchResultCache()
+        result = SearchResult(subreddit="startups")
+
+        # when
+        missed = cache.get(create_query())
+        cache.put(create_query(), result)
+        hit = cache.get(create_query())
+
+        # then
+        assert missed is None
+        assert hit == result
+        assert (cache.stats().hits, cache.stats().misses, cache.stats().size) == (1, 1, 1)
+
+    def test_evicts_least_recently_used(self):
+        # given
+        cache = SearchResultCache(max_entries=2)
+        cache.put(create_query("a"), SearchResult(subreddit="a"))
+        cache.put(create_query("b"), SearchResult(subreddit="b"))
+        cache.get(create_query("a"))
+
+        # when
+        cache.put(create_query("c"), SearchResult(subreddit="c"))
+
+        # then
+        assert cache.get(create_query("a")) is not None
+        assert cache.get(create_query("b")) is None
+        assert cache.get(create_query("c")) is not None
+
+    def test_expires_entries(self):
+        # given
+        cache = SearchResultCache(ttl_seconds=0)
+        cache.put(create_query(), SearchResult(subreddit="startups"))
+
+        # when / then
+        assert cache.get(create_query()) is None
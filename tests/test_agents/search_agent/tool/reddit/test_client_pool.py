@@ -0,0 +1,77 @@
+"""Tests for the shared Reddit client pool"""
+import asyncio
+
+import pytest
+
+from agents.search_agent.tool.reddit.client_pool import RedditClientPool
+
+
+class FakeReddit:
+
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class TestRedditClientPool:
+    """Tests for RedditClientPool."""
+
+    @pytest.mark.asyncio
+    async def test_reuses_returned_client(self):
+        # given
+        pool = RedditClientPool(FakeReddit, size=2)
+        async with pool.acquire() as first:
+            pass
+
+        # when
+        async with pool.acquire() as second:
+            pass
+
+        # then
+        assert second is first
+        assert not first.closed
+
+    @pytest.mark.asyncio
+    async def test_borrowers_wait_when_pool_is_exhausted(self):
+        # given
+        pool = RedditClientPool(FakeReddit, size=1)
+        released = asyncio.Event()
+
+        async def hold():
+            async with pool.acquire():
+                await released.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+
+        # when
+        waiter = asyncio.create_task(pool.acquire().__aenter__())
+        await asyncio.sleep(0.01)
+        blocked = not waiter.done()
+        released.set()
+        await holder
+        await waiter
+
+        # then
+        assert blocked
+        assert waiter.done()
+
+    @pytest.mark.asyncio
+    async def test_close_closes_clients(self):
+        # given
+        pool = RedditClientPool(FakeReddit, size=2)
+        async with pool.acquire() as idle_client:
+            pass
+
+        # when
+        async with pool.acquire() as busy_client:
+            await pool.close()
+
+        # then
+        assert idle_client is busy_client
+        assert busy_client.closed
+        with pytest.raises(RuntimeError):
+            async with pool.acquire():
+                pass
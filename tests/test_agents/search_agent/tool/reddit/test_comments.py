@@ -0,0 +1,94 @@
+"""Tests for streaming comment tree aggregation"""
+import pytest
+from asyncpraw.models import MoreComments
+
+from agents.search_agent.tool.reddit.comments import CommentSampling, collect_comment_stats
+
+
+class FakeComment:
+
+    def __init__(self, score: int, body: str, replies: list | None = None):
+        self.score = score
+        self.body = body
+        self.replies = replies or []
+
+
+class FakeCommentForest(list):
+
+    def __init__(self, comments: list):
+        super().__init__(comments)
+        self.replace_more_limit = None
+
+    async def replace_more(self, limit: int):
+        self.replace_more_limit = limit
+
+
+class FakeSubmission:
+
+    def __init__(self, comments: list):
+        self.comments = FakeCommentForest(comments)
+
+
+def create_submission() -> FakeSubmission:
+    return FakeSubmission([
+        FakeComment(10, "a", replies=[
+            FakeComment(1, "a.1", replies=[FakeComment(50, "a.1.1")]),
+            FakeComment(7, "a.2"),
+        ]),
+        MoreComments(None, {"count": 10, "children": ["x"], "id": "x", "parent_id": "t3_x", "name": "t1_x"}),
+        FakeComment(3, "b"),
+        FakeComment(10, "c"),
+    ])
+
+
+class TestCollectCommentStats:
+    """Tests for collect_comment_stats."""
+
+    @pytest.mark.asyncio
+    async def test_collects_whole_tree(self):
+        # given
+        submission = create_submission()
+
+        # when
+        stats = await collect_comment_stats(submission, CommentSampling(top_k=3))
+
+        # then
+        assert stats.count == 6
+        assert stats.valuable_count(7) == 4
+        assert stats.valuable_ratio(7) == pytest.approx(4 / 6)
+        assert [c.body for c in stats.top_comments] == ["a.1.1", "a", "c"]
+        assert submission.comments.replace_more_limit is None
+
+    @pytest.mark.asyncio
+    async def test_respects_depth_and_breadth(self):
+        # given
+        submission = create_submission()
+
+        # when
+        stats = await collect_comment_stats(submission, CommentSampling(max_depth=1, max_breadth=2))
+
+        # then - top level "a", "b" and the first two replies of "a"
+        assert stats.count == 4
+        assert [c.body for c in stats.top_comments] == ["a", "a.2", "b", "a.1"]
+
+    @pytest.mark.asyncio
+    async def test_top_valuable_filters_by_score(self):
+        # given
+        submission = create_submission()
+
+        # when
+        stats = await collect_comment_stats(submission, CommentSampling(top_k=5))
+
+        # then
+        assert [c.body for c in stats.top_valuable(10)] == ["a.1.1", "a", "c"]
+
+    @pytest.mark.asyncio
+    async def test_replaces_more_comments_when_limit_set(self):
+        # given
+        submission = create_submission()
+
+        # when
+        await collect_comment_stats(submission, CommentSampling(replace_more_limit=3))
+
+        # then
+        assert submission.comments.replace_more_limit == 3
@@ -0,0 +1,50 @@
+"""Tests for the compiled submission filter matchers"""
+from agents.search_agent.tool.reddit.matcher import KeywordMatcher
+from agents.search_agent.tool.reddit.models import SubmissionFilter
+
+
+class TestKeywordMatcher:
+    """Tests for KeywordMatcher."""
+
+    def test_finds_overlapping_and_nested_keywords(self):
+        # given
+        matcher = KeywordMatcher(["SaaS", "saas founder", "found", "api"])
+
+        # when
+        found = matcher.find("a saas founder building apis")
+
+        # then
+        assert found == {"saas", "saas founder", "found", "api"}
+
+    def test_empty_keyword_is_always_found(self):
+        # when / then
+        assert KeywordMatcher([""]).find("anything") == {""}
+        assert KeywordMatcher([]).find("anything") == set()
+
+
+class TestCompiledSubmissionFilter:
+    """Tests for SubmissionFilter.compiled."""
+
+    def test_is_compiled_once_per_filter(self):
+        # given
+        submission_filter = SubmissionFilter(required_keywords=["Python"])
+
+        # when / then
+        assert submission_filter.compiled is submission_filter.compiled
+
+    def test_matches_required_and_excluded_keywords(self):
+        # given
+        compiled = SubmissionFilter(required_keywords=["Python", "api"], excluded_keywords=["Hiring"]).compiled
+
+        # when / then
+        assert compiled.matches_keywords("my python api side project")
+        assert not compiled.matches_keywords("my python side project")
+        assert not compiled.matches_keywords("hiring python api developers")
+
+    def test_excluded_flair_is_a_case_insensitive_substring(self):
+        # given
+        compiled = SubmissionFilter(excluded_flairs=["Meme"]).compiled
+
+        # when / then
+        assert compiled.has_excluded_flair("Weekly MEMES")
+        assert not compiled.has_excluded_flair("Showcase")
@@ -0,0 +1,70 @@
+"""Tests for the shared Reddit rate limit governor"""
+import asyncio
+
+import pytest
+
+from agents.search_agent.tool.reddit.rate_limit import TokenBucketGovernor, parse_rate_limit_headers
+
+
+class TestTokenBucketGovernor:
+    """Tests for TokenBucketGovernor."""
+
+    @pytest.mark.asyncio
+    async def test_allows_burst_without_waiting(self):
+        # given
+        governor = TokenBucketGovernor(requests_per_minute=60, burst=3)
+        loop = asyncio.get_running_loop()
+
+        # when
+        started = loop.time()
+        for _ in range(3):
+            await governor.acquire()
+        elapsed = loop.time() - started
+
+        # then
+        assert elapsed < 0.05
+
+    @pytest.mark.asyncio
+    async def test_spaces_concurrent_requests_at_refill_rate(self):
+        # given
+        governor = TokenBucketGovernor(requests_per_minute=600, burst=1)
+        loop = asyncio.get_running_loop()
+
+        # when - one token available, 10 tokens per second refill
+        started = loop.time()
+        await asyncio.gather(*(governor.acquire() for _ in range(3)))
+        elapsed = loop.time() - started
+
+        # then
+        assert 0.15 <= elapsed < 0.4
+
+    @pytest.mark.asyncio
+    async def test_observe_spreads_remaining_quota_until_reset(self):
+        # given
+        governor = TokenBucketGovernor(requests_per_minute=100, burst=10)
+
+        # when
+        await governor.observe(remaining=30, reset_seconds=60)
+
+        # then
+        assert governor.rate == pytest.approx(0.5)
+
+    @pytest.mark.asyncio
+    async def test_observe_caps_tokens_by_remaining_quota(self):
+        # given
+        governor = TokenBucketGovernor(requests_per_minute=600, burst=10)
+        await governor.observe(remaining=0, reset_seconds=1)
+        loop = asyncio.get_running_loop()
+
+        # when
+        started = loop.time()
+        await governor.acquire()
+        elapsed = loop.time() - started
+
+        # then
+        assert elapsed >= 0.9
+
+    def test_parse_rate_limit_headers(self):
+        # when / then
+        assert parse_rate_limit_headers({"x-ratelimit-remaining": "95.0", "x-ratelimit-reset": "42"}) == (95.0, 42.0)
+        assert parse_rate_limit_headers({}) is None
@@ -0,0 +1,245 @@
+"""Tests for RedditToolsService search hydration using in-memory Reddit fakes"""
+import asyncio
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from agents.search_agent.tool.reddit import SearchQuery
+from agents.search_agent.tool.reddit.cache import FileSubmissionCache, SearchResultCache
+from agents.search_agent.tool.reddit.models import SubmissionFilter
+from agents.search_agent.tool.reddit.tools import (
+    RedditToolsService, RedditSearchContext, REDDIT_SEARCH_CONTEXT, create_reddit_search_tool,
+)
+
+
+class FakeComment:
+
+    def __init__(self, score: int, body: str, replies: list["FakeComment"] | None = None):
+        self.score = score
+        self.body = body
+        self.replies = replies or []
+
+
+class FakeSubmission:
+
+    def __init__(self, submission_id: str, score: int = 10, load_delay: float = 0.0):
+        self.id = submission_id
+        self.title = f"Submission title {submission_id}"
+        self.selftext = "Submission content which is long enough to pass the content length filter"
+        self.score = score
+        self.upvote_ratio = 0.9
+        self.num_comments = 5
+        self.created_utc = datetime.now().timestamp()
+        self.link_flair_text = None
+        self.comments = [FakeComment(score=5, body=f"comment {i}") for i in range(5)]
+        self.load_delay = load_delay
+        self.loaded = False
+
+    async def load(self):
+        await asyncio.sleep(self.load_delay)
+        self.loaded = True
+
+
+class FakeSubreddit:
+
+    def __init__(self, submissions: list[FakeSubmission]):
+        self.submissions = submissions
+        self.yielded = 0
+
+    async def search(self, **kwargs):
+        for submission in self.submissions:
+            self.yielded += 1
+            yield submission
+
+
+class FakeReddit:
+
+    def __init__(self, subreddit: FakeSubreddit):
+        self._subreddit = subreddit
+
+    async def subreddit(self, name: str) -> FakeSubreddit:
+        return self._subreddit
+
+
+def create_query(limit: int) -> SearchQuery:
+    return SearchQuery(subreddit="startups", query="marketing", limit=limit, filter=SubmissionFilter())
+
+
+class TestRedditServiceHydration:
+    """Tests for concurrent submission hydration."""
+
+    @pytest.mark.asyncio
+    async def test_search_preserves_result_order(self):
+        # given - earlier submissions load slower than later ones
+        submissions = [FakeSubmission(f"s{i}", load_delay=0.05 - i * 0.01) for i in range(5)]
+        service = RedditToolsService(FakeReddit(FakeSubreddit(submissions)), search_concurrency=5)
+
+        # when
+        search_result = await service.search(create_query(limit=5))
+
+        # then
+        assert [s.id for s in search_result.submissions] == ["s0", "s1", "s2", "s3", "s4"]
+
+    @pytest.mark.asyncio
+    async def test_search_skips_rejected_submissions(self):
+        # given
+        submissions = [FakeSubmission("s0"), FakeSubmission("s1", score=0), FakeSubmission("s2")]
+        service = RedditToolsService(FakeReddit(FakeSubreddit(submissions)), search_concurrency=3)
+
+        # when
+        search_result = await service.search(create_query(limit=5))
+
+        # then
+        assert [s.id for s in search_result.submissions] == ["s0", "s2"]
+
+    @pytest.mark.asyncio
+    async def test_search_does_not_load_submissions_rejected_by_listing_filters(self):
+        # given
+        low_score = FakeSubmission("s0", score=0)
+        few_comments = FakeSubmission("s1")
+        few_comments.num_comments = 1
+        accepted = FakeSubmission("s2")
+        service = RedditToolsService(FakeReddit(FakeSubreddit([low_score, few_comments, accepted])))
+
+        # when
+        search_result = await service.search(create_query(limit=5))
+
+        # then
+        assert [s.id for s in search_result.submissions] == ["s2"]
+        assert not low_score.loaded
+        assert not few_comments.loaded
+        assert accepted.loaded
+
+    @pytest.mark.asyncio
+    async def test_search_stops_at_limit(self):
+        # given
+        submissions = [FakeSubmission(f"s{i}") for i in range(20)]
+        subreddit = FakeSubreddit(submissions)
+        service = RedditToolsService(FakeReddit(subreddit), search_concurrency=4)
+
+        # when
+        search_result = await service.search(create_query(limit=2))
+
+        # then
+        assert [s.id for s in search_result.submissions] == ["s0", "s1"]
+        assert subreddit.yielded <= 2 + 4
+
+    @pytest.mark.asyncio
+    async def test_search_hydrates_in_parallel(self):
+        # given
+        submissions = [FakeSubmission(f"s{i}", load_delay=0.1) for i in range(5)]
+        service = RedditToolsService(FakeReddit(FakeSubreddit(submissions)), search_concurrency=5)
+
+        # when
+        started = asyncio.get_running_loop().time()
+        search_result = await service.search(create_query(limit=5))
+        elapsed = asyncio.get_running_loop().time() - started
+
+        # then
+        assert len(search_result.submissions) == 5
+        assert elapsed < 0.3
+
+    def test_search_concurrency_must_be_positive(self):
+        # when / then
+        with pytest.raises(ValueError):
+            RedditToolsService(FakeReddit(FakeSubreddit([])), search_concurrency=0)
+
+    @pytest.mark.asyncio
+    async def test_search_uses_submission_cache(self, tmp_path: Path):
+        # given
+        cache = FileSubmissionCache(tmp_path)
+        await RedditToolsService(FakeReddit(FakeSubreddit([FakeSubmission("s0")])),
+                                 submission_cache=cache).search(create_query(limit=5))
+        submission = FakeSubmission("s0")
+        service = RedditToolsService(FakeReddit(FakeSubreddit([submission])), submission_cache=cache)
+
+        # when
+        search_result = await service.search(create_query(limit=5))
+
+        # then
+        assert [s.id for s in search_result.submissions] == ["s0"]
+        assert len(search_result.submissions[0].comments) == 5
+        assert not submission.loaded
+
+    @pytest.mark.asyncio
+    async def test_search_tool_memoizes_identical_queries(self):
+        # given
+        subreddit = FakeSubreddit([FakeSubmission("s0")])
+        execution_cache, global_cache = SearchResultCache(), SearchResultCache()
+        reddit_search = create_reddit_search_tool(RedditToolsService(FakeReddit(subreddit)),
+                                                  [execution_cache, global_cache])
+        query = create_query(limit=5).model_dump()
+
+        # when
+        first = await reddit_search.ainvoke({"query": query})
+        second = await reddit_search.ainvoke({"query": query})
+
+        # then
+        assert first == second
+        assert subreddit.yielded == 1
+        assert execution_cache.stats().hits == 1
+        assert global_cache.stats().size == 1
+
+    @pytest.mark.asyncio
+    async def test_search_does_not_hydrate_seen_submissions_again(self):
+        # given
+        submission = FakeSubmission("s0")
+        service = RedditToolsService(FakeReddit(FakeSubreddit([submission])))
+        await service.search(create_query(limit=5))
+        submission.loaded = False
+
+        # when
+        search_result = await service.search(create_query(limit=5))
+
+        # then
+        assert [s.id for s in search_result.submissions] == ["s0"]
+        assert not submission.loaded
+
+    @pytest.mark.asyncio
+    async def test_search_tool_returns_seen_submissions_as_ids(self):
+        # given
+        subreddit = FakeSubreddit([FakeSubmission("s0"), FakeSubmission("s1")])
+        service = RedditToolsService(FakeReddit(subreddit), compact_seen_submissions=True)
+        reddit_search = create_reddit_search_tool(service, [SearchResultCache()])
+        await reddit_search.ainvoke({"query": create_query(limit=1).model_dump()})
+
+        # when
+        second = json.loads(await reddit_search.ainvoke({"query": create_query(limit=2).model_dump()}))
+
+        # then
+        assert [s["id"] for s in second["submissions"]] == ["s1"]
+        assert second["seen_submission_ids"] == ["s0"]
+
+    @pytest.mark.asyncio
+    async def test_search_tool_uses_context_from_run_config(self):
+        # given
+        subreddit = FakeSubreddit([FakeSubmission("s0")])
+        reddit_search = create_reddit_search_tool()
+        context = RedditSearchContext(RedditToolsService(FakeReddit(subreddit)))
+
+        # when
+        result = json.loads(await reddit_search.ainvoke({"query": create_query(limit=5).model_dump()},
+                                                        config={"configurable": {REDDIT_SEARCH_CONTEXT: context}}))
+
+        # then
+        assert [s["id"] for s in result["submissions"]] == ["s0"]
+
+    @pytest.mark.asyncio
+    async def test_search_tool_refuses_searches_beyond_max_calls(self):
+        # given
+        subreddit = FakeSubreddit([FakeSubmission("s0")])
+        reddit_search = create_reddit_search_tool()
+        context = RedditSearchContext(RedditToolsService(FakeReddit(subreddit)), (SearchResultCache(),), max_calls=1)
+        config = {"configurable": {REDDIT_SEARCH_CONTEXT: context}}
+        await reddit_search.ainvoke({"query": create_query(limit=5).model_dump()}, config=config)
+
+        # when
+        memoized = await reddit_search.ainvoke({"query": create_query(limit=5).model_dump()}, config=config)
+        refused = await reddit_search.ainvoke({"query": create_query(limit=3).model_dump()}, config=config)
+
+        # then
+        assert json.loads(memoized)["submissions"][0]["id"] == "s0"
+        assert "budget" in refused
+        assert subreddit.yielded == 1
@@ -0,0 +1,97 @@
+"""Tests for the compact, token-budgeted search result serialization"""
+import json
+import logging
+from datetime import datetime
+
+import pytest
+
+from agents.search_agent.tool.reddit.models import SearchResult, RedditSubmission, RedditSubmissionComment
+from agents.search_agent.tool.reddit.serialization import MIN_TEXT_CHARS, estimate_tokens, serialize_search_result
+
+
+def create_result(submissions: int, text_length: int) -> SearchResult:
+    return SearchResult(
+        subreddit="startups",
+        submissions=[
+            RedditSubmission(
+                id=f"s{i}",
+                subreddit="startups",
+                title=f"Submission {i}",
+                selftext="x" * text_length,
+                comments=[RedditSubmissionComment(score=5, body="y" * text_length)],
+                score=10,
+                num_comments=1,
+                created_utc=datetime(2025, 7, 20, 14, 23),
+                upvote_ratio=0.9,
+            )
+            for i in range(submissions)
+        ],
+    )
+
+
+class TestSerializeSearchResult:
+    """Tests for serialize_search_result."""
+
+    def test_uses_compact_layout(self):
+        # when
+        serialized = json.loads(serialize_search_result(create_result(submissions=1, text_length=10)))
+
+        # then
+        assert serialized == {
+            "subreddit": "startups",
+            "submissions": [{
+                "id": "s0",
+                "title": "Submission 0",
+                "text": "x" * 10,
+                "score": 10,
+                "num_comments": 1,
+                "created": "2025-07-20",
+                "comments": [[5, "y" * 10]],
+            }],
+        }
+
+    def test_truncates_texts_to_fit_budget(self):
+        # given
+        result = create_result(submissions=5, text_length=5000)
+
+        # when
+        serialized = serialize_search_result(result, max_tokens=2000)
+
+        # then
+        assert estimate_tokens(serialized) <= 2000
+        submission = json.loads(serialized)["submissions"][0]
+        assert submission["text"].endswith("…")
+        assert serialized == serialize_search_result(result, max_tokens=2000)
+
+    def test_keeps_short_texts_when_within_budget(self):
+        # given
+        result = create_result(submissions=2, text_length=200)
+
+        # when
+        serialized = json.loads(serialize_search_result(result, max_tokens=4000))
+
+        # then
+        assert serialized["submissions"][0]["text"] == "x" * 200
+
+    def test_keeps_full_texts_without_budget(self):
+        # given
+        result = create_result(submissions=25, text_length=5000)
+
+        # when
+        serialized = json.loads(serialize_search_result(result))
+
+        # then
+        assert all(s["text"] == "x" * 5000 for s in serialized["submissions"])
+
+    def test_logs_result_exceeding_budget_at_minimal_text_length(self, caplog: pytest.LogCaptureFixture):
+        # given
+        result = create_result(submissions=25, text_length=5000)
+
+        # when
+        with caplog.at_level(logging.WARNING, logger="uvicorn"):
+            serialized = serialize_search_result(result, max_tokens=200)
+
+        # then
+        assert estimate_tokens(serialized) > 200
+        assert len(json.loads(serialized)["submissions"][0]["text"]) <= MIN_TEXT_CHARS + 1
+        assert "exceeds token budget" in caplog.text
@@ -1,7 +1,7 @@
 import uuid
 from datetime import timedelta
 
-from sqlmodel import Session
+from sqlmodel import Session, select
 
 from core.models.agent import AgentConfiguration, AgentExecution, utcnow
 from core.repositories.agent import AgentExecutionRepository
@@ -19,7 +19,7 @@ class TestAgentExecutionRepository:
         session.commit()
         
         # when
-        result = repository.find_pending(session, threshold=60.0)
+        result = repository.find_pending(session)
         
         # then
         assert len(result) >= 1
@@ -30,24 +30,22 @@ class TestAgentExecutionRepository:
         assert actual is not None
         assert actual.executions == 0
 
-    def test_find_pending_with_old_execution(self, repository: AgentExecutionRepository,
-                                           session: Session, agent_config: AgentConfiguration):
-        """Test find_pending returns executions updated before threshold."""
-        # given - create execution with past updated_at
+    def test_find_pending_with_due_retry(self, repository: AgentExecutionRepository,
+                                         session: Session, agent_config: AgentConfiguration):
+        """Test find_pending returns attempted executions whose next attempt is due."""
+        # given - create execution with past next_attempt_at
         now = utcnow()
-        old_time = now - timedelta(seconds=120)  # 2 minutes ago
-        
         execution = AgentExecution(
             config_id=agent_config.id, 
             executions=1, 
             state="pending",
-            updated_at=old_time
+            next_attempt_at=now - timedelta(seconds=120)
         )
         session.add(execution)
         session.commit()
         
-        # when - threshold is 60 seconds, so execution should be returned
-        result = repository.find_pending(session, threshold=60.0)
+        # when
+        result = repository.find_pending(session)
         
         # then
         assert len(result) >= 1
@@ -55,20 +53,21 @@ class TestAgentExecutionRepository:
         pending_ids = {r.id for r in result}
         assert execution.id in pending_ids
 
-    def test_find_pending_excludes_recent_execution(self, repository: AgentExecutionRepository,
-                                                  session: Session, agent_config: AgentConfiguration):
-        """Test find_pending excludes executions updated within threshold."""
-        # given - create execution with recent updated_at
+    def test_find_pending_excludes_execution_in_backoff(self, repository: AgentExecutionRepository,
+                                                        session: Session, agent_config: AgentConfiguration):
+        """Test find_pending excludes executions whose next attempt is in the future."""
+        # given - create execution with future next_attempt_at
         execution = AgentExecution(
             config_id=agent_config.id, 
             executions=1, 
-            state="pending"
+            state="pending",
+            next_attempt_at=utcnow() + timedelta(seconds=60)
         )
         session.add(execution)
         session.commit()
         
-        # when - threshold is 60 seconds, execution is recent so should be excluded
-        result = repository.find_pending(session, threshold=60.0)
+        # when
+        result = repository.find_pending(session)
         
         # then
         pending_ids = {r.id for r in result}
@@ -92,7 +91,7 @@ class TestAgentExecutionRepository:
         session.commit()
         
         # when
-        result = repository.find_pending(session, threshold=60.0)
+        result = repository.find_pending(session)
         
         # then
         pending_ids = {r.id for r in result}
@@ -112,40 +111,41 @@ class TestAgentExecutionRepository:
         session.commit()
         
         # when
-        result = repository.find_pending(session, threshold=60.0, limit=3)
+        result = repository.find_pending(session, limit=3)
         
         # then
         assert len(result) == 3
 
-    def test_find_pending_orders_by_updated_at_asc(self, repository: AgentExecutionRepository,
-                                                  session: Session, agent_config: AgentConfiguration):
-        """Test find_pending orders results by updated_at ascending."""
-        # given - create executions with different updated_at times
+    def test_find_pending_orders_by_next_attempt_at_asc(self, repository: AgentExecutionRepository,
+                                                        session: Session, agent_config: AgentConfiguration):
+        """Test find_pending orders results by next_attempt_at ascending."""
+        # given - create executions with different next_attempt_at times
         now = utcnow()
         old_execution = AgentExecution(
             config_id=agent_config.id, 
             executions=0, 
             state="pending",
-            updated_at=now - timedelta(minutes=2)
+            next_attempt_at=now - timedelta(days=3650)
         )
         newer_execution = AgentExecution(
             config_id=agent_config.id, 
             executions=0, 
             state="pending", 
-            updated_at=now - timedelta(minutes=1)
+            next_attempt_at=now - timedelta(days=3649)
         )
         
         session.add_all([newer_execution, old_execution])  # Add in reverse order
         session.commit()
         
         # when
-        result = repository.find_pending(session, threshold=60.0)
+        result = repository.find_pending(session)
         
         # then
         assert len(result) >= 2
-        pending_ids = {r.id for r in result}
+        pending_ids = [r.id for r in result]
         assert old_execution.id in pending_ids
         assert newer_execution.id in pending_ids
+        assert pending_ids.index(old_execution.id) < pending_ids.index(newer_execution.id)
 
     def test_acquire_lock_success(self, repository: AgentExecutionRepository,
                                 session: Session, agent_config: AgentConfiguration):
@@ -196,4 +196,211 @@ class TestAgentExecutionRepository:
         result = repository.acquire_lock(session, fake_execution)
         
         # then
-        assert result is None
\ No newline at end of file
+        assert result is None
+
+    def test_claim_pending_claims_due_retry(self, repository: AgentExecutionRepository,
+                                            session: Session, agent_config: AgentConfiguration):
+        """Test claim_pending claims attempted executions whose next attempt is due."""
+        # given - create execution with past next_attempt_at
+        execution = AgentExecution(
+            config_id=agent_config.id,
+            executions=1,
+            state="pending",
+            next_attempt_at=utcnow() - timedelta(seconds=120)
+        )
+        session.add(execution)
+        session.commit()
+
+        # when
+        result = repository.claim_pending(session, owner="scheduler-1", lease_seconds=60.0, limit=1000)
+
+        # then
+        claimed = {r.id: r for r in result}.get(execution.id)
+        assert claimed is not None
+        assert claimed.executions == 2
+
+    def test_claim_pending_excludes_execution_in_backoff(self, repository: AgentExecutionRepository,
+                                                         session: Session, agent_config: AgentConfiguration):
+        """Test claim_pending excludes executions whose next attempt is in the future."""
+        # given - create execution with future next_attempt_at
+        execution = AgentExecution(
+            config_id=agent_config.id,
+            executions=1,
+            state="pending",
+            next_attempt_at=utcnow() + timedelta(seconds=60)
+        )
+        session.add(execution)
+        session.commit()
+
+        # when
+        result = repository.claim_pending(session, owner="scheduler-1", lease_seconds=60.0, limit=1000)
+
+        # then
+        assert execution.id not in {r.id for r in result}
+
+    def test_claim_pending_excludes_non_pending_state(self, repository: AgentExecutionRepository,
+                                                      session: Session, agent_config: AgentConfiguration):
+        """Test claim_pending excludes executions not in pending state."""
+        # given
+        completed_execution = AgentExecution(config_id=agent_config.id, executions=0, state="completed")
+        failed_execution = AgentExecution(config_id=agent_config.id, executions=0, state="failed")
+        session.add_all([completed_execution, failed_execution])
+        session.commit()
+
+        # when
+        result = repository.claim_pending(session, owner="scheduler-1", lease_seconds=60.0, limit=1000)
+
+        # then
+        claimed_ids = {r.id for r in result}
+        assert completed_execution.id not in claimed_ids
+        assert failed_execution.id not in claimed_ids
+
+    def test_claim_pending_claims_longest_overdue_first(self, repository: AgentExecutionRepository,
+                                                        session: Session, agent_config: AgentConfiguration):
+        """Test claim_pending respects the limit and claims the executions overdue the longest."""
+        # given - create executions with different next_attempt_at times
+        now = utcnow()
+        old_execution = AgentExecution(
+            config_id=agent_config.id,
+            executions=0,
+            state="pending",
+            next_attempt_at=now - timedelta(days=3650)
+        )
+        newer_execution = AgentExecution(
+            config_id=agent_config.id,
+            executions=0,
+            state="pending",
+            next_attempt_at=now - timedelta(days=3649)
+        )
+        session.add_all([newer_execution, old_execution])  # Add in reverse order
+        session.commit()
+
+        # when
+        result = repository.claim_pending(session, owner="scheduler-1", lease_seconds=60.0, limit=1)
+
+        # then
+        assert [r.id for r in result] == [old_execution.id]
+
+    def test_claim_pending_skips_excluded_executions(self, repository: AgentExecutionRepository,
+                                                     session: Session, agent_config: AgentConfiguration):
+        """Test claim_pending skips executions the caller is already running."""
+        # given
+        execution = AgentExecution(config_id=agent_config.id, executions=0, state="pending")
+        session.add(execution)
+        session.commit()
+
+        # when
+        result = repository.claim_pending(session, owner="scheduler-1", lease_seconds=60.0, limit=1000,
+                                          exclude_ids=[execution.id])
+
+        # then
+        assert execution.id not in {r.id for r in result}
+
+    def test_claim_pending_increments_executions_and_loads_config(self, repository: AgentExecutionRepository,
+                                                                  session: Session,
+                                                                  agent_config: AgentConfiguration):
+        """Test claim_pending claims pending executions with their configuration loaded."""
+        # given
+        execution = AgentExecution(config_id=agent_config.id, executions=0, state="pending")
+        session.add(execution)
+        session.commit()
+
+        # when
+        result = repository.claim_pending(session, owner="scheduler-1", lease_seconds=60.0, limit=1000)
+
+        # then
+        id_to_execution = {r.id: r for r in result}
+        claimed = id_to_execution.get(execution.id)
+        assert claimed is not None
+        assert claimed.executions == 1
+        assert claimed.lease_owner == "scheduler-1"
+        assert claimed.lease_expires_at == claimed.next_attempt_at
+        assert "config" in claimed.__dict__
+        assert claimed.config.id == agent_config.id
+
+        # and - claimed execution is not pending anymore until the threshold passes
+        assert claimed.next_attempt_at > utcnow()
+        claimed_again = repository.claim_pending(session, owner="scheduler-1", lease_seconds=60.0, limit=1000)
+        assert execution.id not in {r.id for r in claimed_again}
+
+    def test_claim_pending_skips_locked_executions(self, repository: AgentExecutionRepository,
+                                                   session: Session, agent_config: AgentConfiguration):
+        """Test claim_pending skips executions locked by another transaction."""
+        # given
+        execution = AgentExecution(config_id=agent_config.id, executions=0, state="pending")
+        session.add(execution)
+        session.commit()
+
+        with Session(session.get_bind()) as other_session:
+            other_session.exec(
+                select(AgentExecution).where(AgentExecution.id == execution.id).with_for_update()  # type: ignore
+            ).one()
+
+            # when
+            result = repository.claim_pending(session, owner="scheduler-1", lease_seconds=60.0, limit=1000)
+
+        # then
+        assert execution.id not in {r.id for r in result}
+
+    def test_renew_lease_extends_lease_of_owner(self, repository: AgentExecutionRepository,
+                                                session: Session, agent_config: AgentConfiguration):
+        """Test renew_lease extends the lease held by the owner."""
+        # given
+        execution = AgentExecution(config_id=agent_config.id, executions=0, state="pending")
+        session.add(execution)
+        session.commit()
+        claimed = next(r for r in repository.claim_pending(session, owner="scheduler-1", lease_seconds=1.0,
+                                                           limit=1000) if r.id == execution.id)
+        claimed_lease_expires_at = claimed.lease_expires_at
+
+        # when
+        renewed = repository.renew_lease(session, execution.id, "scheduler-1", lease_seconds=60.0)
+
+        # then
+        assert renewed
+        session.refresh(claimed)
+        assert claimed.lease_expires_at > claimed_lease_expires_at
+        assert claimed.next_attempt_at == claimed.lease_expires_at
+
+    def test_renew_lease_fails_for_other_owner(self, repository: AgentExecutionRepository,
+                                               session: Session, agent_config: AgentConfiguration):
+        """Test renew_lease fails when the lease is held by another scheduler."""
+        # given
+        execution = AgentExecution(config_id=agent_config.id, executions=0, state="pending")
+        session.add(execution)
+        session.commit()
+        repository.claim_pending(session, owner="scheduler-1", lease_seconds=60.0, limit=1000)
+
+        # when
+        renewed = repository.renew_lease(session, execution.id, "scheduler-2", lease_seconds=60.0)
+
+        # then
+        assert not renewed
+
+    def test_get_usage_by_config_sums_usage(self, repository: AgentExecutionRepository,
+                                            session: Session, agent_config: AgentConfiguration):
+        """Test get_usage_by_config aggregates usage ledgers of a configuration."""
+        # given
+        since = utcnow()
+        for input_tokens in (100, 300):
+            session.add(AgentExecution(
+                config_id=agent_config.id,
+                state="completed",
+                usage={
+                    "llm": {"calls": 2, "input_tokens": input_tokens, "output_tokens": 10,
+                            "cache_read_tokens": 50, "latency_ms": 1000},
+                    "tools": {"calls": 1, "latency_ms": 200},
+                },
+            ))
+        session.commit()
+
+        # when
+        result = repository.get_usage_by_config(session, since=since, limit=100)
+
+        # then
+        config_usage = {r["config_id"]: r for r in result}[agent_config.id]
+        assert config_usage["executions"] == 2
+        assert config_usage["input_tokens"] == 400
+        assert config_usage["output_tokens"] == 20
+        assert config_usage["cache_read_tokens"] == 100
+        assert config_usage["tool_latency_ms"] == 400
@@ -0,0 +1,140 @@
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import func
+from sqlmodel import Session, select, update
+
+from agentapi.dependencies import ctx
+from core.models import RateLimitBucket
+from core.repositories import RateLimitBucketRepository
+
+
+@pytest.fixture
+def rate_limit_repository() -> RateLimitBucketRepository:
+    return RateLimitBucketRepository()
+
+
+def create_bucket(repository: RateLimitBucketRepository, session: Session, tokens: float, rate: float,
+                  capacity: float) -> str:
+    name = f"test-{uuid.uuid4()}"
+    repository.create_if_missing(session, RateLimitBucket(name=name, tokens=tokens, rate=rate, capacity=capacity))
+    return name
+
+
+def find_bucket(session: Session, name: str) -> RateLimitBucket:
+    session.expire_all()
+    return session.exec(select(RateLimitBucket).where(RateLimitBucket.name == name)).one()
+
+
+class TestRateLimitBucketRepository:
+    """Test cases for RateLimitBucketRepository."""
+
+    def test_create_if_missing_keeps_existing_bucket(self, rate_limit_repository: RateLimitBucketRepository,
+                                                     session: Session):
+        """Test create_if_missing doesn't reset a bucket created by another replica."""
+        # given
+        name = create_bucket(rate_limit_repository, session, tokens=3, rate=0.001, capacity=10)
+
+        # when
+        rate_limit_repository.create_if_missing(session, RateLimitBucket(name=name, tokens=10, rate=5, capacity=10))
+
+        # then
+        bucket = find_bucket(session, name)
+        assert bucket.tokens == pytest.approx(3, abs=0.01)
+        assert bucket.rate == pytest.approx(0.001)
+
+    def test_reserve_takes_one_token(self, rate_limit_repository: RateLimitBucketRepository, session: Session):
+        """Test reserve takes one token and returns the tokens left and the rate."""
+        # given
+        name = create_bucket(rate_limit_repository, session, tokens=5, rate=0.001, capacity=10)
+
+        # when
+        tokens, rate = rate_limit_repository.reserve(session, name)
+
+        # then
+        assert tokens == pytest.approx(4, abs=0.01)
+        assert rate == pytest.approx(0.001)
+        assert find_bucket(session, name).tokens == pytest.approx(tokens)
+
+    def test_reserve_returns_debt_of_empty_bucket(self, rate_limit_repository: RateLimitBucketRepository,
+                                                  session: Session):
+        """Test reserve goes below zero when the bucket is empty, so the caller waits for the refill."""
+        # given
+        name = create_bucket(rate_limit_repository, session, tokens=0, rate=0.001, capacity=10)
+
+        # when
+        first, _ = rate_limit_repository.reserve(session, name)
+        second, _ = rate_limit_repository.reserve(session, name)
+
+        # then
+        assert first == pytest.approx(-1, abs=0.01)
+        assert second == pytest.approx(-2, abs=0.01)
+
+    def test_reserve_refills_for_elapsed_time_up_to_capacity(self, rate_limit_repository: RateLimitBucketRepository,
+                                                            session: Session):
+        """Test reserve refills the bucket at its rate since the last update, capped by the capacity."""
+        # given
+        refilled = create_bucket(rate_limit_repository, session, tokens=0, rate=0.5, capacity=10)
+        capped = create_bucket(rate_limit_repository, session, tokens=0, rate=5, capacity=10)
+        session.exec(
+            update(RateLimitBucket)  # type: ignore
+            .where(RateLimitBucket.name.in_([refilled, capped]))  # type: ignore
+            .values(updated_at=func.now() - timedelta(seconds=10))
+        )
+        session.commit()
+
+        # when
+        refilled_tokens, _ = rate_limit_repository.reserve(session, refilled)
+        capped_tokens, _ = rate_limit_repository.reserve(session, capped)
+
+        # then
+        assert refilled_tokens == pytest.approx(4, abs=0.1)
+        assert capped_tokens == pytest.approx(9, abs=0.01)
+
+    def test_reserve_is_atomic_under_concurrency(self, rate_limit_repository: RateLimitBucketRepository,
+                                                 session: Session):
+        """Test concurrent reservations from separate sessions each take exactly one token."""
+        # given
+        name = create_bucket(rate_limit_repository, session, tokens=10, rate=0.001, capacity=10)
+
+        def reserve() -> float:
+            with Session(ctx.db_engine) as other_session:
+                return rate_limit_repository.reserve(other_session, name)[0]
+
+        # when
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            results = list(executor.map(lambda _: reserve(), range(20)))
+
+        # then
+        assert sorted(results) == pytest.approx(sorted(range(-10, 10)), abs=0.1)
+        assert find_bucket(session, name).tokens == pytest.approx(-10, abs=0.1)
+
+    def test_observe_caps_tokens_and_sets_rate(self, rate_limit_repository: RateLimitBucketRepository,
+                                               session: Session):
+        """Test observe caps the tokens by the remaining quota and sets the refill rate."""
+        # given
+        name = create_bucket(rate_limit_repository, session, tokens=10, rate=0.001, capacity=10)
+
+        # when
+        rate_limit_repository.observe(session, name, remaining=3, rate=0.5)
+
+        # then
+        bucket = find_bucket(session, name)
+        assert bucket.tokens == pytest.approx(3)
+        assert bucket.rate == pytest.approx(0.5)
+
+    def test_observe_keeps_tokens_below_remaining_quota(self, rate_limit_repository: RateLimitBucketRepository,
+                                                        session: Session):
+        """Test observe doesn't raise the tokens to the remaining quota."""
+        # given
+        name = create_bucket(rate_limit_repository, session, tokens=2, rate=0.001, capacity=10)
+
+        # when
+        rate_limit_repository.observe(session, name, remaining=100, rate=0.5)
+
+        # then
+        bucket = find_bucket(session, name)
+        assert bucket.tokens == pytest.approx(2, abs=0.01)
+        assert bucket.rate == pytest.approx(0.5)
@@ -0,0 +1,91 @@
+"""Tests for ExecutionNotificationListener using a socket in place of the Postgres connection"""
+import asyncio
+import socket
+
+import pytest
+
+from scheduler.services import ExecutionNotificationListener
+
+
+class FakeCursor:
+
+    def __init__(self, executed: list[str]):
+        self.executed = executed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def execute(self, sql: str):
+        self.executed.append(sql)
+
+
+class FakeDriverConnection:
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.autocommit = False
+        self.notifies: list[str] = []
+        self.executed: list[str] = []
+        self.closed = False
+
+    def cursor(self) -> FakeCursor:
+        return FakeCursor(self.executed)
+
+    def fileno(self) -> int:
+        return self.sock.fileno()
+
+    def poll(self):
+        self.notifies.extend(self.sock.recv(1024).decode().split())
+
+    def close(self):
+        self.closed = True
+
+
+class FakePoolConnection:
+
+    def __init__(self, driver_connection: FakeDriverConnection):
+        self.driver_connection = driver_connection
+
+    def detach(self):
+        pass
+
+
+class FakeEngine:
+
+    def __init__(self, driver_connection: FakeDriverConnection):
+        self.driver_connection = driver_connection
+
+    def raw_connection(self) -> FakePoolConnection:
+        return FakePoolConnection(self.driver_connection)
+
+
+class TestExecutionNotificationListener:
+    """Tests for waking the scheduler up on notifications."""
+
+    @pytest.mark.asyncio
+    async def test_sets_wakeup_event_on_notification(self):
+        # given
+        server, client = socket.socketpair()
+        connection = FakeDriverConnection(client)
+        wakeup_event = asyncio.Event()
+        listener = ExecutionNotificationListener(FakeEngine(connection), wakeup_event)  # type: ignore
+        await listener.ensure_listening()
+        wakeup_event.clear()
+
+        # when
+        server.send(b"execution-1")
+        await asyncio.wait_for(wakeup_event.wait(), timeout=1)
+
+        # then
+        assert listener.listening
+        assert connection.autocommit
+        assert connection.executed == ['LISTEN "agent_execution_created"']
+        assert connection.notifies == []
+
+        listener.stop()
+        assert connection.closed
+        server.close()
+        client.close()
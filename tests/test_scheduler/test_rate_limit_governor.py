@@ -0,0 +1,107 @@
+"""Tests for the Reddit rate limit governor shared through Postgres"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session
+
+from core.models import RateLimitBucket
+from core.repositories import RateLimitBucketRepository
+from scheduler.services.rate_limit_governor import PostgresRateLimitGovernor
+
+
+class FakeRateLimitBucketRepository(RateLimitBucketRepository):
+
+    def __init__(self, available: bool = True):
+        self.available = available
+        self.reservations = 0
+        self.observations: list[tuple[float, float]] = []
+
+    def create_if_missing(self, session: Session, bucket: RateLimitBucket) -> None:
+        self._check_available()
+
+    def reserve(self, session: Session, name: str) -> tuple[float, float]:
+        self._check_available()
+        self.reservations += 1
+        return 1.0, 1.0
+
+    def observe(self, session: Session, name: str, remaining: float, rate: float) -> None:
+        self._check_available()
+        self.observations.append((remaining, rate))
+
+    def _check_available(self):
+        if not self.available:
+            raise OperationalError("UPDATE rate_limit_bucket", {}, Exception("connection refused"))
+
+
+def create_governor(repository: RateLimitBucketRepository) -> PostgresRateLimitGovernor:
+    return PostgresRateLimitGovernor(create_engine("sqlite://"), repository, requests_per_minute=60, burst=10,
+                                     max_requests_per_second=10)
+
+
+class TestPostgresRateLimitGovernor:
+    """Tests for PostgresRateLimitGovernor."""
+
+    @pytest.mark.asyncio
+    async def test_reserves_token_in_database(self):
+        # given
+        repository = FakeRateLimitBucketRepository()
+        governor = create_governor(repository)
+
+        # when
+        await governor.acquire()
+
+        # then
+        assert repository.reservations == 1
+        assert governor.fallback._tokens == pytest.approx(10)
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_local_bucket_when_database_is_down(self):
+        # given
+        governor = create_governor(FakeRateLimitBucketRepository(available=False))
+
+        # when
+        for _ in range(3):
+            await governor.acquire()
+
+        # then
+        assert governor.fallback._tokens == pytest.approx(7, abs=0.1)
+
+    @pytest.mark.asyncio
+    async def test_observe_writes_only_when_rate_changes(self):
+        # given
+        repository = FakeRateLimitBucketRepository()
+        governor = create_governor(repository)
+
+        # when
+        await governor.observe(remaining=600, reset_seconds=600)
+        await governor.observe(remaining=599, reset_seconds=599)
+        await governor.observe(remaining=590, reset_seconds=598)
+        await governor.observe(remaining=300, reset_seconds=597)
+
+        # then
+        assert repository.observations == [(600, pytest.approx(1.0)), (300, pytest.approx(300 / 597))]
+
+    @pytest.mark.asyncio
+    async def test_observe_writes_when_remaining_quota_caps_tokens(self):
+        # given
+        repository = FakeRateLimitBucketRepository()
+        governor = create_governor(repository)
+        await governor.observe(remaining=20, reset_seconds=20)
+
+        # when
+        await governor.observe(remaining=5, reset_seconds=5)
+
+        # then
+        assert repository.observations == [(20, pytest.approx(1.0)), (5, pytest.approx(1.0))]
+
+    @pytest.mark.asyncio
+    async def test_observe_updates_local_bucket_when_database_is_down(self):
+        # given
+        governor = create_governor(FakeRateLimitBucketRepository(available=False))
+
+        # when
+        with pytest.raises(OperationalError):
+            await governor.observe(remaining=30, reset_seconds=60)
+
+        # then
+        assert governor.fallback.rate == pytest.approx(0.5)
@@ -0,0 +1,191 @@
+"""Tests for the SchedulerService worker pool using in-memory fakes"""
+import asyncio
+import uuid
+from typing import Any, Collection
+
+import pytest
+from sqlmodel import Session, create_engine
+
+from core.models.agent import AgentExecution, utcnow
+from scheduler.services import SchedulerService
+from scheduler.services.scheduler import retry_delay_seconds
+from scheduler.settings import SchedulerSettings
+
+
+class FakeExecutionService:
+
+    def __init__(self, executions: list[AgentExecution]):
+        self.executions = {execution.id: execution for execution in executions}
+        self.lease_owner: str | None = None
+
+    def claim_pending(self, session: Session, owner: str, lease_seconds: float, limit: int = 100,
+                      exclude_ids: Collection[uuid.UUID] = ()) -> list[AgentExecution]:
+        claimed = [e for e in self.executions.values() if e.executions == 0 and e.id not in exclude_ids][:limit]
+        for execution in claimed:
+            execution.executions += 1
+            execution.lease_owner = self.lease_owner = owner
+        return claimed
+
+    def renew_lease(self, session: Session, execution_id: uuid.UUID, owner: str, lease_seconds: float) -> bool:
+        return owner == self.lease_owner
+
+    def count_pending(self, session: Session) -> int:
+        return sum(1 for e in self.executions.values() if e.executions == 0)
+
+    def update(self, session: Session, execution: AgentExecution) -> AgentExecution:
+        return execution
+
+
+class FakeExecutor:
+
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+        self.release = asyncio.Event()
+        self.error: Exception | None = None
+        self.cancelled = 0
+
+    async def execute(self, execution: AgentExecution, usage: Any = None) -> dict[str, Any]:
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.running -= 1
+        if self.error is not None:
+            raise self.error
+        return {"findings": []}
+
+    async def close(self):
+        pass
+
+
+def create_settings(max_concurrency: int) -> SchedulerSettings:
+    return SchedulerSettings(reddit_client_id="id", reddit_client_secret="secret", reddit_agent="agent",
+                             openai_api_key="key", db_url="sqlite://", max_concurrency=max_concurrency,
+                             lease_renew_interval_seconds=0.01)
+
+
+def create_service(executions: int, max_concurrency: int) -> tuple[SchedulerService, FakeExecutionService,
+                                                                     FakeExecutor]:
+    execution_service = FakeExecutionService([AgentExecution(config_id=uuid.uuid4()) for _ in range(executions)])
+    executor = FakeExecutor()
+    service = SchedulerService(execution_service=execution_service, executor=executor,  # type: ignore
+                               settings=create_settings(max_concurrency))
+    return service, execution_service, executor
+
+
+class TestSchedulerServiceWorkerPool:
+    """Tests for running pending executions concurrently."""
+
+    @pytest.mark.asyncio
+    async def test_runs_at_most_max_concurrency_executions(self):
+        # given
+        service, _, executor = create_service(executions=5, max_concurrency=2)
+
+        # when
+        with Session(create_engine("sqlite://")) as session:
+            started = await service.process_pending_executions(session)
+            await asyncio.sleep(0)
+            started_again = await service.process_pending_executions(session)
+
+        # then
+        assert started == 2
+        assert started_again == 0
+        assert service.in_flight == 2
+        assert service.queue_depth == 3
+        assert executor.max_running == 2
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_tops_up_pool_when_execution_completes(self):
+        # given
+        service, execution_service, executor = create_service(executions=3, max_concurrency=2)
+        with Session(create_engine("sqlite://")) as session:
+            await service.process_pending_executions(session)
+
+            # when
+            executor.release.set()
+            await service.wait_for_wakeup(timeout=1)
+            started = await service.process_pending_executions(session)
+
+        # then
+        assert started == 1
+        assert service.queue_depth == 0
+        await service.close()
+        assert all(e.state == "completed" for e in list(execution_service.executions.values())[:2])
+
+
+class TestSchedulerServiceRetries:
+    """Tests for rescheduling failed executions."""
+
+    @pytest.mark.asyncio
+    async def test_failed_execution_is_retried_after_backoff(self):
+        # given
+        service, execution_service, executor = create_service(executions=1, max_concurrency=1)
+        executor.error = RuntimeError("transient error")
+        executor.release.set()
+
+        # when
+        with Session(create_engine("sqlite://")) as session:
+            await service.process_pending_executions(session)
+            await service.wait_for_wakeup(timeout=1)
+
+        # then
+        execution = next(iter(execution_service.executions.values()))
+        assert execution.state == "pending"
+        assert execution.error_result == {"error": "transient error"}
+        assert execution.next_attempt_at > utcnow()
+        await service.close()
+
+    def test_retry_delay_grows_exponentially_up_to_max(self):
+        # when
+        delays = [retry_delay_seconds(attempt, base_seconds=10, max_seconds=100) for attempt in (1, 2, 3, 30)]
+
+        # then
+        assert 5 <= delays[0] <= 10
+        assert 10 <= delays[1] <= 20
+        assert 20 <= delays[2] <= 40
+        assert 50 <= delays[3] <= 100
+
+
+class TestSchedulerServiceLeases:
+    """Tests for the lease of running executions."""
+
+    @pytest.mark.asyncio
+    async def test_releases_lease_when_execution_completes(self):
+        # given
+        service, execution_service, executor = create_service(executions=1, max_concurrency=1)
+        executor.release.set()
+
+        # when
+        with Session(create_engine("sqlite://")) as session:
+            await service.process_pending_executions(session)
+            await service.wait_for_wakeup(timeout=1)
+
+        # then
+        execution = next(iter(execution_service.executions.values()))
+        assert execution.state == "completed"
+        assert execution.lease_owner is None
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_cancels_execution_when_lease_is_lost(self):
+        # given
+        service, execution_service, executor = create_service(executions=1, max_concurrency=1)
+        with Session(create_engine("sqlite://")) as session:
+            await service.process_pending_executions(session)
+
+            # when
+            execution_service.lease_owner = "other-scheduler"
+            await service.wait_for_wakeup(timeout=1)
+
+        # then
+        execution = next(iter(execution_service.executions.values()))
+        assert service.in_flight == 0
+        assert execution.state == "pending"
+        assert executor.cancelled == 1
+        await service.close()